@@ -0,0 +1,56 @@
+"""Расчет динамики баланса: groupby().apply(lambda) против векторизованного balance_over_time.
+
+Запуск (данные генерируются в памяти, база не нужна):
+    python Benchmarks/bench_balance.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library.report_generator import balance_over_time
+
+def synthetic_frame(rows: int, days: int, seed: int = 42) -> pd.DataFrame:
+    """DataFrame транзакций в формате load_transactions_frame"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, days, rows), unit='D'),
+        'amount': rng.uniform(1, 5000, rows).round(2),
+        'transaction_type': pd.Categorical(rng.choice(['income', 'expense'], rows, p=[0.2, 0.8])),
+    })
+
+def legacy_balance(df: pd.DataFrame) -> pd.Series:
+    """Прежняя реализация из generate_line_chart"""
+    return df.groupby('date').apply(
+        lambda x: x[x['transaction_type'] == 'income']['amount'].sum() -
+                 x[x['transaction_type'] == 'expense']['amount'].sum()
+    ).cumsum()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=3650)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.days)
+
+    started = time.perf_counter()
+    expected = legacy_balance(df)
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = balance_over_time(df)
+    vectorized = time.perf_counter() - started
+
+    assert np.allclose(expected.values, actual.values), "результаты расходятся"
+    print(f"groupby().apply(lambda): {legacy:.3f} с")
+    print(f"balance_over_time:       {vectorized:.3f} с")
+    print(f"Ускорение: x{legacy / vectorized:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Автоматическая категоризация: обучение, дообучение, пакетное назначение и подсказка для одной строки.
+
+Обучение на синтетической книге операций (Benchmarks/ledger.py), точность - на строках
+с другим seed. Запуск (временная база SQLite, нужен scikit-learn):
+    python Benchmarks/bench_categorizer.py --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import use_sqlite
+from ledger import ensure_categories, generate_ledger
+from Library import db_manager
+from Library.db_manager import read_config, get_categories, add_category, add_transactions
+from Library.categorizer import TransactionCategorizer
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--increment', type=int, default=10_000, help='строк, добавляемых перед дообучением')
+    parser.add_argument('--uncategorized', type=int, default=20_000, help='строк без категории для назначения')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        read_config()['SNAPSHOT']['path'] = os.path.join(tmp, 'snapshot')  # назначение категорий отмечает снимок
+        category_ids = ensure_categories(get_categories, add_category)
+        for chunk in generate_ledger(args.rows, category_ids):
+            add_transactions(chunk)
+        categorizer = TransactionCategorizer(os.path.join(tmp, 'categorizer.pkl'))
+        _, full_time = timed(categorizer.train)
+
+        extra = next(generate_ledger(args.increment + args.uncategorized, category_ids, seed=7))
+        add_transactions(extra[:args.increment])
+        added, increment_time = timed(categorizer.train)
+        assert added == args.increment, "дообучение прошло не по всем новым строкам"
+
+        holdout = extra[args.increment:]
+        truth = np.array([row[2] for row in holdout])
+        (predicted, _), batch_time = timed(lambda: categorizer.predict(
+            [row[3] for row in holdout], [row[1] for row in holdout], [row[4] for row in holdout]))
+        _, loop_time = timed(lambda: [categorizer.predict([row[3]], [row[1]], [row[4]]) for row in holdout[:1000]])
+
+        add_transactions([(date_, amount, None, description, type_)
+                          for date_, amount, _, description, type_ in holdout])
+        assigned, assign_time = timed(categorizer.assign_uncategorized)
+
+        # Подсказки в окне: новые описания (числа в описании не различаются - меняются буквы) и повторные
+        fresh = [f"{row[3]} {chr(1072 + index % 32)}{chr(1072 + index // 32 % 32)}"
+                 for index, row in enumerate(holdout[:2000])]
+        _, suggest_time = timed(lambda: [categorizer.suggest(description, row[1], row[4])
+                                         for description, row in zip(fresh, holdout)])
+        _, cached_time = timed(lambda: [categorizer.suggest(row[3], row[1], row[4]) for row in holdout[:2000]])
+        model_size = os.path.getsize(categorizer.path)
+        db_manager.set_backend(None)
+        backend.close()
+
+    print(f"Обучение на {args.rows} строках:           {full_time:.2f} с")
+    print(f"Дообучение на {args.increment} новых строках:   {increment_time:.2f} с")
+    print(f"Точность на {len(holdout)} новых строках:   {(predicted == truth).mean():.3f}")
+    print(f"Предсказание пачкой:                {batch_time / len(holdout) * 1e6:.1f} мкс/строка")
+    print(f"Предсказание по одной строке:       {loop_time / 1000 * 1e6:.1f} мкс/строка")
+    print(f"Назначение категорий ({assigned} строк): {assign_time:.2f} с")
+    print(f"Подсказка (новое описание):         {suggest_time / 2000 * 1e6:.1f} мкс")
+    print(f"Подсказка (из кэша):                {cached_time / 2000 * 1e6:.1f} мкс")
+    print(f"Файл модели:                        {model_size / 1024 / 1024:.1f} МБ")
+
+if __name__ == "__main__":
+    main()
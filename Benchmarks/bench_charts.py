@@ -0,0 +1,60 @@
+"""Время построения графиков: три отдельных вызова, generate_charts и повтор из кэша графиков.
+
+Запуск (используется временная база SQLite):
+    python Benchmarks/bench_charts.py --rows 200000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from common import use_sqlite, fill_transactions
+
+from Library import db_manager
+from Library.report_generator import generate_pie_charts, generate_line_chart, generate_bar_chart, generate_charts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    start_date = (date.today() - timedelta(days=args.days)).isoformat()
+    end_date = date.today().isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows, days=args.days)
+        # графики пишутся во временный каталог
+        config = db_manager.read_config()
+        config['REPORTS']['graphics_path'] = tmp + os.sep
+        config['REPORTS']['chart_cache'] = 'false'  # сравнивается само построение
+
+        started = time.perf_counter()
+        generate_pie_charts(start_date, end_date)
+        generate_line_chart(start_date, end_date)
+        generate_bar_chart(start_date, end_date)
+        serial = time.perf_counter() - started
+
+        # Пул процессов создается заранее, как в приложении (TaskExecutor.cpu_pool)
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')) as pool:
+            generate_charts(start_date, end_date, executor=pool)  # прогрев процессов
+            started = time.perf_counter()
+            generate_charts(start_date, end_date, executor=pool)
+            batched = time.perf_counter() - started
+
+            config['REPORTS']['chart_cache'] = 'true'
+            generate_charts(start_date, end_date, executor=pool)  # построение и запись в кэш
+            started = time.perf_counter()
+            generate_charts(start_date, end_date, executor=pool)
+            cached = time.perf_counter() - started
+        db_manager.set_backend(None)
+
+    print(f"Последовательно (3 запроса): {serial:.2f} с")
+    print(f"generate_charts (1 запрос):  {batched:.2f} с")
+    print(f"generate_charts из кэша:     {cached:.3f} с")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Память и время загрузки: список словарей get_transactions против колоночного хранилища.
+
+Запуск (временная база SQLite):
+    python Benchmarks/bench_columnar.py --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from common import use_sqlite, fill_transactions
+from Library.db_manager import get_transactions, get_query_cache
+from Library.columnar import fetch_transaction_columns
+
+def measure(load):
+    """Время и пик памяти Python-объектов при загрузке"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows)
+        get_query_cache().enabled = False
+
+        rows, rows_time, rows_peak = measure(get_transactions)
+        columns, columns_time, columns_peak = measure(fetch_transaction_columns)
+
+        assert len(rows) == len(columns) == args.rows, "количество строк расходится"
+        for index in (0, len(rows) // 2, len(rows) - 1):
+            assert rows[index]['id'] == columns[index]['id'], "порядок строк расходится"
+        print(f"Строк: {args.rows}")
+        print(f"Список словарей: {rows_time:.3f} с, пик {rows_peak / 2**20:.1f} МБ")
+        print(f"Колонки NumPy:   {columns_time:.3f} с, пик {columns_peak / 2**20:.1f} МБ, "
+              f"хранение {columns.nbytes / 2**20:.1f} МБ ({columns.nbytes / len(columns):.1f} байт/строка)")
+        backend.close()
+
+if __name__ == "__main__":
+    main()
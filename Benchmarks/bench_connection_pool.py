@@ -0,0 +1,55 @@
+"""Сравнение пропускной способности: новое соединение на каждый запрос против пула.
+
+Запуск (нужен доступный MySQL из Scripts/config.ini):
+    python Benchmarks/bench_connection_pool.py --queries 500
+"""
+import argparse
+import configparser
+import os
+import sys
+import time
+
+import mysql.connector
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library.db_manager import CONFIG_PATH, execute_query
+
+QUERY = "SELECT id, name, type FROM categories"
+
+def query_without_pool() -> None:
+    """Старое поведение: чтение config.ini и новое соединение на каждый запрос"""
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+    db_config = {key: config['DATABASE'][key] for key in ('host', 'user', 'password', 'database')}
+    with mysql.connector.connect(**db_config) as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(QUERY)
+        cursor.fetchall()
+        conn.commit()
+
+def query_with_pool() -> None:
+    """Новое поведение: кэшированная конфигурация и соединение из пула"""
+    execute_query(QUERY)
+
+def measure(func, queries: int) -> float:
+    """Количество запросов в секунду"""
+    func()  # прогрев
+    started = time.perf_counter()
+    for _ in range(queries):
+        func()
+    return queries / (time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    before = measure(query_without_pool, args.queries)
+    after = measure(query_with_pool, args.queries)
+    print(f"Без пула: {before:.1f} запросов/с")
+    print(f"С пулом:  {after:.1f} запросов/с")
+    print(f"Ускорение: x{after / before:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Пропускная способность импорта выписок: пакетная вставка против построчной.
+
+Запуск (используется временная база SQLite, внешние сервисы не нужны):
+    python Benchmarks/bench_import.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import use_sqlite
+
+from Library.db_manager import set_backend, add_transaction
+from Library.importer import import_transactions, CategoryMapper, read_csv_transactions
+
+CATEGORIES = ['Зарплата', 'Фриланс', 'Продукты', 'Транспорт', 'Коммунальные услуги', 'Развлечения']
+
+def write_statement(path: str, rows: int, seed: int = 42) -> None:
+    """Генерация CSV-выписки заданного размера"""
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file, delimiter=';')
+        writer.writerow(['Дата', 'Сумма', 'Описание', 'Категория'])
+        for i in range(rows):
+            category = rnd.choice(CATEGORIES)
+            sign = '' if category in ('Зарплата', 'Фриланс') else '-'
+            writer.writerow([(start + timedelta(days=rnd.randrange(3650))).isoformat(),
+                             f"{sign}{rnd.uniform(1, 5000):.2f}".replace('.', ','),
+                             f"Операция {i}", category])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--rowwise-sample', type=int, default=5_000,
+                        help='сколько строк вставить построчно для сравнения')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = os.path.join(tmp, 'statement.csv')
+        write_statement(statement, args.rows)
+
+        use_sqlite(os.path.join(tmp, 'batched.db'))
+        started = time.perf_counter()
+        imported = import_transactions(statement, progress=lambda n: print(f"\r{n}", end='', file=sys.stderr))
+        batched = imported / (time.perf_counter() - started)
+        print(file=sys.stderr)
+
+        use_sqlite(os.path.join(tmp, 'rowwise.db'))
+        mapper = CategoryMapper()
+        rows = read_csv_transactions(statement)
+        started = time.perf_counter()
+        for _ in range(args.rowwise_sample):
+            add_transaction(*mapper.map(next(rows)))
+        rowwise = args.rowwise_sample / (time.perf_counter() - started)
+        set_backend(None)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Импортировано строк: {imported}")
+    print(f"Пакетная вставка:    {batched:,.0f} строк/с")
+    print(f"Построчная вставка:  {rowwise:,.0f} строк/с")
+    print(f"Пиковая память процесса: {peak_mb:.0f} МБ")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Обновление встроенных графиков: загрузка данных, перенос в артисты и перерисовка холста.
+
+Холст - FigureCanvasAgg (та же отрисовка, что у FigureCanvasTkAgg, без окна).
+Новая операция рисуется поверх сохраненного фона, смена данных - целиком.
+Для сравнения - построение линейного графика и диаграммы категорий с сохранением в PNG.
+Запуск (используется временная база SQLite):
+    python Benchmarks/bench_live_charts.py --rows 200000 --days 365
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import use_sqlite, fill_transactions
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from Library import db_manager
+from Library.live_charts import LiveCharts
+from Library.report_generator import load_chart_series, load_report_data, render_line_chart, render_bar_chart
+
+def median_ms(run, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    start_date = (date.today() - timedelta(days=args.days - 1)).isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows, days=args.days)
+        db_manager.get_query_cache().enabled = False
+
+        series = load_chart_series(start_date)
+        charts = LiveCharts()
+        charts.attach(FigureCanvasAgg(charts.figure))
+        load_time = median_ms(lambda: load_chart_series(start_date), args.repeat)
+
+        def full_update():
+            charts.set_data(series['dates'], series['net'], series['expense'])
+            charts.background = None  # как при смене фильтра с новыми пределами осей
+            charts.redraw()
+
+        def add_transaction():
+            charts.add_transaction(date.today().isoformat(), 10.0, 'expense', next(iter(series['expense'])))
+            charts.redraw()
+
+        full_update()  # первая отрисовка (шрифты, кэши matplotlib)
+        full_time = median_ms(full_update, args.repeat)
+        add_time = median_ms(add_transaction, args.repeat)
+        charts.export_png(os.path.join(tmp, 'live.png'))
+        export_size = os.path.getsize(os.path.join(tmp, 'live.png'))
+
+        data = load_report_data(start_date, None)
+        png_time = median_ms(lambda: (render_line_chart(data, tmp + os.sep, 'bench'),
+                                      render_bar_chart(data, tmp + os.sep, 'bench')), max(args.repeat // 4, 1))
+        db_manager.set_backend(None)
+
+    print(f"Дней: {len(series['dates'])}, категорий расходов: {len(series['expense'])}")
+    print(f"Загрузка данных (load_chart_series): {load_time:.1f} мс")
+    print(f"Новые данные + полная перерисовка:   {full_time:.1f} мс")
+    print(f"Новая операция + перерисовка (blit): {add_time:.1f} мс")
+    print(f"Сохранение в PNG по кнопке:          {export_size} байт")
+    print(f"Линейный и столбчатый график в PNG:  {png_time:.1f} мс")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Отчет по 12 месяцам: 12 вызовов generate_text_report против одного build_period_report.
+
+Запуск (временная база SQLite):
+    python Benchmarks/bench_period_report.py --rows 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from common import use_sqlite, fill_transactions
+from Library.period_report import month_periods, build_period_report
+from Library.report_generator import generate_text_report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    args = parser.parse_args()
+
+    periods = month_periods(date.today().year - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows, days=730)
+
+        started = time.perf_counter()
+        for _, start, end in periods:
+            generate_text_report(start.isoformat(), end.isoformat())
+        separate = time.perf_counter() - started
+
+        started = time.perf_counter()
+        build_period_report(periods)
+        single = time.perf_counter() - started
+        backend.close()
+
+    print(f"12 x generate_text_report (без сравнения и окон): {separate:.3f} с")
+    print(f"build_period_report (год назад, окна 30/90):      {single:.3f} с")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Поиск по описанию: полнотекстовый индекс против LIKE '%...%'.
+
+Запуск (временная база SQLite):
+    python Benchmarks/bench_search.py --rows 1000000
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from common import use_sqlite, fill_transactions
+from Library.db_manager import execute_query, get_transactions, get_transactions_page, get_query_cache
+
+SYLLABLES = ['ма', 'ка', 'ро', 'ле', 'ни', 'то', 'ва', 'су', 'пе', 'ди', 'зо', 'бу', 'ги', 'ша', 'фе']
+
+def vocabulary() -> list:
+    """Около трех тысяч слов из трех слогов"""
+    return [''.join(parts) for parts in itertools.product(SYLLABLES, repeat=3)]
+
+def timed(run, repeat: int = 5):
+    """Лучшее время из repeat запусков и результат"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    words = vocabulary()
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows, days=3650, words=words)
+        get_query_cache().enabled = False
+
+        word, prefix = words[123], words[456][:4]
+        like_time, like_rows = timed(lambda: execute_query(
+            "SELECT COUNT(*) AS count FROM transactions WHERE description LIKE %s", (f"%{word}%",)), repeat=1)
+        token_time, token_rows = timed(lambda: get_transactions(search=word))
+        prefix_time, prefix_rows = timed(lambda: get_transactions(search=f"{prefix}*"))
+        page_time, _ = timed(lambda: get_transactions_page(search=f"{prefix}*", limit=200))
+        combined_time, combined_rows = timed(lambda: get_transactions(search=word, category_id=3, min_amount=1000))
+
+        assert like_rows[0]['count'] == len(token_rows), "результаты LIKE и индекса расходятся"
+        print(f"Строк: {args.rows}")
+        print(f"LIKE '%{word}%':        {like_time * 1000:.1f} мс ({len(token_rows)} строк)")
+        print(f"Слово '{word}':          {token_time * 1000:.1f} мс")
+        print(f"Префикс '{prefix}*':      {prefix_time * 1000:.1f} мс ({len(prefix_rows)} строк)")
+        print(f"Префикс, страница 200:  {page_time * 1000:.1f} мс")
+        print(f"Слово + фильтры:        {combined_time * 1000:.1f} мс ({len(combined_rows)} строк)")
+        backend.close()
+
+if __name__ == "__main__":
+    main()
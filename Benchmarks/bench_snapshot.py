@@ -0,0 +1,56 @@
+"""Загрузка транзакций для отчетов: из БД против снимка Arrow, и стоимость инкрементальной выгрузки.
+
+Запуск (временная база SQLite, нужен pyarrow):
+    python Benchmarks/bench_snapshot.py --rows 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import use_sqlite, fill_transactions
+from Library.db_manager import get_query_cache, read_config
+from Library.report_generator import load_transactions_frame, load_report_data
+from Library.snapshot import TransactionSnapshot
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--increment', type=int, default=10_000, help='строк, добавляемых перед повторной выгрузкой')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        fill_transactions(args.rows)
+        get_query_cache().enabled = False
+        # Отчеты берут снимок по пути из config.ini: подменяем его временной папкой
+        read_config()['SNAPSHOT']['path'] = os.path.join(tmp, 'snapshot')
+        snapshot = TransactionSnapshot()
+
+        exported, full_time = timed(snapshot.export)
+        fill_transactions(args.increment, seed=7)
+        added, increment_time = timed(snapshot.export)
+        assert exported == args.rows and added == args.increment, "выгружены не все строки"
+
+        db_frame, db_time = timed(lambda: load_transactions_frame(None, None))
+        snapshot_frame, snapshot_time = timed(lambda: load_transactions_frame(None, None, 'snapshot'))
+        assert len(db_frame) == len(snapshot_frame), "количество строк расходится"
+        _, db_report_time = timed(lambda: load_report_data(None, None))
+        _, snapshot_report_time = timed(lambda: load_report_data(None, None, 'snapshot'))
+
+        print(f"Строк: {len(db_frame)}")
+        print(f"Полная выгрузка снимка:       {full_time:.3f} с")
+        print(f"Выгрузка {args.increment} новых строк:  {increment_time:.3f} с")
+        print(f"DataFrame из БД:              {db_time:.3f} с")
+        print(f"DataFrame из снимка:          {snapshot_time:.3f} с")
+        print(f"Агрегаты из сводных таблиц:   {db_report_time:.3f} с")
+        print(f"Агрегаты по снимку:           {snapshot_report_time:.3f} с")
+        backend.close()
+
+if __name__ == "__main__":
+    main()
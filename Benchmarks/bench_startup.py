@@ -0,0 +1,43 @@
+"""Время до первой отрисовки окна (требуется дисплей; сам config.ini задает хранилище).
+
+Запускает Scripts/main.py --profile-startup несколько раз и проверяет, что окно
+отрисовывается быстрее порога и без загрузки pandas/matplotlib:
+    python Benchmarks/bench_startup.py --runs 5 --max-first-paint 1.0
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library.startup_profile import run_profiled
+
+MAIN_SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, 'Scripts', 'main.py'))
+FIRST_PAINT = "первая отрисовка"
+FIRST_PAGE = "первая страница операций"
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-first-paint', type=float, default=1.0, help='порог в секундах')
+    args = parser.parse_args()
+
+    paints, pages, heavy = [], [], set()
+    for _ in range(args.runs):
+        phases = {phase: (at, modules) for phase, at, modules in run_profiled(MAIN_SCRIPT)['phases']}
+        paints.append(phases[FIRST_PAINT][0])
+        pages.append(phases[FIRST_PAGE][0])
+        heavy.update(phases[FIRST_PAINT][1])
+
+    first_paint = statistics.median(paints)
+    print(f"Первая отрисовка (медиана {args.runs}): {first_paint * 1000:.0f} мс")
+    print(f"Первая страница операций:            {statistics.median(pages) * 1000:.0f} мс")
+    print(f"Тяжелые модули до отрисовки:         {', '.join(sorted(heavy)) or 'нет'}")
+    if heavy or first_paint > args.max_first_paint:
+        print("Регрессия времени запуска")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Потоковое чтение: пик памяти экспорта и отчета не зависит от размера таблицы.
+
+Запуск (временная база SQLite; заполнение 5 млн строк занимает несколько минут):
+    python Benchmarks/bench_streaming.py --rows 5000000 --max-megabytes 64
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from common import use_sqlite, fill_transactions
+from Library.report_generator import export_transactions_csv, stream_totals_by_date
+
+def measure(name: str, run, limit: int) -> None:
+    """Время и пик памяти Python-объектов; превышение limit байт - ошибка"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {elapsed:.2f} с, пик {peak / 2**20:.1f} МБ")
+    assert peak <= limit, f"{name}: пик памяти {peak / 2**20:.1f} МБ превышает {limit / 2**20:.0f} МБ"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--max-megabytes', type=int, default=64)
+    args = parser.parse_args()
+    limit = args.max_megabytes * 2**20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        started = time.perf_counter()
+        fill_transactions(args.rows, days=3650)
+        print(f"Заполнение {args.rows} строк: {time.perf_counter() - started:.1f} с")
+
+        export_path = os.path.join(tmp, 'export.csv')
+        measure("Экспорт CSV", lambda: export_transactions_csv(filename=export_path, chunk_size=args.chunk_size), limit)
+        measure("Итоги по месяцам", lambda: stream_totals_by_date(freq='month', chunk_size=args.chunk_size), limit)
+        backend.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Общие функции скриптов замера: временная база и синтетические транзакции."""
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library.db_manager import set_backend, get_categories, add_transactions
+from Library.migrations import apply_migrations
+from Library.storage import SQLiteBackend
+
+def use_sqlite(path: str) -> SQLiteBackend:
+    """Подключение временной базы SQLite (со всеми миграциями) вместо хранилища из config.ini"""
+    backend = SQLiteBackend(path)
+    set_backend(backend)
+    apply_migrations()
+    return backend
+
+def fill_transactions(rows: int, days: int = 365, seed: int = 42, chunk_size: int = 50_000,
+                      words: List[str] = None) -> None:
+    """Заполнение базы случайными транзакциями за последние days дней.
+
+    Если передан words, описание составляется из трех случайных слов списка.
+    """
+    rnd = random.Random(seed)
+    categories = get_categories()
+    start = date.today() - timedelta(days=days - 1)
+    written = 0
+    while written < rows:
+        chunk = []
+        for i in range(written, min(written + chunk_size, rows)):
+            category = rnd.choice(categories)
+            chunk.append(((start + timedelta(days=rnd.randrange(days))).isoformat(),
+                          round(rnd.uniform(1, 5000), 2), category['id'],
+                          " ".join(rnd.sample(words, 3)) if words else f"Операция {i}", category['type']))
+        written += add_transactions(chunk)
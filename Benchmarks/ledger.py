@@ -0,0 +1,72 @@
+"""Детерминированный генератор синтетической книги операций с реалистичными категориями.
+
+Одинаковые seed и параметры всегда дают одни и те же строки, поэтому результаты
+замеров разных запусков можно сравнивать между собой.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+# (название, тип, доля операций, медиана суммы, разброс (sigma логнормального), описания)
+CATEGORIES: List[Tuple[str, str, float, float, float, Tuple[str, ...]]] = [
+    ('Зарплата', 'income', 0.010, 95000, 0.15, ('Зарплата', 'Аванс', 'Премия')),
+    ('Фриланс', 'income', 0.015, 12000, 0.8, ('Оплата заказа', 'Перевод от клиента', 'Консультация')),
+    ('Проценты', 'income', 0.005, 450, 0.6, ('Проценты по вкладу', 'Кэшбэк')),
+    ('Продукты', 'expense', 0.300, 850, 0.7, ('Пятерочка', 'Магнит', 'Перекресток', 'ВкусВилл', 'Лента', 'Рынок')),
+    ('Кафе и рестораны', 'expense', 0.120, 650, 0.6, ('Кофейня', 'Столовая', 'Пиццерия', 'Суши', 'Бургерная')),
+    ('Транспорт', 'expense', 0.180, 60, 0.5, ('Метро', 'Автобус', 'Такси', 'Каршеринг', 'Электричка')),
+    ('Автомобиль', 'expense', 0.040, 2500, 0.5, ('АЗС Лукойл', 'АЗС Роснефть', 'Мойка', 'Парковка', 'Шиномонтаж')),
+    ('Коммунальные услуги', 'expense', 0.012, 6500, 0.3, ('Квартплата', 'Электроэнергия', 'Водоснабжение', 'Газ')),
+    ('Связь и интернет', 'expense', 0.012, 700, 0.3, ('Мобильная связь', 'Домашний интернет', 'Телевидение')),
+    ('Здоровье', 'expense', 0.040, 1500, 0.9, ('Аптека', 'Клиника', 'Стоматология', 'Анализы')),
+    ('Одежда', 'expense', 0.030, 3500, 0.8, ('Магазин одежды', 'Обувь', 'Маркетплейс')),
+    ('Развлечения', 'expense', 0.060, 1200, 0.8, ('Кино', 'Театр', 'Концерт', 'Подписка', 'Книги', 'Игры')),
+    ('Подарки', 'expense', 0.015, 3000, 0.8, ('Подарок', 'Цветы', 'Сувениры')),
+    ('Путешествия', 'expense', 0.010, 18000, 1.0, ('Авиабилеты', 'Гостиница', 'Ж/д билеты', 'Экскурсия')),
+    ('Образование', 'expense', 0.010, 5000, 0.7, ('Курсы', 'Учебники', 'Репетитор')),
+    ('Дом', 'expense', 0.020, 2000, 0.9, ('Хозтовары', 'Мебель', 'Ремонт', 'Бытовая техника')),
+]
+
+def ensure_categories(get_categories, add_category) -> Dict[str, int]:
+    """Создание недостающих категорий генератора, возвращает id по названию"""
+    existing = {cat['name'] for cat in get_categories()}
+    for name, type_, *_ in CATEGORIES:
+        if name not in existing:
+            add_category(name, type_)
+    return {cat['name']: cat['id'] for cat in get_categories()}
+
+def generate_ledger(rows: int, category_ids: Dict[str, int], end: date = date(2025, 12, 31),
+                    days: int = 3 * 365, seed: int = 42, chunk_size: int = 100_000) -> Iterator[List[tuple]]:
+    """Пачки строк (date, amount, category_id, description, type) для add_transactions.
+
+    Категория выбирается по долям CATEGORIES, сумма - логнормальная вокруг медианы
+    категории, описание - одно из типичных для категории с номером чека.
+    Расходов по выходным больше, дата распределена по последним days дням до end.
+    """
+    rng = np.random.default_rng(seed)
+    shares = np.array([share for _, _, share, *_ in CATEGORIES])
+    shares /= shares.sum()
+    # Вес дня: выходные (сб, вс) в полтора раза активнее будних дней
+    first = end - timedelta(days=days - 1)
+    weekdays = (np.arange(days) + first.weekday()) % 7
+    day_weights = np.where(weekdays >= 5, 1.5, 1.0)
+    day_weights /= day_weights.sum()
+    ordinals = first.toordinal() + np.arange(days)
+
+    written = 0
+    while written < rows:
+        count = min(chunk_size, rows - written)
+        categories = rng.choice(len(CATEGORIES), size=count, p=shares)
+        day_index = rng.choice(days, size=count, p=day_weights)
+        noise = rng.standard_normal(count)
+        picks = rng.random(count)
+        chunk = []
+        for i in range(count):
+            name, type_, _, median, sigma, descriptions = CATEGORIES[categories[i]]
+            amount = round(max(median * float(np.exp(sigma * noise[i])), 1.0), 2)
+            description = f"{descriptions[int(picks[i] * len(descriptions))]} #{written + i}"
+            chunk.append((date.fromordinal(int(ordinals[day_index[i]])).isoformat(), amount,
+                          category_ids[name], description, type_))
+        written += count
+        yield chunk
@@ -0,0 +1,169 @@
+"""Набор замеров: запросы db_manager, функции report_generator и заполнение таблицы операций.
+
+Для каждого размера создается временная база SQLite с синтетической книгой операций
+(Benchmarks/ledger.py), результаты сохраняются в JSON для сравнения между запусками:
+    python Benchmarks/run_suite.py --rows 10000 100000 1000000
+    python Benchmarks/run_suite.py --rows 100000 --compare Benchmarks/results/20250101_120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Any, List
+
+from common import use_sqlite
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Scripts'))  # transaction_table
+from ledger import ensure_categories, generate_ledger
+from Library import db_manager
+from Library.db_manager import (get_categories, add_category, add_transactions, get_transactions,
+                                get_transactions_page, get_totals_by_type, get_sums_by_category,
+                                get_daily_totals, get_query_cache)
+from Library import report_generator
+from Library.instrumentation import instrumentation
+from Library.columnar import fetch_transaction_columns, get_transaction_columns_page
+from Library.period_report import build_period_report, month_periods
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+LEDGER_END = date(2025, 12, 31)
+
+def measure(run: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Лучшее и медианное время repeat запусков, секунды"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return {'best': min(times), 'median': statistics.median(times), 'runs': repeat}
+
+def table_fill(page: List[Dict[str, Any]]) -> Callable[[], None]:
+    """Заполнение таблицы операций страницей: в Treeview, если есть дисплей, иначе только форматирование строк"""
+    from transaction_table import format_transaction
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        from transaction_table import COLUMNS
+        root = tk.Tk()
+        root.withdraw()
+        tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+    except Exception:
+        return lambda: [format_transaction(trans) for trans in page]
+
+    def fill():
+        tree.delete(*tree.get_children())
+        for trans in page:
+            tree.insert("", "end", iid=str(trans['id']), values=format_transaction(trans))
+        root.update_idletasks()
+    return fill
+
+def cases(tmp: str) -> Dict[str, Callable[[], Any]]:
+    """Замеряемые операции на заполненной базе"""
+    month_start, month_end = '2025-11-01', '2025-11-30'
+    last_30 = ((LEDGER_END - timedelta(days=29)).isoformat(), LEDGER_END.isoformat())
+    page = get_transactions_page(limit=200)
+    after = (page[-1]['date'], page[-1]['id'])
+    data = report_generator.load_report_data(*last_30)
+    frame = report_generator.load_transactions_frame(month_start, month_end)
+    graphics_path = tmp + os.sep
+    return {
+        'db.get_transactions(месяц)': lambda: get_transactions(month_start, month_end),
+        'db.get_transactions(категория, сумма)': lambda: get_transactions(category_id=4, min_amount=1000),
+        'db.get_transactions_page(первая)': lambda: get_transactions_page(limit=200),
+        'db.get_transactions_page(после)': lambda: get_transactions_page(after=after, limit=200),
+        'db.get_transactions_page(поиск)': lambda: get_transactions_page(search='такси', limit=200),
+        'db.get_totals_by_type(все)': lambda: get_totals_by_type(),
+        'db.get_sums_by_category(месяц)': lambda: get_sums_by_category(month_start, month_end),
+        'db.get_daily_totals(все)': lambda: get_daily_totals(),
+        'columnar.fetch_transaction_columns(месяц)': lambda: fetch_transaction_columns(month_start, month_end),
+        'report.load_report_data(30 дней)': lambda: report_generator.load_report_data(*last_30),
+        'report.generate_text_report(30 дней)': lambda: report_generator.generate_text_report(*last_30),
+        'report.load_transactions_frame(месяц)': lambda: report_generator.load_transactions_frame(month_start, month_end),
+        'report.balance_over_time(месяц)': lambda: report_generator.balance_over_time(frame, 'day'),
+        'report.stream_totals_by_date(все, месяц)': lambda: report_generator.stream_totals_by_date(freq='month'),
+        'report.export_transactions_csv(месяц)': lambda: report_generator.export_transactions_csv(
+            month_start, month_end, filename=os.path.join(tmp, 'export.csv')),
+        'report.render_pie_charts': lambda: report_generator.render_pie_charts(data, graphics_path),
+        'report.render_line_chart': lambda: report_generator.render_line_chart(data, graphics_path),
+        'report.render_bar_chart': lambda: report_generator.render_bar_chart(data, graphics_path),
+        'report.build_period_report(год)': lambda: build_period_report(month_periods(LEDGER_END.year)),
+        'table.fill(страница 200)': table_fill(get_transaction_columns_page(limit=200)),
+    }
+
+def run_size(rows: int, repeat: int, seed: int, instrumented: bool = False) -> Dict[str, Any]:
+    """Заполнение временной базы и замеры для одного размера"""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = use_sqlite(os.path.join(tmp, 'bench.db'))
+        category_ids = ensure_categories(get_categories, add_category)
+        started = time.perf_counter()
+        for chunk in generate_ledger(rows, category_ids, end=LEDGER_END, seed=seed):
+            add_transactions(chunk)
+        results = {'load_seconds': time.perf_counter() - started, 'cases': {}}
+        print(f"{rows} строк: заполнение {results['load_seconds']:.1f} с")
+
+        # Замеряется сама работа, а не кэши результатов
+        get_query_cache().enabled = False
+        db_manager.read_config()['REPORTS']['chart_cache'] = 'false'
+        instrumentation.enabled = instrumented
+        for name, run in cases(tmp).items():
+            results['cases'][name] = measure(run, repeat)
+            print(f"  {name:<48}{results['cases'][name]['best'] * 1000:>10.1f} мс")
+        backend.close()
+        db_manager.set_backend(None)
+    return results
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Отношение лучших времен к предыдущему запуску по совпадающим размерам и операциям"""
+    print(f"\nСравнение с {previous['meta']['timestamp']} ({previous['meta'].get('revision', '')}):")
+    for rows, result in current['sizes'].items():
+        old = previous['sizes'].get(rows)
+        if old is None:
+            continue
+        print(f"{rows} строк:")
+        for name, timing in result['cases'].items():
+            if name in old['cases']:
+                ratio = timing['best'] / old['cases'][name]['best']
+                flag = '  медленнее' if ratio > 1.2 else ''
+                print(f"  {name:<48}x{ratio:>6.2f}{flag}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='файл результатов (по умолчанию Benchmarks/results/<время>.json)')
+    parser.add_argument('--compare', help='JSON предыдущего запуска для сравнения')
+    parser.add_argument('--instrumentation', action='store_true',
+                        help='замеры со включенной диагностикой (для оценки ее накладных расходов)')
+    args = parser.parse_args()
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    results = {
+        'meta': {'timestamp': timestamp, 'revision': git_revision(), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'backend': 'sqlite', 'seed': args.seed, 'repeat': args.repeat,
+                 'instrumentation': args.instrumentation},
+        'sizes': {str(rows): run_size(rows, args.repeat, args.seed, args.instrumentation) for rows in args.rows},
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    print(f"Результаты: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as previous_file:
+            compare(results, json.load(previous_file))
+
+if __name__ == "__main__":
+    main()
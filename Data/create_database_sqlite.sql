@@ -0,0 +1,27 @@
+-- Схема для встроенного хранилища SQLite (повторяет create_database.sql)
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE NOT NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    category_id INTEGER,
+    description TEXT,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (category_id) REFERENCES categories(id)
+);
+
+-- Добавляем базовые категории
+INSERT INTO categories (name, type) VALUES
+('Зарплата', 'income'),
+('Фриланс', 'income'),
+('Продукты', 'expense'),
+('Транспорт', 'expense'),
+('Коммунальные услуги', 'expense'),
+('Развлечения', 'expense');
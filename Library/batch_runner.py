@@ -0,0 +1,109 @@
+import configparser
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+from .db_manager import read_config
+
+# Модули отчетов (pandas, matplotlib) импортируются внутри задач, только когда они нужны
+JOB_KINDS = ('text', 'charts', 'year', 'export', 'snapshot', 'categorize')
+
+def resolve_period(job: Dict[str, str]) -> Tuple[str, str]:
+    """Период задачи: start/end (ГГГГ-ММ-ДД) или days - последние N дней по сегодня"""
+    if 'days' in job:
+        end = date.today()
+        return (end - timedelta(days=int(job['days']))).isoformat(), end.isoformat()
+    if 'start' not in job or 'end' not in job:
+        raise ValueError("Нужно указать start и end или days")
+    return job['start'], job['end']
+
+def run_text(name: str, job: Dict[str, str]) -> List[str]:
+    from .report_generator import generate_text_report
+    start_date, end_date = resolve_period(job)
+    filename = os.path.join(read_config()['REPORTS']['export_path'],
+                            f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    with open(filename, 'w', encoding='utf-8') as report_file:
+        report_file.write(generate_text_report(start_date, end_date, job.get('source', 'db')))
+    return [filename]
+
+def run_charts(name: str, job: Dict[str, str]) -> List[str]:
+    from .report_generator import CHART_TYPES, SerialExecutor, generate_charts
+    start_date, end_date = resolve_period(job)
+    charts = job.get('charts', ' '.join(CHART_TYPES)).split()
+    # Графики строятся в процессе задачи: параллельность обеспечивает пул run_schedule
+    results = generate_charts(start_date, end_date, charts, executor=SerialExecutor(), source=job.get('source', 'db'))
+    files = []
+    for result in results.values():
+        files.extend(result if isinstance(result, list) else [result])
+    return files
+
+def run_year(name: str, job: Dict[str, str]) -> List[str]:
+    from .period_report import build_period_report, export_period_report, month_periods
+    year = int(job.get('year', date.today().year))
+    windows = [int(window) for window in job.get('windows', '30 90').split()]
+    report = build_period_report(month_periods(year), windows)
+    return list(export_period_report(report, prefix=f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}").values())
+
+def run_export(name: str, job: Dict[str, str]) -> List[str]:
+    from .report_generator import export_transactions_csv
+    start_date, end_date = resolve_period(job) if 'days' in job or 'start' in job else (None, None)
+    filename = os.path.join(read_config()['REPORTS']['export_path'],
+                            f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    return [export_transactions_csv(start_date, end_date, search=job.get('search'), filename=filename)]
+
+def run_snapshot(name: str, job: Dict[str, str]) -> List[str]:
+    from .snapshot import export_snapshot
+    result = export_snapshot(rebuild=job.get('rebuild', 'false').lower() == 'true',
+                             compact=job.get('compact', 'false').lower() == 'true')
+    return [f"{result['path']}: выгружено {result['exported']}, всего {result['rows']} (id <= {result['max_id']})"]
+
+def run_categorize(name: str, job: Dict[str, str]) -> List[str]:
+    from .categorizer import categorize_transactions
+    result = categorize_transactions(rebuild=job.get('rebuild', 'false').lower() == 'true',
+                                     apply=job.get('apply', 'true').lower() == 'true')
+    return [f"{result['path']}: обучено на {result['trained']} новых строках, всего {result['rows']} "
+            f"(id <= {result['watermark']}), назначено категорий: {result['assigned']}"]
+
+RUNNERS: Dict[str, Callable[[str, Dict[str, str]], List[str]]] = {
+    'text': run_text, 'charts': run_charts, 'year': run_year, 'export': run_export, 'snapshot': run_snapshot,
+    'categorize': run_categorize,
+}
+
+def run_job(name: str, job: Dict[str, str]) -> Tuple[str, List[str], float]:
+    """Выполнение одной задачи: (имя, созданные файлы или сообщения, время в секундах)"""
+    started = time.perf_counter()
+    kind = job.get('report')
+    if kind not in RUNNERS:
+        raise ValueError(f"Неизвестный тип отчета '{kind}' (допустимы: {', '.join(JOB_KINDS)})")
+    return name, RUNNERS[kind](name, job), time.perf_counter() - started
+
+def load_schedule(path: str) -> Dict[str, Dict[str, str]]:
+    """Чтение файла расписания: каждая секция INI - задача с параметром report и периодом"""
+    schedule = configparser.ConfigParser()
+    if not schedule.read(path, encoding='utf-8'):
+        raise FileNotFoundError(path)
+    return {name: dict(schedule[name]) for name in schedule.sections()}
+
+def run_schedule(jobs: Dict[str, Dict[str, str]], workers: int = None,
+                 on_result: Callable[[str, List[str], float], None] = None,
+                 on_error: Callable[[str, BaseException], None] = None) -> int:
+    """Параллельный запуск задач в пуле процессов, возвращает число неудачных задач"""
+    if not jobs:
+        return 0
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(run_job, name, job): name for name, job in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                failed += 1
+                if on_error:
+                    on_error(futures[future], error)
+                continue
+            if on_result:
+                on_result(*result)
+    return failed
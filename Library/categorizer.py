@@ -0,0 +1,264 @@
+import os
+import pickle
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.utils import murmurhash3_32
+from .db_manager import read_config, execute_query, iterate_query, get_categories, assign_categories, PROJECT_ROOT
+
+MODEL_VERSION = 1
+N_FEATURES = 2 ** 16
+AMOUNT_BINS = 24  # три интервала на порядок суммы, от 1 до 10^8
+SUGGESTION_CACHE_SIZE = 1024
+DIGITS = re.compile(r'\d+')
+
+# Обучающие строки: только с существующей категорией того же типа, что и операция
+TRAINING_QUERY = """
+    SELECT t.id, t.description, t.amount, t.type, t.category_id
+    FROM transactions t
+    JOIN categories c ON t.category_id = c.id AND c.type = t.type
+    WHERE t.id > %s
+    ORDER BY t.id
+    """
+UNCATEGORIZED_QUERY = """
+    SELECT id, date, amount, type, description
+    FROM transactions
+    WHERE category_id IS NULL AND id > %s
+    ORDER BY id
+    LIMIT %s
+    """
+
+def normalize_description(text: Optional[str]) -> str:
+    """Описание для признаков: нижний регистр, числа (номера чеков, карт, даты) заменены на 0"""
+    return DIGITS.sub('0', (text or '').lower())
+
+def get_model_path() -> str:
+    """Файл модели из секции [CATEGORIZER] в config.ini"""
+    path = read_config().get('CATEGORIZER', 'model_path', fallback='Data/categorizer.pkl')
+    return os.path.join(PROJECT_ROOT, path)
+
+def get_chunk_size() -> int:
+    return read_config().getint('CATEGORIZER', 'chunk_size', fallback=5000)
+
+class TransactionCategorizer:
+    """Подбор категории операции по описанию, сумме и типу.
+
+    Описание переводится в признаки HashingVectorizer (символьные n-граммы без словаря,
+    поэтому новые описания не требуют переобучения векторизатора), сумма - в номер
+    интервала на логарифмической шкале, тип - в отдельный признак. SGDClassifier
+    дообучается partial_fit только на транзакциях с id больше отметки; модель вместе
+    с отметкой и справочником категорий сохраняется на диск. Классы SGDClassifier
+    задаются при первом обучении, поэтому при изменении списка категорий модель
+    обучается заново. Категории предсказываются для пачки строк одним умножением
+    разреженной матрицы признаков на веса, среди категорий того же типа.
+    """
+
+    def __init__(self, path: str = None, min_confidence: float = None):
+        self.path = path or get_model_path()
+        self.min_confidence = min_confidence if min_confidence is not None else \
+            read_config().getfloat('CATEGORIZER', 'min_confidence', fallback=0.5)
+        self.vectorizer = HashingVectorizer(analyzer='char_wb', ngram_range=(3, 4), n_features=N_FEATURES,
+                                            alternate_sign=False, preprocessor=normalize_description)
+        self.model: Optional[SGDClassifier] = None
+        self.categories: Optional[List[List[Any]]] = None  # [id, тип] категорий на момент обучения
+        self.watermark = 0
+        self.rows = 0
+        self.updated: Optional[float] = None
+        self._analyzer = self.vectorizer.build_analyzer()
+        self._suggestions: OrderedDict = OrderedDict()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.model is not None and self.rows > 0
+
+    def load(self) -> bool:
+        """Загрузка модели с диска; False, если файла нет или он от другой версии"""
+        try:
+            with open(self.path, 'rb') as model_file:
+                state = pickle.load(model_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if state.get('version') != MODEL_VERSION:
+            return False
+        self.model = state['model']
+        self.categories = state['categories']
+        self.watermark = state['watermark']
+        self.rows = state['rows']
+        self.updated = state['updated']
+        self._prepare()
+        return True
+
+    def save(self) -> None:
+        """Сохранение модели (через временный файл)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as model_file:
+            pickle.dump({'version': MODEL_VERSION, 'model': self.model, 'categories': self.categories,
+                         'watermark': self.watermark, 'rows': self.rows, 'updated': self.updated},
+                        model_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+
+    def _reset(self, categories: List[List[Any]]) -> None:
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-6, random_state=0)
+        self.categories = categories
+        self.watermark = 0
+        self.rows = 0
+
+    def _prepare(self) -> None:
+        """Веса и типы классов для быстрого предсказания без проверок scikit-learn"""
+        self._suggestions.clear()
+        if not self.is_trained:
+            return
+        types = {category_id: type_ for category_id, type_ in self.categories}
+        self._class_ids = self.model.classes_
+        self._class_income = np.array([types[category_id] == 'income' for category_id in self._class_ids])
+        coef, intercept = self.model.coef_, self.model.intercept_
+        if len(self._class_ids) == 2:  # для двух классов модель хранит одну строку весов - второго класса
+            coef, intercept = np.vstack([-coef, coef]), np.concatenate([-intercept, intercept])
+        self._weights = np.ascontiguousarray(coef.T)
+        self._intercept = intercept
+
+    @staticmethod
+    def amount_bin(amount: Any) -> int:
+        """Номер интервала суммы на логарифмической шкале"""
+        return min(int(np.log10(abs(float(amount)) + 1) * 3), AMOUNT_BINS - 1)
+
+    def features(self, descriptions: Sequence[Optional[str]], amounts: Sequence[Any],
+                 types: Sequence[str]) -> sparse.csr_matrix:
+        """Матрица признаков: n-граммы описания, интервал суммы и тип операции"""
+        text = self.vectorizer.transform(descriptions)
+        count = text.shape[0]
+        amounts = np.abs(np.asarray(amounts, dtype=np.float64))
+        bins = np.minimum((np.log10(amounts + 1) * 3).astype(np.int64), AMOUNT_BINS - 1)
+        income = np.fromiter((type_ == 'income' for type_ in types), dtype=bool, count=count)
+        columns = np.column_stack([N_FEATURES + bins, N_FEATURES + AMOUNT_BINS + income]).ravel()
+        extra = sparse.csr_matrix((np.ones(2 * count), columns, np.arange(0, 2 * count + 1, 2)),
+                                  shape=(count, N_FEATURES + AMOUNT_BINS + 2))
+        text.resize((count, N_FEATURES + AMOUNT_BINS + 2))
+        return text + extra
+
+    def train(self, chunk_size: int = None, rebuild: bool = False) -> int:
+        """Дообучение на транзакциях с id больше отметки, возвращает число новых строк"""
+        categories = sorted([cat['id'], cat['type']] for cat in get_categories())
+        if rebuild or self.model is None or self.categories != categories:
+            self._reset(categories)
+        if len(categories) < 2:
+            return 0  # выбирать не из чего
+        classes = np.array([category_id for category_id, _ in categories])
+        trained = 0
+        for chunk in iterate_query(TRAINING_QUERY, (self.watermark,), chunk_size or get_chunk_size()):
+            ids, descriptions, amounts, types, category_ids = zip(*chunk)
+            self.model.partial_fit(self.features(descriptions, amounts, types), np.array(category_ids),
+                                   classes=classes)
+            self.watermark = ids[-1]
+            trained += len(chunk)
+        if trained:
+            self.rows += trained
+            self.updated = time.time()
+            self._prepare()
+            self.save()
+        return trained
+
+    def predict(self, descriptions: Sequence[Optional[str]], amounts: Sequence[Any],
+                types: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Категории и уверенность (0..1) для пачки строк; -1 - у типа нет категорий в модели"""
+        features = self.features(descriptions, amounts, types)
+        income = np.fromiter((type_ == 'income' for type_ in types), dtype=bool, count=len(types))
+        return self._choose(features @ self._weights + self._intercept, income)
+
+    def _row_scores(self, description: Optional[str], amount: Any, type_: str) -> np.ndarray:
+        """Оценки классов для одной строки: те же признаки, что у features, без вызова transform.
+
+        transform и проверки scikit-learn стоят сотни микросекунд на строку; здесь n-граммы
+        хэшируются так же, как в HashingVectorizer, и веса суммируются напрямую.
+        """
+        indices = {}
+        for gram in self._analyzer(description or ''):
+            h = murmurhash3_32(gram, seed=0)
+            index = (2147483647 - (N_FEATURES - 1)) % N_FEATURES if h == -2147483648 else abs(h) % N_FEATURES
+            indices[index] = indices.get(index, 0) + 1
+        scores = self._intercept.copy()
+        if indices:
+            counts = np.fromiter(indices.values(), dtype=np.float64, count=len(indices))
+            counts /= np.sqrt(counts @ counts)
+            scores += counts @ self._weights[np.fromiter(indices, dtype=np.int64, count=len(indices))]
+        scores += self._weights[N_FEATURES + self.amount_bin(amount)]
+        scores += self._weights[N_FEATURES + AMOUNT_BINS + (type_ == 'income')]
+        return scores
+
+    def _choose(self, scores: np.ndarray, income: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Лучшая категория того же типа и ее уверенность для каждой строки оценок"""
+        allowed = self._class_income[np.newaxis, :] == income[:, np.newaxis]
+        # Вероятности one-vs-rest, нормированные среди категорий того же типа
+        probabilities = np.where(allowed, 1 / (1 + np.exp(-scores)), 0.0)
+        best = probabilities.argmax(axis=1)
+        totals = probabilities.sum(axis=1)
+        confidence = np.divide(probabilities[np.arange(len(best)), best], totals,
+                               out=np.zeros(len(best)), where=totals > 0)
+        return np.where(totals > 0, self._class_ids[best], -1), confidence
+
+    def suggest(self, description: str, amount: float, type_: str) -> Optional[int]:
+        """Категория для одной операции или None, если модель не уверена (с кэшем последних ответов)"""
+        if not self.is_trained:
+            return None
+        key = (normalize_description(description).strip(), self.amount_bin(amount), type_)
+        if key in self._suggestions:
+            self._suggestions.move_to_end(key)
+            return self._suggestions[key]
+        category_ids, confidence = self._choose(self._row_scores(description, amount, type_)[np.newaxis, :],
+                                                np.array([type_ == 'income']))
+        suggestion = int(category_ids[0]) if category_ids[0] >= 0 and confidence[0] >= self.min_confidence else None
+        self._suggestions[key] = suggestion
+        if len(self._suggestions) > SUGGESTION_CACHE_SIZE:
+            self._suggestions.popitem(last=False)
+        return suggestion
+
+    def assign_uncategorized(self, chunk_size: int = None) -> int:
+        """Назначение категорий транзакциям без категории пачками, возвращает число назначенных"""
+        if not self.is_trained:
+            return 0
+        known = {cat['id'] for cat in get_categories()}
+        chunk_size = chunk_size or get_chunk_size()
+        assigned = 0
+        last_id = 0
+        while True:
+            rows = execute_query(UNCATEGORIZED_QUERY, (last_id, chunk_size))
+            if not rows:
+                return assigned
+            last_id = rows[-1]['id']
+            category_ids, confidence = self.predict([row['description'] for row in rows],
+                                                    [row['amount'] for row in rows], [row['type'] for row in rows])
+            assigned += assign_categories(
+                (row['id'], row['date'], row['amount'], row['type'], int(category_id))
+                for row, category_id, score in zip(rows, category_ids, confidence)
+                if category_id in known and score >= self.min_confidence
+            )
+
+def load_categorizer(train: bool = False) -> Optional[TransactionCategorizer]:
+    """Модель из файла, при train - дообученная на новых строках; None, если выключена или не обучена"""
+    if not read_config().getboolean('CATEGORIZER', 'enabled', fallback=True):
+        return None
+    categorizer = TransactionCategorizer()
+    categorizer.load()
+    if train:
+        categorizer.train()
+    return categorizer if categorizer.is_trained else None
+
+def categorize_transactions(rebuild: bool = False, apply: bool = True) -> Dict[str, Any]:
+    """Дообучение (или полное обучение) модели и, по запросу, назначение категорий строкам без категории"""
+    categorizer = TransactionCategorizer()
+    started = time.perf_counter()
+    if not rebuild:
+        categorizer.load()
+    trained = categorizer.train(rebuild=rebuild)
+    assigned = categorizer.assign_uncategorized() if apply else 0
+    return {'path': categorizer.path, 'trained': trained, 'rows': categorizer.rows,
+            'watermark': categorizer.watermark, 'assigned': assigned, 'seconds': time.perf_counter() - started,
+            'updated': datetime.fromtimestamp(categorizer.updated).isoformat(timespec='seconds')
+            if categorizer.updated else None}
@@ -0,0 +1,80 @@
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+class CategoryRegistry:
+    """Справочник категорий в памяти с поиском по имени и id за O(1).
+
+    Загружается из БД при первом обращении; функции изменения категорий
+    в db_manager обновляют или сбрасывают его, поэтому обычные действия
+    (выбор категории, фильтрация) не обращаются к БД.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict[str, Any]]]):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._by_id: Optional[Dict[int, Dict[str, Any]]] = None
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.version = 0
+
+    def _rebuild_indexes(self) -> None:
+        self._by_name = {}
+        self._by_type = {}
+        for cat in sorted(self._by_id.values(), key=lambda cat: cat['id']):
+            # При совпадении имен побеждает категория с меньшим id, как при линейном поиске
+            self._by_name.setdefault(cat['name'], cat)
+            self._by_type.setdefault(cat['type'], []).append(cat)
+        self.version += 1
+
+    def _ensure_loaded(self) -> None:
+        if self._by_id is None:
+            self._by_id = {cat['id']: cat for cat in self._loader()}
+            self._rebuild_indexes()
+
+    def invalidate(self) -> None:
+        """Сброс справочника: при следующем обращении он загрузится заново"""
+        with self._lock:
+            self._by_id = None
+            self.version += 1
+
+    def all(self, category_type: str = None) -> List[Dict[str, Any]]:
+        """Категории (все или одного типа) в порядке id"""
+        with self._lock:
+            self._ensure_loaded()
+            if category_type:
+                return list(self._by_type.get(category_type, []))
+            return sorted(self._by_id.values(), key=lambda cat: cat['id'])
+
+    def get(self, category_id: int) -> Optional[Dict[str, Any]]:
+        """Категория по id"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(category_id)
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Категория по имени"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get(name)
+
+    def get_id(self, name: str) -> Optional[int]:
+        """ID категории по имени (None, если не найдена)"""
+        cat = self.find(name)
+        return cat['id'] if cat else None
+
+    def update(self, category_id: int, **fields) -> None:
+        """Изменение полей загруженной категории"""
+        with self._lock:
+            if self._by_id is None:
+                return
+            if category_id not in self._by_id:
+                self.invalidate()
+                return
+            self._by_id[category_id] = {**self._by_id[category_id], **fields}
+            self._rebuild_indexes()
+
+    def remove(self, category_id: int) -> None:
+        """Удаление категории из справочника"""
+        with self._lock:
+            if self._by_id is not None and self._by_id.pop(category_id, None) is not None:
+                self._rebuild_indexes()
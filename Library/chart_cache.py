@@ -0,0 +1,143 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+ChartResult = Union[List[str], str]
+
+class ChartCache:
+    """Кэш готовых графиков на диске с адресацией по содержимому.
+
+    Ключ - хэш типа графика, периода и отпечатка данных (get_data_fingerprint),
+    поэтому повторный запрос при неизменных данных возвращает уже сохраненные файлы.
+    Для каждого ключа рядом с графиками хранится файл описания chart_<ключ>.json
+    (общего индекса нет, так что кэш можно использовать из нескольких процессов);
+    время его изменения - время последнего использования. Старые записи удаляются
+    по возрасту (max_age, секунды) и по общему объему файлов (max_bytes).
+    """
+    MANIFEST_PREFIX = 'chart_'
+
+    def __init__(self, directory: str, max_bytes: int = 100 * 1024 * 1024,
+                 max_age: float = 30 * 24 * 3600, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(chart: str, start_date: str, end_date: str, fingerprint: tuple) -> str:
+        """Ключ графика: одинаковые тип, период и данные дают одинаковый ключ"""
+        payload = repr((chart, str(start_date)[:10] if start_date else None,
+                        str(end_date)[:10] if end_date else None, fingerprint))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _manifest_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{self.MANIFEST_PREFIX}{key}.json")
+
+    def _manifests(self) -> List[str]:
+        return glob.glob(os.path.join(self.directory, f"{self.MANIFEST_PREFIX}*.json"))
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, encoding='utf-8') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _files(result: ChartResult) -> List[str]:
+        """Файлы результата (строка без .png - сообщение об отсутствии данных)"""
+        if isinstance(result, list):
+            return result
+        return [result] if result.endswith('.png') else []
+
+    def get(self, key: str) -> Optional[ChartResult]:
+        """Сохраненный результат по ключу (None, если его нет или файлы удалены)"""
+        if not self.enabled:
+            return None
+        path = self._manifest_path(key)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        if time.time() - entry['created'] > self.max_age or \
+                not all(os.path.exists(chart) for chart in self._files(entry['result'])):
+            self._remove(path, entry)
+            return None
+        try:
+            os.utime(path)  # отметка использования для вытеснения давно не использованных
+        except OSError:
+            return None
+        return entry['result']
+
+    def put(self, key: str, result: ChartResult) -> None:
+        """Запись результата и удаление устаревших графиков"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        size = sum(os.path.getsize(chart) for chart in self._files(result) if os.path.exists(chart))
+        path = self._manifest_path(key)
+        # Запись через временный файл: параллельный читатель не увидит половину описания
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'result': result, 'size': size, 'created': time.time()}, manifest_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+        self._evict(keep=path)
+
+    def _remove(self, path: str, entry: Optional[Dict[str, Any]]) -> None:
+        for chart in self._files(entry['result']) if entry else []:
+            try:
+                os.remove(chart)
+            except OSError:
+                pass
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> List[tuple]:
+        """(время использования, путь описания, описание) для всех записей"""
+        entries = []
+        for path in self._manifests():
+            entry = self._read(path)
+            try:
+                used = os.path.getmtime(path)
+            except OSError:
+                continue
+            entries.append((used, path, entry))
+        return entries
+
+    def _evict(self, keep: str) -> None:
+        """Удаление записей старше max_age, затем давно не использованных сверх max_bytes (кроме keep)"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for used, path, entry in self._entries():
+                if entry is None or now - entry['created'] > self.max_age:
+                    if path != keep:
+                        self._remove(path, entry)
+                    continue
+                entries.append((used, path, entry))
+            total = sum(entry['size'] for _, _, entry in entries)
+            for _, path, entry in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                total -= entry['size']
+                self._remove(path, entry)
+
+    def clear(self) -> None:
+        """Удаление всех графиков из кэша"""
+        with self._lock:
+            for _, path, entry in self._entries():
+                self._remove(path, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Число графиков и их общий объем"""
+        entries = [entry for _, _, entry in self._entries() if entry is not None]
+        return {'entries': len(entries), 'bytes': sum(entry['size'] for entry in entries)}
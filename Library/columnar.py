@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from .db_manager import (iterate_query, get_categories, get_query_cache, build_transaction_filters,
+                         build_page_query)
+from .query_cache import TransactionQueryCache
+
+COLUMN_SELECT = """
+    SELECT t.id, t.date, t.amount, t.category_id, t.description, t.type
+    FROM transactions t
+    WHERE 1=1
+    """
+TYPE_NAMES = ('expense', 'income')
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+class TransactionColumns:
+    """Компактное колоночное хранение транзакций.
+
+    Каждая колонка - массив NumPy: id (int64), дата как порядковый номер дня (int32),
+    сумма в копейках (int64), id категории (int32, 0 - без категории), тип (int8).
+    Описания закодированы словарем: в строке хранится только номер строки словаря.
+    Для совместимости с Treeview строка по индексу отдается в виде словаря,
+    как у get_transactions.
+    """
+
+    def __init__(self, category_names: Dict[int, str] = None, capacity: int = 1024):
+        self.category_names = category_names or {}
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.date_ordinals = np.empty(capacity, dtype=np.int32)
+        self.cents = np.empty(capacity, dtype=np.int64)
+        self.category_ids = np.empty(capacity, dtype=np.int32)
+        self.type_codes = np.empty(capacity, dtype=np.int8)
+        self.description_codes = np.empty(capacity, dtype=np.int32)
+        self.descriptions: List[Optional[str]] = []
+        self._description_index: Dict[Optional[str], int] = {}
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('ids', 'date_ordinals', 'cents', 'category_ids', 'type_codes', 'description_codes'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _encode(self, description: Optional[str]) -> int:
+        code = self._description_index.get(description)
+        if code is None:
+            code = self._description_index[description] = len(self.descriptions)
+            self.descriptions.append(description)
+        return code
+
+    def append(self, rows: List[tuple]) -> None:
+        """Добавление пачки строк (id, date, amount, category_id, description, type)"""
+        count = len(rows)
+        if not count:
+            return
+        self._reserve(count)
+        ids, dates, amounts, category_ids, descriptions, types = zip(*rows)
+        part = slice(self.size, self.size + count)
+        self.ids[part] = ids
+        self.date_ordinals[part] = [value.toordinal() for value in dates]
+        self.cents[part] = np.rint(np.array(amounts, dtype=np.float64) * 100)
+        self.category_ids[part] = [value or 0 for value in category_ids]
+        self.type_codes[part] = [TYPE_CODES[value] for value in types]
+        self.description_codes[part] = [self._encode(value) for value in descriptions]
+        self.size += count
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """Строка в формате get_transactions"""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        category_id = int(self.category_ids[index]) or None
+        return {
+            'id': int(self.ids[index]),
+            'date': date.fromordinal(int(self.date_ordinals[index])),
+            'amount': int(self.cents[index]) / 100,
+            'category_id': category_id,
+            'description': self.descriptions[self.description_codes[index]],
+            'transaction_type': TYPE_NAMES[self.type_codes[index]],
+            'category_name': self.category_names.get(category_id),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.size):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти колонок и словаря описаний"""
+        arrays = sum(getattr(self, name)[:self.size].nbytes
+                     for name in ('ids', 'date_ordinals', 'cents', 'category_ids', 'type_codes', 'description_codes'))
+        return arrays + sum(len(value or '') for value in self.descriptions)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame с типизированными колонками (описания и категории - pandas.Categorical)"""
+        n = self.size
+        category_ids = self.category_ids[:n]
+        categories = sorted(set(self.category_names.values()))
+        positions = {name: code for code, name in enumerate(categories)}
+        category_lookup = np.full(int(category_ids.max(initial=0)) + 1, -1, dtype=np.int32)
+        for cid, name in self.category_names.items():
+            if cid < len(category_lookup):
+                category_lookup[cid] = positions[name]
+
+        # Пустое описание не может быть категорией pandas - кодируем его как -1 (NaN)
+        descriptions = list(self.descriptions)
+        description_lookup = np.arange(len(descriptions), dtype=np.int32)
+        none_code = self._description_index.get(None)
+        if none_code is not None:
+            del descriptions[none_code]
+            description_lookup[none_code] = -1
+            description_lookup[none_code + 1:] -= 1
+
+        return pd.DataFrame({
+            'id': self.ids[:n],
+            # порядковый номер 719163 - 1970-01-01
+            'date': (self.date_ordinals[:n].astype('int64') - 719163).astype('datetime64[D]').astype('datetime64[ns]'),
+            'amount': self.cents[:n] / 100,
+            'category_id': category_ids,
+            'description': pd.Categorical.from_codes(description_lookup[self.description_codes[:n]],
+                                                     categories=pd.Index(descriptions, dtype=object)),
+            'transaction_type': pd.Categorical.from_codes(self.type_codes[:n], categories=list(TYPE_NAMES)),
+            'category_name': pd.Categorical.from_codes(category_lookup[category_ids], categories=categories),
+        })
+
+def load_category_names() -> Dict[int, str]:
+    """Названия категорий по id из справочника в памяти"""
+    return {cat['id']: cat['name'] for cat in get_categories()}
+
+def fetch_transaction_columns(start_date: str = None, end_date: str = None, category_id: int = None,
+                              min_amount: float = None, max_amount: float = None, search: str = None,
+                              chunk_size: int = 10000) -> TransactionColumns:
+    """Загрузка транзакций сразу в колоночное хранилище, пачками из курсора"""
+    filters, params = build_transaction_filters(start_date, end_date, category_id, min_amount, max_amount, search)
+    query = COLUMN_SELECT + filters + " ORDER BY t.date DESC, t.id DESC"
+    columns = TransactionColumns(load_category_names())
+    for rows in iterate_query(query, tuple(params), chunk_size):
+        columns.append(rows)
+    return columns
+
+def get_transaction_columns_page(start_date: str = None, end_date: str = None, category_id: int = None,
+                                 min_amount: float = None, max_amount: float = None, search: str = None,
+                                 after: Tuple[Any, int] = None, before: Tuple[Any, int] = None,
+                                 limit: int = 200) -> TransactionColumns:
+    """Страница транзакций по ключу (date, id) в колоночном виде (кэшируется как get_transactions_page)"""
+    query, params, page = build_page_query(COLUMN_SELECT, start_date, end_date, category_id,
+                                           min_amount, max_amount, search, after, before, limit)
+
+    def load():
+        rows = [row for chunk in iterate_query(query, tuple(params), limit) for row in chunk]
+        columns = TransactionColumns(load_category_names(), capacity=max(len(rows), 1))
+        columns.append(rows[::-1] if before is not None else rows)
+        return columns
+
+    cache_filters = TransactionQueryCache.make_filters(start_date, end_date, category_id,
+                                                       min_amount, max_amount, search)
+    return get_query_cache().get_or_load(cache_filters, ('columns',) + page, load)
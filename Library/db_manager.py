@@ -1,13 +1,35 @@
-import mysql.connector
 import configparser
-from typing import List, Dict, Any
+import functools
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date as date_type, timedelta
+from decimal import Decimal
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import os
+from .category_registry import CategoryRegistry
+from .instrumentation import Instrumentation, instrumentation, normalize_sql
+from .query_cache import TransactionQueryCache
+from .storage import StorageBackend, MySQLBackend, SQLiteBackend, PROJECT_ROOT
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'Scripts', 'config.ini')
+
+_backend = None
+_backend_lock = threading.Lock()
+_query_cache = None
+
+@functools.lru_cache(maxsize=None)
+def read_config() -> configparser.ConfigParser:
+    """Однократное чтение config.ini (результат кэшируется)"""
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+    return config
 
 def get_db_config() -> Dict[str, str]:
     """Загрузка конфигурации базы данных из config.ini"""
-    config = configparser.ConfigParser()
-    config_path = os.path.join(os.path.dirname(__file__), os.pardir, 'Scripts', 'config.ini')
-    config.read(config_path)
+    config = read_config()
     return {
         'host': config['DATABASE']['host'],
         'user': config['DATABASE']['user'],
@@ -15,45 +37,286 @@ def get_db_config() -> Dict[str, str]:
         'database': config['DATABASE']['database']
     }
 
-def get_connection():
-    """Создание соединения с базой данных"""
-    return mysql.connector.connect(**get_db_config())
+def get_pool_config() -> Dict[str, int]:
+    """Загрузка параметров пула соединений из config.ini"""
+    config = read_config()
+    return {
+        'pool_size': config.getint('DATABASE', 'pool_size', fallback=5),
+        'reconnect_attempts': config.getint('DATABASE', 'reconnect_attempts', fallback=3),
+        'reconnect_delay': config.getint('DATABASE', 'reconnect_delay', fallback=1)
+    }
+
+def create_backend() -> StorageBackend:
+    """Создание хранилища, выбранного в config.ini (backend = mysql | sqlite)"""
+    config = read_config()
+    backend = config.get('DATABASE', 'backend', fallback='mysql')
+    if backend == 'sqlite':
+        path = config.get('DATABASE', 'sqlite_path', fallback='Data/finance.db')
+        return SQLiteBackend(os.path.join(PROJECT_ROOT, path))
+    if backend == 'mysql':
+        return MySQLBackend(get_db_config(), **get_pool_config())
+    raise ValueError(f"Неизвестное хранилище: {backend}")
+
+def get_backend() -> StorageBackend:
+    """Получение общего хранилища (создается при первом обращении)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            configure_instrumentation()
+            _backend = create_backend()
+        return _backend
+
+def set_backend(backend: StorageBackend) -> None:
+    """Подмена хранилища (для скриптов замера и отдельных баз)"""
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+    category_registry.invalidate()
+    get_query_cache().clear()
+
+def get_query_cache() -> TransactionQueryCache:
+    """Кэш результатов выборок транзакций (параметры - секция [CACHE] в config.ini)"""
+    global _query_cache
+    if _query_cache is None:
+        config = read_config()
+        _query_cache = TransactionQueryCache(
+            ttl=config.getfloat('CACHE', 'ttl_seconds', fallback=300),
+            max_bytes=int(config.getfloat('CACHE', 'max_megabytes', fallback=64) * 1024 * 1024),
+            enabled=config.getboolean('CACHE', 'enabled', fallback=True)
+        )
+    return _query_cache
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Счетчики попаданий и промахов кэша выборок транзакций"""
+    return get_query_cache().stats()
+
+def configure_instrumentation() -> Instrumentation:
+    """Настройка замеров из секции [DIAGNOSTICS] в config.ini"""
+    config = read_config()
+    log_path = config.get('DIAGNOSTICS', 'slow_log', fallback='')
+    instrumentation.configure(
+        enabled=config.getboolean('DIAGNOSTICS', 'enabled', fallback=False),
+        slow_threshold=config.getfloat('DIAGNOSTICS', 'slow_threshold_ms', fallback=200) / 1000,
+        log_path=os.path.join(PROJECT_ROOT, log_path) if log_path else None
+    )
+    return instrumentation
+
+def reload_config() -> None:
+    """Сброс кэша конфигурации и хранилища (например, после сохранения настроек)"""
+    global _query_cache
+    read_config.cache_clear()
+    set_backend(None)
+    _query_cache = None
 
 def execute_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
     """Выполнение SQL-запроса"""
-    with get_connection() as conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params or ())
-        result = cursor.fetchall()
-        conn.commit()
-        return result
+    backend = get_backend()
+    if not instrumentation.enabled:
+        return backend.execute(query, params)
+    started = time.perf_counter()
+    rows = backend.execute(query, params)
+    instrumentation.record_query(query, params, time.perf_counter() - started, rows)
+    return rows
+
+def iterate_query(query: str, params: tuple = None, chunk_size: int = None,
+                  dictionary: bool = False) -> Iterator[List[Any]]:
+    """Чтение результата запроса пачками кортежей (или словарей) через хранилище"""
+    chunks = get_backend().iterate(query, params, chunk_size or get_stream_chunk_size(), dictionary=dictionary)
+    return instrumentation.iterate(chunks, query, params) if instrumentation.enabled else chunks
+
+def execute_batch(steps: List[Tuple[str, Iterable[tuple]]]) -> int:
+    """Пакетное выполнение запросов в одной транзакции (см. StorageBackend.execute_batch)"""
+    backend = get_backend()
+    if not instrumentation.enabled:
+        return backend.execute_batch(steps)
+    steps = [(query, list(params_seq)) for query, params_seq in steps]
+    started = time.perf_counter()
+    count = backend.execute_batch(steps)
+    query, params_seq = steps[0]
+    instrumentation.record('write', normalize_sql(query), time.perf_counter() - started, count,
+                           sql=query, params=params_seq[:1])
+    return count
+
+def get_stream_chunk_size() -> int:
+    """Размер пачки потокового чтения из config.ini"""
+    return read_config().getint('DATABASE', 'stream_chunk_size', fallback=10000)
+
+def stream_query(query: str, params: tuple = None, chunk_size: int = None) -> Iterator[List[Dict[str, Any]]]:
+    """Потоковое чтение результата запроса пачками словарей.
+
+    Используется небуферизованный курсор: в памяти одновременно находится не больше
+    chunk_size строк. Соединение освобождается, когда генератор дочитан или закрыт.
+    """
+    yield from iterate_query(query, params, chunk_size, dictionary=True)
+
+# Справочник категорий в памяти, обновляется функциями изменения категорий
+category_registry = CategoryRegistry(lambda: execute_query("SELECT * FROM categories ORDER BY id"))
 
 def get_categories(category_type: str = None) -> List[Dict[str, Any]]:
-    """Получение списка категорий"""
-    query = "SELECT * FROM categories"
-    if category_type:
-        query += " WHERE type = %s"
-        return execute_query(query, (category_type,))
-    return execute_query(query)
+    """Получение списка категорий (из справочника в памяти)"""
+    return category_registry.all(category_type)
+
+def get_category_id(name: str) -> Optional[int]:
+    """Получение ID категории по имени (None, если не найдена)"""
+    return category_registry.get_id(name)
+
+def get_category(category_id: int) -> Optional[Dict[str, Any]]:
+    """Получение категории по ID из справочника в памяти (None, если не найдена)"""
+    return category_registry.get(category_id)
+
+# Сводные таблицы: (таблица, колонка периода). category_id = 0 - транзакции без категории
+ROLLUP_TABLES = (('daily_rollups', 'day'), ('monthly_rollups', 'month'))
+
+ROLLUP_UPSERT = {
+    'mysql': """
+    INSERT INTO {table} ({period}, category_id, type, total, count) VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total), count = count + VALUES(count)
+    """,
+    'sqlite': """
+    INSERT INTO {table} ({period}, category_id, type, total, count) VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT ({period}, category_id, type)
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+    """,
+}
+
+# Первый день месяца для даты в колонке
+MONTH_START = {
+    'mysql': "DATE_SUB({column}, INTERVAL DAYOFMONTH({column}) - 1 DAY)",
+    'sqlite': "date({column}, 'start of month')",
+}
+
+def to_date(value) -> date_type:
+    """Приведение даты (строка ГГГГ-ММ-ДД или date) к date"""
+    return value if isinstance(value, date_type) else date_type.fromisoformat(str(value)[:10])
+
+ROLLUP_DELETE_EMPTY = "DELETE FROM {table} WHERE {period} = %s AND category_id = %s AND type = %s AND count <= 0"
+
+def rollup_steps(rows: List[tuple], sign: int = 1) -> List[Tuple[str, List[tuple]]]:
+    """Запросы приращения сводных таблиц для транзакций (date, amount, category_id, description, type).
+
+    При вычитании (sign=-1) строки сводных таблиц, в которых не осталось транзакций, удаляются:
+    иначе отчеты показывали бы категории и периоды с нулевыми итогами.
+    """
+    deltas = {table: defaultdict(lambda: [Decimal(0), 0]) for table, _ in ROLLUP_TABLES}
+    for date_, amount, category_id, _, type_ in rows:
+        day = to_date(date_)
+        for table, period in zip(deltas, (day, day.replace(day=1))):
+            delta = deltas[table][(period, category_id or 0, type_)]
+            delta[0] += sign * Decimal(str(amount))
+            delta[1] += sign
+    upsert = ROLLUP_UPSERT[get_backend().name]
+    steps = [(upsert.format(table=table, period=period),
+              [key + tuple(delta) for key, delta in deltas[table].items()])
+             for table, period in ROLLUP_TABLES]
+    if sign < 0:
+        steps += [(ROLLUP_DELETE_EMPTY.format(table=table, period=period), list(deltas[table]))
+                  for table, period in ROLLUP_TABLES]
+    return steps
+
+def rollup_rebuild_statements(backend: str) -> List[str]:
+    """SQL-команды полного пересчета сводных таблиц по transactions"""
+    month = MONTH_START[backend].format(column='day')
+    return [
+        "DELETE FROM daily_rollups",
+        "DELETE FROM monthly_rollups",
+        """
+        INSERT INTO daily_rollups (day, category_id, type, total, count)
+        SELECT date, COALESCE(category_id, 0), type, SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY date, COALESCE(category_id, 0), type
+        """,
+        f"""
+        INSERT INTO monthly_rollups (month, category_id, type, total, count)
+        SELECT {month}, category_id, type, SUM(total), SUM(count)
+        FROM daily_rollups
+        GROUP BY {month}, category_id, type
+        """,
+    ]
+
+def rebuild_rollups() -> None:
+    """Полный пересчет сводных таблиц в одной транзакции"""
+    execute_batch([(statement, [()]) for statement in rollup_rebuild_statements(get_backend().name)])
+
+# Наибольшая по модулю сумма, которая помещается в колонку amount DECIMAL(10,2)
+MAX_AMOUNT = 99_999_999.99
+
+def is_valid_amount(amount: float) -> bool:
+    """Сумма - конечное число, помещающееся в колонку amount"""
+    return math.isfinite(amount) and abs(amount) <= MAX_AMOUNT
 
 def add_transaction(date: str, amount: float, category_id: int, 
                    description: str, type_: str) -> None:
     """Добавление новой транзакции"""
+    add_transactions([(date, amount, category_id, description, type_)])
+
+def add_transactions(rows: Iterable[Tuple[str, float, int, str, str]],
+                     extra_steps: Iterable[Tuple[str, Iterable[tuple]]] = ()) -> int:
+    """Пакетное добавление транзакций (date, amount, category_id, description, type) в одной транзакции.
+
+    В той же транзакции обновляются сводные таблицы по дням и месяцам и выполняются
+    extra_steps (запрос, наборы параметров) - например, отметка записанных строк журнала.
+    """
+    rows = list(rows)
     query = """
     INSERT INTO transactions (date, amount, category_id, description, type)
     VALUES (%s, %s, %s, %s, %s)
     """
-    execute_query(query, (date, amount, category_id, description, type_))
+    count = execute_batch([(query, rows)] + rollup_steps(rows) + list(extra_steps))
+    get_query_cache().invalidate_rows([row[0] for row in rows], [row[2] for row in rows])
+    return count
 
-def get_transactions(start_date: str = None, end_date: str = None,
-                    category_id: int = None, min_amount: float = None, max_amount: float = None) -> List[Dict[str, Any]]:
-    """Получение списка транзакций с фильтрацией"""
-    query = """
+def assign_categories(rows: Iterable[Tuple[int, str, float, str, int]]) -> int:
+    """Назначение категорий транзакциям без категории: строки (id, date, amount, type, category_id).
+
+    В той же транзакции итоги строк в сводных таблицах переносятся из category_id = 0
+    в назначенные категории. Месяцы этих строк заранее отмечаются в снимке данных
+    устаревшими: следующая выгрузка снимка запишет их заново.
+    """
+    from .snapshot import TransactionSnapshot
+    rows = list(rows)
+    if not rows:
+        return 0
+    TransactionSnapshot().mark_stale((row[0], row[1]) for row in rows)
+    uncategorized = [(date_, amount, None, None, type_) for _, date_, amount, type_, _ in rows]
+    assigned = [(date_, amount, category_id, None, type_) for _, date_, amount, type_, category_id in rows]
+    execute_batch([("UPDATE transactions SET category_id = %s WHERE id = %s",
+                    [(category_id, id_) for id_, _, _, _, category_id in rows])]
+                  + rollup_steps(uncategorized, sign=-1) + rollup_steps(assigned))
+    get_query_cache().invalidate_rows([row[1] for row in rows], [row[4] for row in rows])
+    return len(rows)
+
+TRANSACTION_COLUMNS = """
     SELECT t.id, t.date, t.amount, t.category_id, t.description, t.type AS transaction_type, t.created_at, c.name as category_name 
     FROM transactions t
     LEFT JOIN categories c ON t.category_id = c.id
     WHERE 1=1
     """
+
+def parse_search(text: str) -> List[Tuple[str, bool]]:
+    """Разбор строки поиска на слова: (слово, поиск по префиксу - слово оканчивается на *)"""
+    return [(token.rstrip('*').lower(), token.endswith('*')) for token in re.findall(r'\w+\*?', text or '')]
+
+def build_search_filter(text: str) -> Tuple[str, List[Any]]:
+    """Условие полнотекстового поиска по описанию: все слова должны встречаться.
+
+    MySQL - MATCH ... AGAINST по индексу FULLTEXT, SQLite - таблица FTS5 (миграция 3).
+    """
+    tokens = parse_search(text)
+    if not tokens:
+        return "", []
+    if get_backend().name == 'sqlite':
+        expression = " ".join(f'"{token}"' + ('*' if prefix else '') for token, prefix in tokens)
+        return " AND t.id IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH %s)", [expression]
+    expression = " ".join(f"+{token}" + ('*' if prefix else '') for token, prefix in tokens)
+    return " AND MATCH(t.description) AGAINST (%s IN BOOLEAN MODE)", [expression]
+
+def build_transaction_filters(start_date: str = None, end_date: str = None, category_id: int = None,
+                              min_amount: float = None, max_amount: float = None,
+                              search: str = None, transaction_type: str = None) -> Tuple[str, List[Any]]:
+    """Построение условий WHERE для фильтров транзакций (search - поиск по словам описания)"""
+    query = ""
     params = []
     
     if start_date:
@@ -65,29 +328,195 @@ def get_transactions(start_date: str = None, end_date: str = None,
     if category_id:
         query += " AND t.category_id = %s"
         params.append(category_id)
+    if transaction_type:
+        query += " AND t.type = %s"
+        params.append(transaction_type)
     if min_amount is not None:
         query += " AND t.amount >= %s"
         params.append(min_amount)
     if max_amount is not None:
         query += " AND t.amount <= %s"
         params.append(max_amount)
-        
-    query += " ORDER BY t.date DESC"
+    if search:
+        search_query, search_params = build_search_filter(search)
+        query += search_query
+        params += search_params
+    return query, params
+
+def get_transactions(start_date: str = None, end_date: str = None,
+                    category_id: int = None, min_amount: float = None, max_amount: float = None,
+                    search: str = None) -> List[Dict[str, Any]]:
+    """Получение списка транзакций с фильтрацией (результат кэшируется)"""
+    filters, params = build_transaction_filters(start_date, end_date, category_id, min_amount, max_amount, search)
+    query = TRANSACTION_COLUMNS + filters + " ORDER BY t.date DESC, t.id DESC"
+    cache_filters = TransactionQueryCache.make_filters(start_date, end_date, category_id,
+                                                       min_amount, max_amount, search)
+    return get_query_cache().get_or_load(cache_filters, ('all',), lambda: execute_query(query, tuple(params)))
+
+def stream_transactions(start_date: str = None, end_date: str = None, category_id: int = None,
+                        min_amount: float = None, max_amount: float = None, search: str = None,
+                        chunk_size: int = None) -> Iterator[List[Dict[str, Any]]]:
+    """Транзакции по фильтрам пачками в хронологическом порядке (date, id), без кэширования"""
+    filters, params = build_transaction_filters(start_date, end_date, category_id, min_amount, max_amount, search)
+    query = TRANSACTION_COLUMNS + filters + " ORDER BY t.date, t.id"
+    return stream_query(query, tuple(params), chunk_size)
+
+def build_page_query(select: str, start_date: str = None, end_date: str = None, category_id: int = None,
+                     min_amount: float = None, max_amount: float = None, search: str = None,
+                     after: Tuple[Any, int] = None, before: Tuple[Any, int] = None,
+                     limit: int = 200) -> Tuple[str, List[Any], tuple]:
+    """Запрос страницы по ключу (date, id), его параметры и ключ страницы для кэша.
+
+    Для before строки выбираются в обратном порядке (date ASC, id ASC) и должны быть развернуты.
+    """
+    filters, params = build_transaction_filters(start_date, end_date, category_id, min_amount, max_amount, search)
+    query = select + filters
+    if before is not None:
+        query += " AND (t.date > %s OR (t.date = %s AND t.id > %s)) ORDER BY t.date ASC, t.id ASC LIMIT %s"
+        params += [before[0], before[0], before[1], limit]
+        return query, params, ('before', str(before[0]), before[1], limit)
+    if after is not None:
+        query += " AND (t.date < %s OR (t.date = %s AND t.id < %s))"
+        params += [after[0], after[0], after[1]]
+    query += " ORDER BY t.date DESC, t.id DESC LIMIT %s"
+    params.append(limit)
+    page = ('after', str(after[0]), after[1], limit) if after is not None else ('first', limit)
+    return query, params, page
+
+def get_transactions_page(start_date: str = None, end_date: str = None, category_id: int = None,
+                          min_amount: float = None, max_amount: float = None, search: str = None,
+                          after: Tuple[Any, int] = None, before: Tuple[Any, int] = None,
+                          limit: int = 200) -> List[Dict[str, Any]]:
+    """Постраничное получение транзакций по ключу (date, id) в порядке date DESC, id DESC.
+
+    after  - вернуть страницу, следующую за строкой с этим ключом (прокрутка вниз);
+    before - вернуть страницу, предшествующую строке с этим ключом (прокрутка вверх).
+    Результат кэшируется вместе с фильтрами и положением страницы.
+    """
+    query, params, page = build_page_query(TRANSACTION_COLUMNS, start_date, end_date, category_id,
+                                           min_amount, max_amount, search, after, before, limit)
+
+    def load():
+        rows = execute_query(query, tuple(params))
+        return rows[::-1] if before is not None else rows
+
+    cache_filters = TransactionQueryCache.make_filters(start_date, end_date, category_id,
+                                                       min_amount, max_amount, search)
+    return get_query_cache().get_or_load(cache_filters, page, load)
+
+def get_data_fingerprint(start_date: str = None, end_date: str = None) -> Tuple:
+    """Дешевый отпечаток данных за период: число строк, максимальный id, контрольные суммы и категории.
+
+    Меняется при добавлении и удалении транзакций периода, а также при изменении категорий.
+    """
+    filters, params = build_transaction_filters(start_date, end_date)
+    row = execute_query(f"""
+    SELECT COUNT(*) AS count, MAX(t.id) AS max_id, SUM(t.amount) AS total, SUM(t.category_id) AS category_sum
+    FROM transactions t
+    WHERE 1=1 {filters}
+    """, tuple(params))[0]
+    categories = tuple((cat['id'], cat['name'], cat['type']) for cat in get_categories())
+    return (row['count'], row['max_id'], str(row['total'] or 0), row['category_sum'], categories)
+
+def rollup_source(start_date=None, end_date=None) -> Tuple[str, str]:
+    """Выбор сводной таблицы: помесячная, если период состоит из целых месяцев, иначе подневная"""
+    starts_month = start_date is None or to_date(start_date).day == 1
+    ends_month = end_date is None or (to_date(end_date) + timedelta(days=1)).day == 1
+    return ROLLUP_TABLES[1] if starts_month and ends_month else ROLLUP_TABLES[0]
+
+def build_rollup_filters(period: str, start_date: str = None, end_date: str = None) -> Tuple[str, List[Any]]:
+    """Построение условий WHERE по периоду для сводной таблицы"""
+    query = ""
+    params = []
+    if start_date:
+        query += f" AND r.{period} >= %s"
+        params.append(start_date)
+    if end_date:
+        query += f" AND r.{period} <= %s"
+        params.append(end_date)
+    return query, params
+
+def get_totals_by_type(start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
+    """Суммы и количество транзакций по типу (доход/расход) за период"""
+    table, period = rollup_source(start_date, end_date)
+    filters, params = build_rollup_filters(period, start_date, end_date)
+    query = f"""
+    SELECT r.type AS transaction_type, SUM(r.total) AS total, SUM(r.count) AS count
+    FROM {table} r
+    WHERE 1=1 {filters}
+    GROUP BY r.type
+    """
+    return execute_query(query, tuple(params))
+
+def get_sums_by_category(start_date: str = None, end_date: str = None, type_: str = None) -> List[Dict[str, Any]]:
+    """Суммы транзакций по категориям за период (опционально только одного типа)"""
+    table, period = rollup_source(start_date, end_date)
+    filters, params = build_rollup_filters(period, start_date, end_date)
+    if type_:
+        filters += " AND r.type = %s"
+        params.append(type_)
+    query = f"""
+    SELECT r.type AS transaction_type, NULLIF(r.category_id, 0) AS category_id, c.name AS category_name,
+           SUM(r.total) AS total
+    FROM {table} r
+    LEFT JOIN categories c ON r.category_id = c.id
+    WHERE 1=1 {filters}
+    GROUP BY r.type, r.category_id, c.name
+    ORDER BY c.name
+    """
+    return execute_query(query, tuple(params))
+
+def get_daily_totals(start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
+    """Доходы, расходы и чистый результат по дням за период"""
+    filters, params = build_rollup_filters('day', start_date, end_date)
+    query = f"""
+    SELECT r.day AS date,
+           SUM(CASE WHEN r.type = 'income' THEN r.total ELSE 0 END) AS income,
+           SUM(CASE WHEN r.type = 'expense' THEN r.total ELSE 0 END) AS expense,
+           SUM(CASE WHEN r.type = 'income' THEN r.total ELSE -r.total END) AS net
+    FROM daily_rollups r
+    WHERE 1=1 {filters}
+    GROUP BY r.day
+    ORDER BY r.day
+    """
+    return execute_query(query, tuple(params))
+
+def get_daily_category_totals(start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
+    """Суммы по дням, типу и категории за период одним запросом к подневной сводной таблице"""
+    filters, params = build_rollup_filters('day', start_date, end_date)
+    query = f"""
+    SELECT r.day AS date, r.type AS transaction_type, NULLIF(r.category_id, 0) AS category_id,
+           c.name AS category_name, r.total
+    FROM daily_rollups r
+    LEFT JOIN categories c ON r.category_id = c.id
+    WHERE 1=1 {filters}
+    ORDER BY r.day
+    """
     return execute_query(query, tuple(params))
 
 def add_category(name: str, type_: str) -> None:
     """Добавление новой категории"""
     query = "INSERT INTO categories (name, type) VALUES (%s, %s)"
     execute_query(query, (name, type_))
+    category_registry.invalidate()  # id новой категории известен только БД
 
 def update_category(category_id: int, new_name: str, new_type: str) -> None:
     """Обновление существующей категории"""
     query = "UPDATE categories SET name = %s, type = %s WHERE id = %s"
     execute_query(query, (new_name, new_type, category_id))
+    category_registry.update(category_id, name=new_name, type=new_type)
+    get_query_cache().clear()  # название категории входит в строки выборок
 
 def delete_category(category_id: int) -> None:
     """Удаление категории и связанных с ней транзакций"""
-    # Сначала удаляем транзакции, связанные с этой категорией
-    execute_query("DELETE FROM transactions WHERE category_id = %s", (category_id,))
-    # Затем удаляем саму категорию
-    execute_query("DELETE FROM categories WHERE id = %s", (category_id,)) 
\ No newline at end of file
+    params = [(category_id,)]
+    execute_batch([
+        # Сначала удаляем транзакции, связанные с этой категорией, и их итоги в сводных таблицах
+        ("DELETE FROM transactions WHERE category_id = %s", params),
+        ("DELETE FROM daily_rollups WHERE category_id = %s", params),
+        ("DELETE FROM monthly_rollups WHERE category_id = %s", params),
+        # Затем удаляем саму категорию
+        ("DELETE FROM categories WHERE id = %s", params),
+    ])
+    category_registry.remove(category_id)
+    get_query_cache().invalidate_category(category_id)
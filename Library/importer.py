@@ -0,0 +1,189 @@
+import csv
+import itertools
+import os
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from .db_manager import get_categories, add_transactions, read_config
+
+# Возможные названия колонок в выгрузках банков
+CSV_COLUMNS = {
+    'date': ('date', 'дата', 'дата операции', 'posted date', 'transaction date'),
+    'amount': ('amount', 'сумма', 'сумма операции'),
+    'description': ('description', 'описание', 'назначение платежа', 'memo', 'name'),
+    'category': ('category', 'категория'),
+    'type': ('type', 'тип'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y%m%d')
+TYPE_ALIASES = {'income': 'income', 'доход': 'income', 'expense': 'expense', 'расход': 'expense'}
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+def parse_date(value: str) -> str:
+    """Приведение даты из выписки к формату ГГГГ-ММ-ДД"""
+    value = value.strip()[:10]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"Неизвестный формат даты: {value}")
+
+def parse_amount(value: str) -> Decimal:
+    """Разбор суммы с учетом пробелов-разделителей и десятичной запятой"""
+    cleaned = value.strip().replace('\xa0', '').replace(' ', '').replace(',', '.')
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Некорректная сумма: {value}")
+
+def read_csv_transactions(path: str, encoding: str = 'utf-8-sig') -> Iterator[Dict[str, Any]]:
+    """Потоковое чтение CSV-выписки: строки читаются по одной, файл целиком в память не загружается"""
+    with open(path, newline='', encoding=encoding) as csv_file:
+        sample = csv_file.read(4096)
+        csv_file.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        reader = csv.reader(csv_file, dialect)
+        header = [column.strip().lower() for column in next(reader)]
+        columns = {}
+        for field, aliases in CSV_COLUMNS.items():
+            for alias in aliases:
+                if alias in header:
+                    columns[field] = header.index(alias)
+                    break
+        if 'date' not in columns or 'amount' not in columns:
+            raise ValueError("В файле нет колонок с датой и суммой")
+        for row in reader:
+            if not row:
+                continue
+            yield {field: row[index] for field, index in columns.items() if index < len(row)}
+
+def read_ofx_transactions(path: str, encoding: str = 'utf-8') -> Iterator[Dict[str, Any]]:
+    """Потоковое чтение OFX-выписки (SGML и XML) по блокам <STMTTRN>"""
+    current = None
+    with open(path, encoding=encoding, errors='replace') as ofx_file:
+        for line in ofx_file:
+            for closing, tag, value in OFX_TAG.findall(line):
+                if tag == 'STMTTRN':
+                    if current:
+                        yield current
+                    current = None if closing else {}
+                elif current is not None and not closing:
+                    value = value.strip()
+                    if tag == 'DTPOSTED':
+                        current['date'] = value[:8]
+                    elif tag == 'TRNAMT':
+                        current['amount'] = value
+                    elif tag in ('NAME', 'MEMO') and value:
+                        current['description'] = (current.get('description', '') + ' ' + value).strip()
+    if current:
+        yield current
+
+def load_default_categorizer():
+    """Обученная модель категоризации или None (scikit-learn не установлен, модель выключена или не обучена)"""
+    try:
+        from .categorizer import load_categorizer
+    except ImportError:
+        return None
+    return load_categorizer()
+
+class CategoryMapper:
+    """Сопоставление строк выписки с категориями (по справочнику категорий в памяти).
+
+    Категория ищется по названию из выписки, затем по правилам; для оставшихся строк
+    пачки ее подбирает модель categorizer (если передана), иначе берется категория
+    по умолчанию для типа операции.
+    """
+
+    def __init__(self, rules: Dict[str, str] = None, categorizer=None):
+        categories = get_categories()
+        self.categorizer = categorizer
+        self.known_ids = {cat['id'] for cat in categories}
+        self.by_name = {}
+        self.default = {}
+        for cat in categories:
+            self.by_name.setdefault(cat['name'].lower(), cat)
+            self.default.setdefault(cat['type'], cat)
+        config = read_config()
+        for type_ in ('income', 'expense'):
+            name = config.get('IMPORT', f'default_{type_}_category', fallback='').lower()
+            if name in self.by_name:
+                self.default[type_] = self.by_name[name]
+        # Правила вида {"подстрока описания": "название категории"}
+        self.rules = [(pattern.lower(), self.by_name[name.lower()])
+                      for pattern, name in (rules or {}).items() if name.lower() in self.by_name]
+
+    def map(self, row: Dict[str, Any]) -> Tuple[str, Decimal, Optional[int], str, str]:
+        """Преобразование строки выписки в параметры add_transactions"""
+        return self.map_chunk([row])[0]
+
+    def map_chunk(self, rows: List[Dict[str, Any]]) -> List[Tuple[str, Decimal, Optional[int], str, str]]:
+        """Преобразование пачки строк; категории без совпадений подбираются моделью за один вызов"""
+        mapped = [self._match(row) for row in rows]
+        unmatched = [index for index, (_, _, category, _, _) in enumerate(mapped) if category is None]
+        suggested = {}
+        if unmatched and self.categorizer is not None:
+            category_ids, confidence = self.categorizer.predict([mapped[index][3] for index in unmatched],
+                                                                [mapped[index][1] for index in unmatched],
+                                                                [mapped[index][4] for index in unmatched])
+            suggested = {index: int(category_id)
+                         for index, category_id, score in zip(unmatched, category_ids, confidence)
+                         if category_id in self.known_ids and score >= self.categorizer.min_confidence}
+        result = []
+        for index, (date_, amount, category, description, type_) in enumerate(mapped):
+            if category is not None:
+                category_id = category['id']
+            elif index in suggested:
+                category_id = suggested[index]
+            else:
+                default = self.default.get(type_)
+                category_id = default['id'] if default else None
+            result.append((date_, amount, category_id, description, type_))
+        return result
+
+    def _match(self, row: Dict[str, Any]) -> Tuple[str, Decimal, Optional[Dict[str, Any]], str, str]:
+        """Разбор строки и поиск категории по названию и правилам (None, если не найдена)"""
+        amount = parse_amount(row['amount'])
+        description = row.get('description', '').strip()
+        type_ = TYPE_ALIASES.get(row.get('type', '').strip().lower())
+        if type_ is None:
+            type_ = 'expense' if amount < 0 else 'income'
+
+        category = self.by_name.get(row.get('category', '').strip().lower())
+        if category is None:
+            lowered = description.lower()
+            for pattern, rule_category in self.rules:
+                if pattern in lowered:
+                    category = rule_category
+                    break
+        return (parse_date(row['date']), abs(amount), category, description, type_)
+
+def detect_format(path: str) -> str:
+    """Определение формата выписки по расширению файла"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.ofx', '.qfx'):
+        return 'ofx'
+    if extension in ('.csv', '.txt'):
+        return 'csv'
+    raise ValueError(f"Неподдерживаемый формат файла: {extension}")
+
+def import_transactions(path: str, file_format: str = None, chunk_size: int = None,
+                        rules: Dict[str, str] = None,
+                        progress: Callable[[int], None] = None) -> int:
+    """Импорт выписки пачками: каждая пачка вставляется одной транзакцией"""
+    file_format = file_format or detect_format(path)
+    reader = read_ofx_transactions if file_format == 'ofx' else read_csv_transactions
+    if chunk_size is None:
+        chunk_size = read_config().getint('IMPORT', 'chunk_size', fallback=5000)
+    mapper = CategoryMapper(rules, load_default_categorizer())
+
+    rows = reader(path)
+    imported = 0
+    while True:
+        chunk: List[tuple] = mapper.map_chunk(list(itertools.islice(rows, chunk_size)))
+        if not chunk:
+            break
+        imported += add_transactions(chunk)
+        if progress:
+            progress(imported)
+    return imported
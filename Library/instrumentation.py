@@ -0,0 +1,223 @@
+import bisect
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Верхние границы корзин гистограммы задержек, мс (последняя корзина - все, что дольше)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+slow_logger = logging.getLogger('finance.slow')
+
+@functools.lru_cache(maxsize=1024)  # тексты запросов повторяются, а замер не должен стоить дороже запроса
+def normalize_sql(query: str, limit: int = 160) -> str:
+    """Запрос в одну строку: имя операции в статистике (одинаковый текст - одна строка статистики)"""
+    text = ' '.join(query.split())
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+def estimate_bytes(rows) -> int:
+    """Приблизительный объем полученных данных по первой строке: длина строк и 8 байт на прочие значения"""
+    if not rows:
+        return 0
+    sample = rows[0]
+    row_bytes = 0
+    for value in (sample.values() if isinstance(sample, dict) else sample):
+        if isinstance(value, (str, bytes)):
+            row_bytes += len(value)
+        elif value is not None:
+            row_bytes += 8
+    return row_bytes * len(rows)
+
+class OperationStats:
+    """Число вызовов, время, гистограмма задержек, строки и байты одной операции"""
+    __slots__ = ('count', 'total', 'max', 'buckets', 'rows', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.rows = 0
+        self.bytes = 0
+
+    def record(self, seconds: float, rows: int = 0, nbytes: int = 0) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.rows += rows
+        self.bytes += nbytes
+
+    def percentile(self, q: float) -> float:
+        """Оценка процентиля задержки по гистограмме (верхняя граница корзины), мс"""
+        threshold = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold and count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max * 1000
+        return 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'histogram': dict(zip([f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"],
+                                  self.buckets)),
+            'rows': self.rows,
+            'bytes': self.bytes,
+        }
+
+def _json_value(value: Any) -> Any:
+    """Параметр запроса в виде, пригодном для JSON и журнала"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value
+
+class Instrumentation:
+    """Замеры запросов, отчетов и обработчиков интерфейса.
+
+    Статистика ведется по паре (вид, имя): вид - query, write, report, chart, task, ui;
+    для запросов имя - текст запроса в одну строку. Операции дольше slow_threshold
+    (секунды) попадают в журнал медленных операций вместе с SQL и параметрами:
+    последние slow_log_size записей хранятся в памяти и пишутся в логгер finance.slow.
+    Выключенные замеры стоят одной проверки флага enabled в месте вызова.
+    """
+
+    def __init__(self, enabled: bool = False, slow_threshold: float = 0.2, slow_log_size: int = 200):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.started = time.time()
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, slow_threshold: float, log_path: str = None) -> None:
+        """Применение настроек; log_path - файл журнала медленных операций (дописывается)"""
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        if log_path and not any(getattr(handler, 'baseFilename', None) == log_path
+                                for handler in slow_logger.handlers):
+            handler = logging.FileHandler(log_path, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            slow_logger.addHandler(handler)
+            slow_logger.setLevel(logging.INFO)
+
+    def record(self, kind: str, name: str, seconds: float, rows: int = 0, nbytes: int = 0,
+               sql: str = None, params: tuple = None) -> None:
+        """Учет выполненной операции"""
+        with self._lock:
+            stats = self._stats.get((kind, name))
+            if stats is None:
+                stats = self._stats[(kind, name)] = OperationStats()
+            stats.record(seconds, rows, nbytes)
+            if seconds < self.slow_threshold:
+                return
+            entry = {'at': datetime.now().isoformat(timespec='seconds'), 'kind': kind, 'name': name,
+                     'ms': round(seconds * 1000, 3), 'rows': rows}
+            if sql is not None:
+                entry['sql'] = ' '.join(sql.split())
+                entry['params'] = _json_value(list(params or ()))
+            self._slow.append(entry)
+        slow_logger.info(json.dumps(entry, ensure_ascii=False))
+
+    def record_query(self, query: str, params: tuple, seconds: float, rows: List[Any]) -> None:
+        """Учет SQL-запроса с числом строк и объемом результата"""
+        self.record('query', normalize_sql(query), seconds, len(rows), estimate_bytes(rows), query, params)
+
+    def iterate(self, chunks: Iterator[List[Any]], query: str, params: tuple) -> Iterator[List[Any]]:
+        """Потоковое чтение с учетом времени выборки пачек (без времени обработки у вызывающего)"""
+        seconds, rows, nbytes = 0.0, 0, 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    seconds += time.perf_counter() - started
+                    break
+                seconds += time.perf_counter() - started
+                rows += len(chunk)
+                nbytes += estimate_bytes(chunk)
+                yield chunk
+        finally:
+            chunks.close()
+            self.record('query', normalize_sql(query), seconds, rows, nbytes, query, params)
+
+    def timed(self, kind: str, name: str = None) -> Callable:
+        """Декоратор замера функции; при выключенных замерах функция вызывается напрямую"""
+        def decorator(func: Callable) -> Callable:
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(kind, label, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        """Очистка статистики и журнала медленных операций"""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Копия статистики: операции по видам (самые долгие по сумме времени - первыми) и медленные операции"""
+        with self._lock:
+            operations: Dict[str, List[Dict[str, Any]]] = {}
+            for (kind, name), stats in sorted(self._stats.items(), key=lambda item: item[1].total, reverse=True):
+                operations.setdefault(kind, []).append({'name': name, **stats.as_dict()})
+            return {
+                'enabled': self.enabled,
+                'since': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'slow_threshold_ms': self.slow_threshold * 1000,
+                'operations': operations,
+                'slow': list(self._slow),
+            }
+
+    def dump(self, path: str) -> str:
+        """Сохранение snapshot в JSON-файл"""
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            json.dump(self.snapshot(), dump_file, ensure_ascii=False, indent=2)
+        return path
+
+def format_snapshot(snapshot: Dict[str, Any], top: int = 15) -> str:
+    """Текстовый отчет по snapshot: самые долгие операции каждого вида и медленные операции"""
+    if not snapshot['enabled'] and not snapshot['operations']:
+        return "Замеры выключены (секция [DIAGNOSTICS] в config.ini)"
+    lines = [f"Замеры с {snapshot['since']}, порог медленных операций {snapshot['slow_threshold_ms']:.0f} мс"]
+    for kind, operations in snapshot['operations'].items():
+        lines.append(f"\n{kind}: вызовов / всего, мс / p50 / p95 / макс / строк / КБ")
+        for op in operations[:top]:
+            lines.append(f"  {op['count']:>6} {op['total_ms']:>10.1f} {op['p50_ms']:>7.0f} {op['p95_ms']:>7.0f} "
+                         f"{op['max_ms']:>8.1f} {op['rows']:>8} {op['bytes'] / 1024:>8.1f}  {op['name']}")
+    if snapshot['slow']:
+        lines.append("\nМедленные операции:")
+        for entry in snapshot['slow'][-top:]:
+            lines.append(f"  {entry['at']} {entry['ms']:>9.1f} мс  {entry['kind']} {entry['name']}")
+            if 'params' in entry:
+                lines.append(f"      параметры: {entry['params']}")
+    return "\n".join(lines)
+
+# Общий экземпляр: настраивается из config.ini при создании хранилища (db_manager.configure_instrumentation)
+instrumentation = Instrumentation()
@@ -0,0 +1,150 @@
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+import numpy as np
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+
+UNCATEGORIZED = 'Без категории'
+HEADROOM = 0.1  # запас пределов осей: небольшие изменения данных не требуют полной перерисовки
+SHRINK_RATIO = 0.5  # данные занимают меньше этой доли оси - пределы подбираются заново
+
+def fit_limits(low: float, high: float, current: Tuple[float, float], headroom: float,
+               min_pad: float) -> Optional[Tuple[float, float]]:
+    """Новые пределы оси для данных в [low, high] или None, если текущие подходят"""
+    span = high - low
+    if current[0] <= low and high <= current[1] and span >= (current[1] - current[0]) * SHRINK_RATIO:
+        return None
+    pad = max(span * headroom, min_pad)
+    return low - pad, high + pad
+
+class LiveCharts:
+    """Фигура встроенных графиков: динамика баланса по дням и крупнейшие категории расходов.
+
+    Линия баланса и столбцы категорий создаются один раз. set_data и add_transaction
+    меняют только данные в памяти (чистый результат по дням и суммы расходов),
+    а redraw переносит их в существующие артисты. Оси, подписи и сетка рисуются
+    целиком только при изменении пределов осей или состава категорий; в остальных
+    случаях поверх сохраненного фона заново рисуются лишь линия и столбцы (blit).
+    """
+
+    def __init__(self, top_categories: int = 8, figsize=(6, 6), dpi: int = 80):
+        self.top_categories = top_categories
+        self.dates = np.array([], dtype='datetime64[D]')
+        self.net = np.array([], dtype=np.float64)
+        self.expenses: Dict[str, float] = {}
+        self.canvas = None
+        self.background = None
+        self._labels = [''] * top_categories
+        self._exporting = False
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        # Поля заданы заранее: автоматическая компоновка пересчитывалась бы при каждой перерисовке
+        self.figure.subplots_adjust(left=0.3, right=0.97, top=0.94, bottom=0.06, hspace=0.35)
+        self.balance_axes, self.category_axes = self.figure.subplots(2, 1, gridspec_kw={'height_ratios': [3, 2]})
+
+        self.balance_axes.set_title('Динамика баланса')
+        self.balance_axes.grid(True)
+        self.balance_axes.xaxis_date()
+        locator = AutoDateLocator()
+        self.balance_axes.xaxis.set_major_locator(locator)
+        self.balance_axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        self.balance_line, = self.balance_axes.plot([], [], animated=True)
+
+        positions = np.arange(top_categories)
+        self.category_axes.set_title('Расходы по категориям')
+        self.category_axes.grid(axis='x', linestyle='--', alpha=0.7)
+        self.category_bars = self.category_axes.barh(positions, np.zeros(top_categories), color='tab:red',
+                                                     animated=True)
+        self.category_axes.set_yticks(positions)
+        self.category_axes.set_yticklabels(self._labels)
+        self.category_axes.set_ylim(top_categories - 0.5, -0.5)  # крупнейшая категория сверху
+        self.artists = [self.balance_line, *self.category_bars]
+
+    def attach(self, canvas) -> None:
+        """Холст, на котором рисуется фигура (FigureCanvasTkAgg в окне, FigureCanvasAgg в замерах)"""
+        self.canvas = canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def set_data(self, dates: Iterable[Any], net: Iterable[float], expenses: Mapping[str, float]) -> None:
+        """Замена данных: даты по возрастанию, чистый результат по ним, суммы расходов по категориям"""
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.net = np.array(net, dtype=np.float64)
+        self.expenses = {name or UNCATEGORIZED: float(total) for name, total in expenses.items()}
+
+    def add_transaction(self, date: Any, amount: float, transaction_type: str, category: str = None) -> None:
+        """Учет одной новой операции без перезагрузки данных"""
+        day = np.datetime64(date, 'D')
+        signed = amount if transaction_type == 'income' else -amount
+        index = int(np.searchsorted(self.dates, day))
+        if index < len(self.dates) and self.dates[index] == day:
+            self.net[index] += signed
+        else:
+            self.dates = np.insert(self.dates, index, day)
+            self.net = np.insert(self.net, index, signed)
+        if transaction_type == 'expense':
+            category = category or UNCATEGORIZED
+            self.expenses[category] = self.expenses.get(category, 0.0) + amount
+
+    def refresh(self) -> bool:
+        """Перенос данных в линию и столбцы; True, если изменились пределы осей или подписи"""
+        changed = False
+        x = date2num(self.dates)
+        balance = np.cumsum(self.net)
+        self.balance_line.set_data(x, balance)
+        if len(x):
+            x_limits = fit_limits(x[0], x[-1], self.balance_axes.get_xlim(), 0.02, 1.0)
+            y_limits = fit_limits(balance.min(), balance.max(), self.balance_axes.get_ylim(), HEADROOM, 1.0)
+            if x_limits is not None:
+                self.balance_axes.set_xlim(x_limits)
+            if y_limits is not None:
+                self.balance_axes.set_ylim(y_limits)
+            changed = x_limits is not None or y_limits is not None
+
+        top = sorted(self.expenses.items(), key=lambda item: item[1], reverse=True)[:self.top_categories]
+        for index, bar in enumerate(self.category_bars):
+            bar.set_width(top[index][1] if index < len(top) else 0.0)
+        labels = [name for name, _ in top] + [''] * (self.top_categories - len(top))
+        if labels != self._labels:
+            self._labels = labels
+            self.category_axes.set_yticklabels(labels)
+            changed = True
+        largest = top[0][1] if top else 0.0
+        right = self.category_axes.get_xlim()[1]
+        if largest > right or largest < right * SHRINK_RATIO:
+            self.category_axes.set_xlim(0, largest * (1 + HEADROOM) or 1.0)
+            changed = True
+        return changed
+
+    def redraw(self) -> None:
+        """Обновление артистов и отрисовка: целиком или только линии и столбцов поверх фона"""
+        if self.refresh() or self.background is None:
+            self.canvas.draw_idle()  # после отрисовки _on_draw сохранит новый фон
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, _event) -> None:
+        """Полная отрисовка (в том числе при изменении размера окна): сохранение фона без линии и столбцов"""
+        if self._exporting:
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self) -> None:
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def export_png(self, filename: str) -> None:
+        """Сохранение графиков в PNG (изменяемые артисты на время сохранения рисуются как обычные)"""
+        self.refresh()
+        self._exporting = True
+        for artist in self.artists:
+            artist.set_animated(False)
+        try:
+            self.figure.savefig(filename)
+        finally:
+            for artist in self.artists:
+                artist.set_animated(True)
+            self._exporting = False
+            self.background = None
+            self.canvas.draw_idle()
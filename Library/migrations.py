@@ -0,0 +1,159 @@
+from typing import List, Dict, Any, Tuple
+from .db_manager import (get_backend, execute_query, TRANSACTION_COLUMNS, build_transaction_filters,
+                         rollup_rebuild_statements)
+
+SCHEMA_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    {period} DATE NOT NULL,
+    category_id INT NOT NULL DEFAULT 0,
+    type {type_column} NOT NULL,
+    total DECIMAL(16,2) NOT NULL DEFAULT 0,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY ({period}, category_id, type)
+)
+"""
+
+def rollup_tables(type_column: str) -> List[str]:
+    """Создание сводных таблиц по дням и месяцам"""
+    return [ROLLUP_TABLE.format(table='daily_rollups', period='day', type_column=type_column),
+            ROLLUP_TABLE.format(table='monthly_rollups', period='month', type_column=type_column)]
+
+# Полнотекстовый индекс описаний для SQLite: внешняя таблица FTS5 поверх transactions,
+# синхронизируется триггерами
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, content='transactions', content_rowid='id', tokenize='unicode61')",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END""",
+    "INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')",
+]
+
+# Номер последней строки журнала отложенной записи, уже сохраненной в transactions
+JOURNAL_STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS journal_state (
+    name VARCHAR(100) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0
+)
+"""
+
+# Версионированные миграции: (версия, описание, {хранилище: [SQL-команды]})
+MIGRATIONS: List[Tuple[int, str, Dict[str, List[str]]]] = [
+    (1, 'Индексы для фильтров и сортировки транзакций', {
+        'mysql': [
+            "CREATE INDEX idx_transactions_date_id ON transactions (date, id)",
+            "CREATE INDEX idx_transactions_category_date ON transactions (category_id, date)",
+            "CREATE INDEX idx_transactions_type_date ON transactions (type, date)",
+        ],
+        'sqlite': [
+            "CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date, id)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions (category_id, date)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions (type, date)",
+        ],
+    }),
+    (2, 'Сводные таблицы итогов по дням и месяцам', {
+        'mysql': rollup_tables("ENUM('income', 'expense')") + rollup_rebuild_statements('mysql'),
+        'sqlite': rollup_tables("TEXT CHECK (type IN ('income', 'expense'))") + rollup_rebuild_statements('sqlite'),
+    }),
+    (3, 'Полнотекстовый индекс описаний транзакций', {
+        'mysql': ["CREATE FULLTEXT INDEX ft_transactions_description ON transactions (description)"],
+        'sqlite': SQLITE_FTS,
+    }),
+    (4, 'Состояние журнала отложенной записи транзакций', {
+        'mysql': [JOURNAL_STATE_TABLE],
+        'sqlite': [JOURNAL_STATE_TABLE],
+    }),
+    (5, 'Индекс для фильтра по сумме транзакций', {
+        'mysql': ["CREATE INDEX idx_transactions_amount ON transactions (amount)"],
+        'sqlite': ["CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount)"],
+    }),
+]
+
+def get_applied_versions() -> List[int]:
+    """Список уже примененных версий схемы"""
+    execute_query(SCHEMA_TABLE)
+    return [row['version'] for row in execute_query("SELECT version FROM schema_migrations ORDER BY version")]
+
+# MySQL: индекс с таким именем уже есть (ER_DUP_KEYNAME)
+DUPLICATE_KEY_NAME = 1061
+
+def apply_statement(statement: str) -> None:
+    """Выполнение команды миграции; индекс, созданный прерванным запуском миграции, пропускается.
+
+    В MySQL нет CREATE INDEX IF NOT EXISTS, а DDL фиксируется сразу, поэтому после сбоя
+    посередине миграции ее повтор натыкался бы на уже созданные индексы.
+    """
+    try:
+        execute_query(statement)
+    except Exception as error:
+        if getattr(error, 'errno', None) != DUPLICATE_KEY_NAME:
+            raise
+
+def apply_migrations() -> List[int]:
+    """Применение всех новых миграций по порядку, возвращает примененные версии"""
+    backend = get_backend().name
+    applied = set(get_applied_versions())
+    newly_applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        for statement in statements[backend]:
+            apply_statement(statement)
+        execute_query("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                      (version, description))
+        newly_applied.append(version)
+    return newly_applied
+
+# Типичные запросы фильтров из get_transactions и get_transactions_page
+INDEX_CHECK_FILTERS = {
+    'период': dict(start_date='2024-01-01', end_date='2024-12-31'),
+    'категория': dict(category_id=1),
+    'категория и период': dict(start_date='2024-01-01', end_date='2024-12-31', category_id=1),
+    'тип операции': dict(transaction_type='expense'),
+    'сумма': dict(min_amount=100, max_amount=1000),
+    'поиск': dict(search='продукт*'),
+}
+
+def explain_query(query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    """План выполнения запроса (EXPLAIN в MySQL, EXPLAIN QUERY PLAN в SQLite)"""
+    prefix = "EXPLAIN QUERY PLAN " if get_backend().name == 'sqlite' else "EXPLAIN "
+    return execute_query(prefix + query, params)
+
+# Доступ по условию через индекс в EXPLAIN MySQL; 'index' (полный просмотр индекса) и 'ALL' не подходят
+MYSQL_INDEX_ACCESS = ('const', 'eq_ref', 'ref', 'range', 'fulltext')
+
+def uses_index(plan: List[Dict[str, Any]], table: str = 't') -> bool:
+    """Проверка, что строки таблицы выбираются поиском по индексу, а не полным просмотром"""
+    if get_backend().name == 'sqlite':
+        details = [row['detail'] for row in plan if row['detail'].split(' ')[1:2] == [table]]
+        # SCAN ... USING INDEX - просмотр всего индекса; SEARCH - поиск по условию, в том числе
+        # по rowid (INTEGER PRIMARY KEY), например для id из таблицы FTS5
+        return bool(details) and all(detail.startswith('SEARCH ') for detail in details)
+    rows = [row for row in plan if row['table'] == table]
+    return bool(rows) and all(row['key'] is not None and row['type'] in MYSQL_INDEX_ACCESS for row in rows)
+
+def check_index_usage() -> Dict[str, bool]:
+    """Проверка индексов по EXPLAIN для типичных запросов фильтрации и постраничного вывода"""
+    results = {}
+    for name, filters in INDEX_CHECK_FILTERS.items():
+        where, params = build_transaction_filters(**filters)
+        query = TRANSACTION_COLUMNS + where + " ORDER BY t.date DESC, t.id DESC"
+        results[name] = uses_index(explain_query(query, tuple(params)))
+        page = query + " LIMIT %s"
+        results[f"{name} (страница)"] = uses_index(explain_query(page, tuple(params) + (200,)))
+    return results
@@ -0,0 +1,182 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterable, Tuple
+from .db_manager import get_daily_category_totals, read_config, to_date
+from .instrumentation import instrumentation
+
+# Период отчета: (название, первый день, последний день)
+Period = Tuple[str, date, date]
+TYPES = ['income', 'expense']
+NO_CATEGORY = 'Без категории'
+
+def month_periods(year: int) -> List[Period]:
+    """12 месяцев года"""
+    periods = []
+    for month in range(1, 13):
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        periods.append((start.strftime('%Y-%m'), start, end))
+    return periods
+
+def previous_year(day: date) -> date:
+    """Та же дата годом раньше (29 февраля переходит в 28 февраля)"""
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+def load_daily_matrix(start: date, end: date) -> pd.DataFrame:
+    """Суммы по дням (строки, каждый день периода) и парам (тип, категория) в колонках"""
+    df = pd.DataFrame(get_daily_category_totals(start, end),
+                      columns=['date', 'transaction_type', 'category_id', 'category_name', 'total'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['total'] = df['total'].astype('float64')
+    df['category_name'] = df['category_name'].fillna(NO_CATEGORY)
+    matrix = df.pivot_table(index='date', columns=['transaction_type', 'category_name'],
+                            values='total', aggfunc='sum', fill_value=0.0)
+    return matrix.reindex(pd.date_range(start, end, freq='D'), fill_value=0.0)
+
+@instrumentation.timed('report')
+def build_period_report(periods: Iterable[Period], windows: Iterable[int] = (30, 90),
+                        compare_previous_year: bool = True) -> Dict[str, Any]:
+    """Итоги сразу по многим периодам за один запрос и один векторизованный проход.
+
+    Подневные суммы по категориям загружаются один раз за весь охват (включая
+    прошлый год и скользящие окна), накапливаются cumsum, а сумма любого периода
+    считается как разность двух строк накопленной матрицы.
+
+    periods    - итоги доходов, расходов и баланса по периодам (и год назад);
+    categories - суммы по категориям в каждом периоде с изменением к прошлому году;
+    rolling    - скользящие суммы по категориям за windows дней на конец последнего периода
+                 (но не позже сегодняшнего дня).
+
+    Периоды считаются только по сегодняшний день: текущий месяц сравнивается с теми же
+    днями год назад, а у еще не начавшихся периодов колонки сравнения пусты.
+    """
+    periods = [(label, to_date(start), to_date(end)) for label, start, end in periods]
+    windows = list(windows)
+    starts = np.array([start for _, start, _ in periods])
+    ends = np.array([end for _, _, end in periods])
+    as_of = min(ends.max(), date.today())
+    future = starts > as_of
+    # Части периодов после as_of не считаются: будущий период дает пустой отрезок [as_of + 1, as_of]
+    counted_starts = np.array([min(start, as_of + timedelta(days=1)) for start in starts])
+    counted_ends = np.array([min(end, as_of) for end in ends])
+    first = min(counted_starts.min(), as_of - timedelta(days=max(windows, default=1) - 1))
+    if compare_previous_year:
+        first = min(first, previous_year(counted_starts.min()))
+
+    matrix = load_daily_matrix(first, as_of)
+    # Накопленные суммы с нулевой строкой в начале: сумма за [s, e] = C[e + 1] - C[s]
+    cumulative = np.vstack([np.zeros((1, matrix.shape[1])), matrix.to_numpy().cumsum(axis=0)])
+
+    def sums(period_starts, period_ends) -> pd.DataFrame:
+        start_rows = [(day - first).days for day in period_starts]
+        end_rows = [(day - first).days + 1 for day in period_ends]
+        return pd.DataFrame(cumulative[end_rows] - cumulative[start_rows],
+                            index=[label for label, _, _ in periods], columns=matrix.columns)
+
+    current = sums(counted_starts, counted_ends)
+    previous = sums([previous_year(day) for day in counted_starts], [previous_year(day) for day in counted_ends]) \
+        if compare_previous_year else None
+
+    def by_type(totals: pd.DataFrame) -> pd.DataFrame:
+        grouped = totals.T.groupby(level=0).sum().T.reindex(columns=TYPES, fill_value=0.0)
+        return grouped.assign(net=grouped['income'] - grouped['expense'])
+
+    summary = by_type(current)
+    summary.insert(0, 'start', starts)
+    summary.insert(1, 'end', ends)
+    if previous is not None:
+        summary_previous = by_type(previous)
+        for column in ('income', 'expense', 'net'):
+            summary[f'{column}_previous'] = summary_previous[column]
+            summary[f'{column}_change'] = summary[column] - summary_previous[column]
+            summary[f'{column}_change_pct'] = change_pct(summary[column], summary_previous[column])
+        comparison = [column for column in summary.columns
+                      if column.endswith(('_previous', '_change', '_change_pct'))]
+        summary.loc[future, comparison] = np.nan
+
+    categories = current.stack(['transaction_type', 'category_name']).rename('total').to_frame()
+    if previous is not None:
+        categories['previous'] = previous.stack(['transaction_type', 'category_name'])
+        categories['change'] = categories['total'] - categories['previous']
+        categories['change_pct'] = change_pct(categories['total'], categories['previous'])
+    categories = categories[(categories != 0).any(axis=1)]
+    categories.index.names = ['period', 'transaction_type', 'category_name']
+
+    last_row = (as_of - first).days + 1
+    rolling = pd.DataFrame({f'{window}d': cumulative[last_row] - cumulative[last_row - window]
+                            for window in windows}, index=matrix.columns)
+    rolling.index.names = ['transaction_type', 'category_name']
+
+    # Разности накопленных сумм дают ошибки округления float - приводим к копейкам
+    return {'as_of': as_of, 'periods': summary.round(2), 'categories': categories.reset_index().round(2),
+            'rolling': rolling.reset_index().round(2)}
+
+def change_pct(current: pd.Series, previous: pd.Series) -> pd.Series:
+    """Изменение в процентах (NaN, если в прошлом периоде было 0)"""
+    return (current - previous) / previous.where(previous != 0) * 100
+
+def format_period_report(report: Dict[str, Any]) -> str:
+    """Текстовое представление отчета по периодам"""
+    summary = report['periods']
+    if summary.empty:
+        return "Нет периодов для отчета"
+    with_previous = 'net_previous' in summary
+    lines = [f"Отчет по периодам {summary['start'].min()} - {summary['end'].max()}", ""]
+    header = f"{'Период':<12}{'Доход':>14}{'Расход':>14}{'Баланс':>14}"
+    if with_previous:
+        header += f"{'Расход год назад':>18}{'Изм. расх., %':>15}"
+    lines.append(header)
+    for label, row in summary.iterrows():
+        line = f"{label:<12}{row['income']:>14.2f}{row['expense']:>14.2f}{row['net']:>14.2f}"
+        if with_previous:
+            previous, pct = row['expense_previous'], row['expense_change_pct']
+            line += (f"{previous:>18.2f}" if pd.notna(previous) else f"{'-':>18}") + \
+                (f"{pct:>15.1f}" if pd.notna(pct) else f"{'-':>15}")
+        lines.append(line)
+
+    rolling = report['rolling']
+    windows = [column for column in rolling.columns if column.endswith('d')]
+    lines += ["", f"Скользящие суммы расходов на {report['as_of']}:",
+              f"{'Категория':<24}" + "".join(f"{column[:-1] + ' дн.':>14}" for column in windows)]
+    for _, row in rolling[rolling['transaction_type'] == 'expense'].iterrows():
+        lines.append(f"{row['category_name']:<24}" + "".join(f"{row[column]:>14.2f}" for column in windows))
+    return "\n".join(lines) + "\n"
+
+def json_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Строки DataFrame для JSON: даты в ISO, NaN - null"""
+    records = df.astype(object).where(df.notna(), None).to_dict(orient='records')
+    return [{key: value.isoformat() if isinstance(value, date) else value for key, value in record.items()}
+            for record in records]
+
+def export_period_report(report: Dict[str, Any], prefix: str = None) -> Dict[str, str]:
+    """Сохранение отчета в export_path: CSV по каждой таблице и общий JSON, возвращает пути файлов"""
+    export_path = read_config()['REPORTS']['export_path']
+    if prefix is None:
+        prefix = f"period_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(export_path, exist_ok=True)
+    files = {}
+    for name in ('periods', 'categories', 'rolling'):
+        df = report[name].reset_index(names='period') if name == 'periods' else report[name]
+        files[name] = os.path.join(export_path, f"{prefix}_{name}.csv")
+        df.to_csv(files[name], index=False, float_format='%.2f')
+    files['json'] = os.path.join(export_path, f"{prefix}.json")
+    with open(files['json'], 'w', encoding='utf-8') as json_file:
+        json.dump({'as_of': report['as_of'].isoformat(),
+                   'periods': json_records(report['periods'].reset_index(names='period')),
+                   'categories': json_records(report['categories']),
+                   'rolling': json_records(report['rolling'])},
+                  json_file, ensure_ascii=False, indent=2)
+    return files
+
+@instrumentation.timed('report')
+def generate_year_report(year: int, windows: Iterable[int] = (30, 90)) -> str:
+    """Отчет по 12 месяцам года со сравнением с прошлым годом; файлы CSV/JSON сохраняются в export_path"""
+    report = build_period_report(month_periods(year), windows)
+    files = export_period_report(report, prefix=f"year_report_{year}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    return format_period_report(report) + "\nФайлы отчета:\n" + "\n".join(files.values())
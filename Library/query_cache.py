@@ -0,0 +1,142 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterable, Optional, Tuple
+
+def estimate_size(rows) -> int:
+    """Приблизительный объем памяти результата запроса (по первой строке)"""
+    if hasattr(rows, 'nbytes'):
+        return rows.nbytes  # колоночный результат знает свой размер
+    size = sys.getsizeof(rows)
+    if rows:
+        sample = rows[0]
+        row_size = sys.getsizeof(sample) + sum(sys.getsizeof(value) for value in sample.values())
+        size += row_size * len(rows)
+    return size
+
+class TransactionQueryCache:
+    """LRU-кэш результатов выборок транзакций с ограничением по времени жизни и памяти.
+
+    Ключ - нормализованный набор фильтров (start_date, end_date, category_id,
+    min_amount, max_amount, search) и параметры запроса (страница, лимит). При добавлении
+    транзакций сбрасываются только записи, чей период и категория пересекаются
+    с новыми строками. Каждый сброс увеличивает поколение кэша: результат загрузки,
+    во время которой был сброс, не сохраняется (он мог быть прочитан до записи новых строк).
+    """
+
+    def __init__(self, ttl: float = 300, max_bytes: int = 64 * 1024 * 1024, enabled: bool = True):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    @staticmethod
+    def make_filters(start_date=None, end_date=None, category_id=None,
+                     min_amount=None, max_amount=None, search=None) -> tuple:
+        """Нормализация фильтров: одинаковые условия дают одинаковый ключ"""
+        return (str(start_date)[:10] if start_date else None,
+                str(end_date)[:10] if end_date else None,
+                int(category_id) if category_id else None,
+                float(min_amount) if min_amount is not None else None,
+                float(max_amount) if max_amount is not None else None,
+                ' '.join(search.lower().split()) if search else None)
+
+    def get_or_load(self, filters: tuple, extra: tuple, loader: Callable[[], Any]) -> Any:
+        """Результат из кэша или загрузка через loader (списки возвращаются копией)"""
+        if not self.enabled:
+            return loader()
+        key = (filters, extra)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[2])
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            generation = self.generation
+
+        rows = loader()
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return rows
+        with self._lock:
+            if self.generation != generation:
+                return self._copy(rows)  # данные менялись во время загрузки: результат мог устареть
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (now, size, rows)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return self._copy(rows)
+
+    @staticmethod
+    def _copy(rows):
+        return list(rows) if isinstance(rows, list) else rows
+
+    def _drop(self, key: tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def invalidate_rows(self, dates: Iterable[str], category_ids: Iterable[Optional[int]]) -> None:
+        """Сброс записей, чьи фильтры по периоду и категории могут включать новые строки"""
+        dates = [str(value)[:10] for value in dates]
+        if not dates:
+            return
+        first, last = min(dates), max(dates)
+        categories = {int(value) for value in category_ids if value}
+        with self._lock:
+            self.generation += 1
+            for key in list(self._entries):
+                start, end, category_id = key[0][:3]
+                if start is not None and start > last:
+                    continue
+                if end is not None and end < first:
+                    continue
+                if category_id is not None and category_id not in categories:
+                    continue
+                self._drop(key)
+                self.invalidations += 1
+
+    def invalidate_category(self, category_id: int) -> None:
+        """Сброс записей, которые могут содержать транзакции категории"""
+        with self._lock:
+            self.generation += 1
+            for key in list(self._entries):
+                if key[0][2] in (None, category_id):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Полный сброс кэша"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов для оценки эффективности кэша"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
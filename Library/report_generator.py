@@ -1,142 +1,253 @@
+import csv
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # графики сохраняются в файлы, интерактивный backend не нужен
 import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from .db_manager import get_transactions
-import configparser
-import os
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Union
+from .db_manager import (get_totals_by_type, get_sums_by_category, get_daily_totals, read_config,
+                         stream_transactions, get_data_fingerprint)
+from .chart_cache import ChartCache
+from .columnar import fetch_transaction_columns
+from .instrumentation import instrumentation
+
+CHART_TYPES = ('pie', 'line', 'bar')
+TRANSACTION_FIELDS = ['id', 'date', 'amount', 'category_id', 'description',
+                      'transaction_type', 'created_at', 'category_name']
+# Шаги агрегации по времени: день, неделя, месяц (начало месяца)
+RESAMPLE_RULES = {'day': 'D', 'week': 'W', 'month': 'MS'}
+# Источники данных отчетов: БД или снимок Arrow (Library/snapshot.py, без обращения к БД)
+SOURCES = ('db', 'snapshot')
 
 def load_config() -> Dict[str, str]:
     """Загрузка конфигурации из config.ini"""
-    config = configparser.ConfigParser()
-    config_path = os.path.join(os.path.dirname(__file__), os.pardir, 'Scripts', 'config.ini')
-    config.read(config_path)
+    config = read_config()
     return {
         'export_path': config['REPORTS']['export_path'],
         'graphics_path': config['REPORTS']['graphics_path']
     }
 
-def generate_text_report(start_date: str, end_date: str) -> str:
+@instrumentation.timed('report')
+def load_transactions_frame(start_date: str, end_date: str, source: str = 'db') -> pd.DataFrame:
+    """Загрузка транзакций за период в DataFrame с приведенными типами колонок.
+
+    Строки читаются из курсора пачками сразу в колоночное хранилище,
+    без промежуточного списка словарей; source='snapshot' - из файлов снимка.
+    """
+    if source == 'snapshot':
+        from .snapshot import TransactionSnapshot
+        return TransactionSnapshot().read_frame(start_date, end_date)
+    return fetch_transaction_columns(start_date, end_date).to_dataframe()
+
+def rows_to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """DataFrame из строк транзакций с приведенными типами колонок"""
+    df = pd.DataFrame(rows, columns=TRANSACTION_FIELDS)
+    df['date'] = pd.to_datetime(df['date'])
+    df['amount'] = pd.to_numeric(df['amount'], errors='coerce').astype('float64')
+    df['transaction_type'] = df['transaction_type'].astype('category')
+    df['category_name'] = df['category_name'].astype('category')
+    return df
+
+def iter_transaction_frames(start_date: str = None, end_date: str = None,
+                            chunk_size: int = None) -> Iterator[pd.DataFrame]:
+    """Транзакции за период последовательными DataFrame по chunk_size строк (по возрастанию даты)"""
+    for rows in stream_transactions(start_date, end_date, chunk_size=chunk_size):
+        yield rows_to_frame(rows)
+
+@instrumentation.timed('report')
+def stream_totals_by_date(start_date: str = None, end_date: str = None, freq: str = None,
+                          chunk_size: int = None) -> pd.DataFrame:
+    """totals_by_date по потоку пачек: в памяти только одна пачка и итоги по датам"""
+    totals = None
+    for frame in iter_transaction_frames(start_date, end_date, chunk_size):
+        part = totals_by_date(frame)[['income', 'expense']]
+        # Пачки идут по возрастанию даты, поэтому пересекаться может только граничная дата
+        totals = part if totals is None else totals.add(part, fill_value=0)
+    if totals is None:
+        totals = pd.DataFrame({'income': [], 'expense': []}, index=pd.DatetimeIndex([], name='date'))
+    return resample_totals(totals, freq)
+
+@instrumentation.timed('report')
+def export_transactions_csv(start_date: str = None, end_date: str = None, category_id: int = None,
+                            min_amount: float = None, max_amount: float = None, search: str = None,
+                            filename: str = None, chunk_size: int = None) -> str:
+    """Экспорт транзакций по фильтрам в CSV (export_path), строки пишутся по мере чтения из БД"""
+    if filename is None:
+        filename = f"{load_config()['export_path']}transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(filename, 'w', newline='', encoding='utf-8') as export_file:
+        writer = csv.DictWriter(export_file, fieldnames=TRANSACTION_FIELDS)
+        writer.writeheader()
+        for rows in stream_transactions(start_date, end_date, category_id, min_amount, max_amount, search,
+                                        chunk_size):
+            writer.writerows(rows)
+    return filename
+
+def signed_amounts(df: pd.DataFrame) -> pd.Series:
+    """Суммы со знаком: доход положительный, расход отрицательный"""
+    return df['amount'].where(df['transaction_type'] == 'income', -df['amount'])
+
+def totals_by_date(df: pd.DataFrame, freq: str = None) -> pd.DataFrame:
+    """Доходы, расходы и чистый результат по датам (freq: day, week, month или None)"""
+    totals = (df.groupby(['date', 'transaction_type'], observed=True)['amount'].sum()
+                .unstack(fill_value=0)
+                .reindex(columns=['income', 'expense'], fill_value=0))
+    totals.columns = list(totals.columns)
+    return resample_totals(totals, freq)
+
+def resample_totals(totals: pd.DataFrame, freq: str = None) -> pd.DataFrame:
+    """Агрегация колонок income/expense с индексом-датой по шагу freq и расчет net"""
+    totals = totals[['income', 'expense']]
+    if freq is not None:
+        totals = totals.resample(RESAMPLE_RULES[freq]).sum()
+    return totals.assign(net=totals['income'] - totals['expense'])
+
+def balance_over_time(df: pd.DataFrame, freq: str = None) -> pd.Series:
+    """Накопленный баланс на конец каждой даты (или каждого шага freq)"""
+    return totals_by_date(df, freq)['net'].cumsum()
+
+def report_data_from_frame(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Те же агрегаты, что у load_report_data, по DataFrame транзакций"""
+    by_type = (df.groupby('transaction_type', observed=True)['amount'].agg(total='sum', count='count')
+                 .reset_index())
+    by_category = (df.groupby(['transaction_type', 'category_id', 'category_name'], observed=True, dropna=False)
+                     ['amount'].sum().rename('total').reset_index())
+    by_type['transaction_type'] = by_type['transaction_type'].astype(str)
+    by_category['transaction_type'] = by_category['transaction_type'].astype(str)
+    by_category['category_name'] = by_category['category_name'].astype(object)
+    by_category = by_category.sort_values('category_name', kind='stable', ignore_index=True)
+    return {'by_type': by_type, 'by_category': by_category, 'daily': totals_by_date(df)}
+
+@instrumentation.timed('report')
+def load_report_data(start_date: str, end_date: str, source: str = 'db') -> Dict[str, pd.DataFrame]:
+    """Агрегаты за период, посчитанные на стороне БД (source='snapshot' - по снимку).
+
+    by_type - итоги по типу, by_category - суммы по категориям,
+    daily - доходы, расходы и чистый результат по дням (индекс - дата).
+    """
+    if source == 'snapshot':
+        return report_data_from_frame(load_transactions_frame(start_date, end_date, source))
+    by_type = pd.DataFrame(get_totals_by_type(start_date, end_date),
+                           columns=['transaction_type', 'total', 'count'])
+    by_category = pd.DataFrame(get_sums_by_category(start_date, end_date),
+                               columns=['transaction_type', 'category_id', 'category_name', 'total'])
+    daily = pd.DataFrame(get_daily_totals(start_date, end_date),
+                         columns=['date', 'income', 'expense', 'net'])
+    by_type['total'] = by_type['total'].astype('float64')
+    by_category['total'] = by_category['total'].astype('float64')
+    daily['date'] = pd.to_datetime(daily['date'])
+    daily = resample_totals(daily.set_index('date').astype('float64'))
+    return {'by_type': by_type, 'by_category': by_category, 'daily': daily}
+
+def category_sums(data: Dict[str, pd.DataFrame], type_: str) -> pd.Series:
+    """Суммы по названиям категорий для одного типа транзакций"""
+    by_category = data['by_category']
+    return by_category[by_category['transaction_type'] == type_].groupby('category_name')['total'].sum()
+
+@instrumentation.timed('report')
+def load_chart_series(start_date: str = None, end_date: str = None, category_id: int = None,
+                      min_amount: float = None, max_amount: float = None, search: str = None) -> Dict[str, Any]:
+    """Данные встроенных графиков для фильтров таблицы операций.
+
+    Если задан только период, агрегаты берутся из сводных таблиц (load_report_data),
+    иначе считаются по колоночной выборке с теми же фильтрами. dates и net - даты
+    и чистый результат по дням (массивы numpy), expense - суммы расходов по категориям.
+    """
+    if category_id is None and min_amount is None and max_amount is None and not search:
+        data = load_report_data(start_date, end_date)
+    else:
+        data = report_data_from_frame(fetch_transaction_columns(start_date, end_date, category_id, min_amount,
+                                                                max_amount, search).to_dataframe())
+    net = data['daily']['net']
+    return {'dates': net.index.values.astype('datetime64[D]'), 'net': net.to_numpy(dtype='float64'),
+            'expense': category_sums(data, 'expense').to_dict()}
+
+@instrumentation.timed('report')
+def generate_text_report(start_date: str, end_date: str, source: str = 'db') -> str:
     """Генерация текстового отчета"""
-    transactions = get_transactions(start_date, end_date)
-    df = pd.DataFrame(transactions)
-    
-    if df.empty:
+    data = load_report_data(start_date, end_date, source)
+
+    if data['by_type'].empty:
         return "Нет данных за указанный период"
-    
-    total_income = df[df['transaction_type'] == 'income']['amount'].sum()
-    total_expense = df[df['transaction_type'] == 'expense']['amount'].sum()
+
+    totals = data['by_type'].set_index('transaction_type')['total']
+    total_income = totals.get('income', 0.0)
+    total_expense = totals.get('expense', 0.0)
     balance = total_income - total_expense
-    
+
     report = f"Отчет за период {start_date} - {end_date}\n"
     report += f"Общий доход: {total_income:.2f}\n"
     report += f"Общий расход: {total_expense:.2f}\n"
     report += f"Баланс: {balance:.2f}\n\n"
-    
+
     # Статистика по категориям
     report += "Расходы по категориям:\n"
-    category_stats = df[df['transaction_type'] == 'expense'].groupby('category_name')['amount'].sum()
-    for category, amount in category_stats.items():
+    for category, amount in category_sums(data, 'expense').items():
         report += f"{category}: {amount:.2f}\n"
-    
+
     return report
 
-def generate_pie_chart(start_date: str, end_date: str) -> str:
-    """Генерация круговых диаграмм расходов и доходов"""
-    transactions = get_transactions(start_date, end_date)
-    df = pd.DataFrame(transactions)
-    
-    if df.empty:
+def chart_tag(tag: str = None) -> str:
+    """Суффикс имени файла графика: ключ кэша или текущее время"""
+    return tag or datetime.now().strftime('%Y%m%d_%H%M%S')
+
+def render_pie_charts(data: Dict[str, pd.DataFrame], graphics_path: str, tag: str = None) -> Union[List[str], str]:
+    """Построение круговых диаграмм расходов и доходов по агрегатам load_report_data"""
+    if data['by_type'].empty:
         return "Нет данных для построения графика"
-    
-    config = load_config()
+
     filenames = []
-    
-    # Диаграмма расходов
-    expense_df = df[df['transaction_type'] == 'expense']
-    if not expense_df.empty:
-        plt.figure(figsize=(10, 6))
-        plt.pie(expense_df.groupby('category_name')['amount'].sum(),
-                labels=expense_df['category_name'].unique(),
-                autopct='%1.1f%%')
-        plt.title('Распределение расходов по категориям')
-        
-        filename = f"{config['graphics_path']}expense_pie_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        plt.savefig(filename)
-        plt.close()
-        filenames.append(filename)
-    
-    # Диаграмма доходов
-    income_df = df[df['transaction_type'] == 'income']
-    if not income_df.empty:
+    for type_, title, prefix in (('expense', 'Распределение расходов по категориям', 'expense'),
+                                 ('income', 'Распределение доходов по категориям', 'income')):
+        sums = category_sums(data, type_)
+        if sums.empty:
+            continue
         plt.figure(figsize=(10, 6))
-        plt.pie(income_df.groupby('category_name')['amount'].sum(),
-                labels=income_df['category_name'].unique(),
-                autopct='%1.1f%%')
-        plt.title('Распределение доходов по категориям')
-        
-        filename = f"{config['graphics_path']}income_pie_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        plt.pie(sums.values, labels=sums.index, autopct='%1.1f%%')
+        plt.title(title)
+
+        filename = f"{graphics_path}{prefix}_pie_chart_{chart_tag(tag)}.png"
         plt.savefig(filename)
         plt.close()
         filenames.append(filename)
-    
-    return filenames[0] if filenames else "Нет данных для построения графика"
 
-def generate_line_chart(start_date: str, end_date: str) -> str:
-    """Генерация линейного графика динамики"""
-    transactions = get_transactions(start_date, end_date)
-    df = pd.DataFrame(transactions)
-    
-    if df.empty:
+    return filenames if filenames else "Нет данных для построения графика"
+
+def render_line_chart(data: Dict[str, pd.DataFrame], graphics_path: str, tag: str = None) -> str:
+    """Построение линейного графика динамики по агрегатам load_report_data"""
+    if data['daily'].empty:
         return "Нет данных для построения графика"
-    
-    df['date'] = pd.to_datetime(df['date'])
-    daily_balance = df.groupby('date').apply(
-        lambda x: x[x['transaction_type'] == 'income']['amount'].sum() - 
-                 x[x['transaction_type'] == 'expense']['amount'].sum()
-    ).cumsum()
-    
+
+    daily_balance = data['daily']['net'].cumsum()
+
     plt.figure(figsize=(12, 6))
     plt.plot(daily_balance.index, daily_balance.values)
     plt.title('Динамика баланса')
     plt.xlabel('Дата')
     plt.ylabel('Баланс')
     plt.grid(True)
-    
-    config = load_config()
-    filename = f"{config['graphics_path']}line_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+
+    filename = f"{graphics_path}line_chart_{chart_tag(tag)}.png"
     plt.savefig(filename)
     plt.close()
     return filename
 
-def generate_bar_chart(start_date: str, end_date: str) -> str:
-    """Генерация столбчатой диаграммы доходов и расходов"""
-    transactions = get_transactions(start_date, end_date)
-    df = pd.DataFrame(transactions)
-    
-    if df.empty:
+def render_bar_chart(data: Dict[str, pd.DataFrame], graphics_path: str, tag: str = None) -> str:
+    """Построение столбчатой диаграммы доходов и расходов по агрегатам load_report_data"""
+    if data['by_category'].empty:
         return "Нет данных для построения графика"
-    
-    # Преобразуем amount в числовой тип
-    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-    
-    income_df = df[df['transaction_type'] == 'income']
-    expense_df = df[df['transaction_type'] == 'expense']
-    
-    # Группировка по категориям
-    income_by_category = income_df.groupby('category_name')['amount'].sum()
-    expense_by_category = expense_df.groupby('category_name')['amount'].sum()
-    
-    # Объединяем данные для графика
+
+    # Объединяем суммы по категориям для графика
     plot_data = pd.DataFrame({
-        'Доход': income_by_category,
-        'Расход': expense_by_category
+        'Доход': category_sums(data, 'income'),
+        'Расход': category_sums(data, 'expense')
     }).fillna(0)
-    
+
     if plot_data.empty or plot_data.sum().sum() == 0:
         return "Нет данных для построения графика"
-    
+
     plt.figure(figsize=(12, 7))
     plot_data.plot(kind='bar', ax=plt.gca())
     plt.title('Доходы и расходы по категориям')
@@ -145,9 +256,96 @@ def generate_bar_chart(start_date: str, end_date: str) -> str:
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    config = load_config()
-    filename = f"{config['graphics_path']}bar_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+
+    filename = f"{graphics_path}bar_chart_{chart_tag(tag)}.png"
     plt.savefig(filename)
     plt.close()
-    return filename 
\ No newline at end of file
+    return filename
+
+RENDERERS = {'pie': render_pie_charts, 'line': render_line_chart, 'bar': render_bar_chart}
+
+def render_chart(chart: str, data: Dict[str, pd.DataFrame], graphics_path: str,
+                 tag: str = None) -> Tuple[Union[List[str], str], float]:
+    """Построение графика с замером: (результат, секунды); время меряется там, где график строится"""
+    started = time.perf_counter()
+    result = RENDERERS[chart](data, graphics_path, tag)
+    return result, time.perf_counter() - started
+
+def get_chart_cache() -> ChartCache:
+    """Кэш графиков в папке graphics_path с настройками из секции [REPORTS]"""
+    config = read_config()
+    return ChartCache(load_config()['graphics_path'],
+                      max_bytes=config.getint('REPORTS', 'chart_cache_max_megabytes', fallback=100) * 1024 * 1024,
+                      max_age=config.getfloat('REPORTS', 'chart_cache_max_age_days', fallback=30) * 24 * 3600,
+                      enabled=config.getboolean('REPORTS', 'chart_cache', fallback=True))
+
+class SerialExecutor(Executor):
+    """Выполнение задачи сразу в текущем потоке (для одиночного графика пул процессов не нужен)"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+        return future
+
+def generate_pie_charts(start_date: str, end_date: str) -> Union[List[str], str]:
+    """Генерация круговых диаграмм расходов и доходов: список файлов или сообщение об отсутствии данных"""
+    return generate_charts(start_date, end_date, ['pie'], executor=SerialExecutor())['pie']
+
+def generate_pie_chart(start_date: str, end_date: str) -> str:
+    """Генерация круговых диаграмм расходов и доходов, возвращает путь к первой (все - generate_pie_charts)"""
+    charts = generate_pie_charts(start_date, end_date)
+    return charts[0] if isinstance(charts, list) else charts
+
+def generate_line_chart(start_date: str, end_date: str) -> str:
+    """Генерация линейного графика динамики"""
+    return generate_charts(start_date, end_date, ['line'], executor=SerialExecutor())['line']
+
+def generate_bar_chart(start_date: str, end_date: str) -> str:
+    """Генерация столбчатой диаграммы доходов и расходов"""
+    return generate_charts(start_date, end_date, ['bar'], executor=SerialExecutor())['bar']
+
+def generate_charts(start_date: str, end_date: str, charts: Iterable[str] = CHART_TYPES,
+                    executor: Executor = None, source: str = 'db') -> Dict[str, Union[List[str], str]]:
+    """Генерация нескольких графиков за период.
+
+    Графики, чьи данные не изменились (тот же отпечаток get_data_fingerprint
+    или отметка снимка), берутся из кэша на диске. Для остальных агрегаты загружаются
+    один раз, а графики строятся параллельно в процессах executor
+    (если не передан, создается временный пул процессов).
+    """
+    cache = get_chart_cache()
+    if source == 'snapshot':
+        from .snapshot import TransactionSnapshot
+        fingerprint = TransactionSnapshot().fingerprint()
+    else:
+        fingerprint = get_data_fingerprint(start_date, end_date)
+    keys = {chart: cache.make_key(chart, start_date, end_date, fingerprint) for chart in charts}
+    results = {chart: cache.get(key) for chart, key in keys.items()}
+    missing = [chart for chart, result in results.items() if result is None]
+    if instrumentation.enabled:
+        for chart in results.keys() - set(missing):
+            instrumentation.record('chart', f"{chart} (кэш)", 0.0)
+    if not missing:
+        return results
+
+    data = load_report_data(start_date, end_date, source)
+    graphics_path = cache.directory
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=len(missing),
+                                       mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {chart: executor.submit(render_chart, chart, data, graphics_path, keys[chart]) for chart in missing}
+        for chart, future in futures.items():
+            results[chart], seconds = future.result()
+            if instrumentation.enabled:
+                instrumentation.record('chart', chart, seconds)
+            cache.put(keys[chart], results[chart])
+        return results
+    finally:
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,324 @@
+import glob
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .db_manager import (read_config, iterate_query, get_categories, get_stream_chunk_size, to_date,
+                         TRANSACTION_COLUMNS, PROJECT_ROOT)
+
+WATERMARK_FILE = '_watermark.json'
+PARTITION_PREFIX = 'month='
+
+def require_pyarrow():
+    """Импорт pyarrow (необязательная зависимость: нужна только для снимков)"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+    except ImportError:
+        raise RuntimeError("Для снимков данных нужен пакет pyarrow (conda install pyarrow)") from None
+    return pyarrow
+
+def snapshot_schema():
+    """Колонки снимка - те же, что у строк get_transactions (TRANSACTION_FIELDS)"""
+    pa = require_pyarrow()
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.int64()),
+        ('date', pa.date32()),
+        ('amount', pa.float64()),
+        ('category_id', pa.int32()),
+        ('description', pa.string()),
+        ('transaction_type', labels),
+        ('created_at', pa.timestamp('us')),
+        ('category_name', labels),
+    ])
+
+def get_gap_timeout() -> float:
+    """Сколько секунд пропуски в id ждут строк незавершенных транзакций ([SNAPSHOT] gap_timeout_minutes)"""
+    return read_config().getfloat('SNAPSHOT', 'gap_timeout_minutes', fallback=60) * 60
+
+def in_gaps(id_: int, gaps: List[List[float]]) -> bool:
+    return any(first <= id_ <= last for first, last, _ in gaps)
+
+def split_gaps(gaps: List[List[float]], found: Iterable[int]) -> List[List[float]]:
+    """Пропуски [первый id, последний id, время обнаружения] без найденных в них id"""
+    found = sorted(found)
+    result = []
+    for first, last, since in gaps:
+        start = first
+        for id_ in found:
+            if start <= id_ <= last:
+                if id_ > start:
+                    result.append([start, id_ - 1, since])
+                start = id_ + 1
+        if start <= last:
+            result.append([start, last, since])
+    return result
+
+def get_snapshot_path() -> str:
+    """Папка снимка из секции [SNAPSHOT] в config.ini"""
+    path = read_config().get('SNAPSHOT', 'path', fallback='Data/snapshot')
+    return os.path.join(PROJECT_ROOT, path)
+
+class TransactionSnapshot:
+    """Снимок транзакций с названиями категорий в файлах Arrow IPC, разбитых по месяцам.
+
+    Файлы лежат в папках month=ГГГГ-ММ (разбиение в стиле Hive - снимок открывается
+    pyarrow.dataset и pandas в Jupyter). Выгрузка инкрементальная: в _watermark.json
+    хранится максимальный выгруженный id, и export дописывает только строки с большим id
+    новыми файлами part-<первый id>-<последний id>.arrow. Id выдаются до фиксации транзакции,
+    поэтому строка с меньшим id может появиться в БД позже строк с большими: пропуски в id
+    выгруженных строк запоминаются в отметке и проверяются при следующих выгрузках
+    (пока не пройдет gap_timeout_minutes - пропуски от отката или удаления строк не заполнятся
+    никогда). Месяцы, в которых уже выгруженным
+    строкам назначены категории (assign_categories отмечает их через mark_stale), export
+    выгружает заново целиком. Удаление транзакций строки снимка не затрагивает, поэтому
+    при изменении справочника категорий снимок пересобирается полностью. Файлы читаются
+    через отображение в память, без копирования.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or get_snapshot_path()
+
+    @property
+    def watermark_path(self) -> str:
+        return os.path.join(self.path, WATERMARK_FILE)
+
+    def read_watermark(self) -> Dict[str, Any]:
+        """Состояние снимка: max_id, число строк, справочник категорий на момент выгрузки"""
+        try:
+            with open(self.watermark_path, encoding='utf-8') as watermark_file:
+                return json.load(watermark_file)
+        except (OSError, ValueError):
+            return {'max_id': 0, 'rows': 0, 'categories': None, 'updated': None, 'stale': [], 'gaps': []}
+
+    def _write_watermark(self, watermark: Dict[str, Any]) -> None:
+        temp_path = f"{self.watermark_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as watermark_file:
+            json.dump(watermark, watermark_file, ensure_ascii=False)
+        os.replace(temp_path, self.watermark_path)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.watermark_path)
+
+    def fingerprint(self) -> Tuple:
+        """Отпечаток данных снимка для ключей кэша графиков"""
+        watermark = self.read_watermark()
+        return ('snapshot', watermark['max_id'], watermark['rows'], watermark['updated'])
+
+    @staticmethod
+    def _part_ids(filename: str) -> Tuple[int, int]:
+        first, last = os.path.basename(filename)[len('part-'):-len('.arrow')].split('-')
+        return int(first), int(last)
+
+    def _parts(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, f"{PARTITION_PREFIX}*", 'part-*.arrow')))
+
+    def _partitions(self, start_date=None, end_date=None) -> List[str]:
+        """Папки месяцев, пересекающихся с периодом (остальные не открываются)"""
+        first = to_date(start_date).strftime('%Y-%m') if start_date else None
+        last = to_date(end_date).strftime('%Y-%m') if end_date else None
+        partitions = []
+        for directory in sorted(glob.glob(os.path.join(self.path, f"{PARTITION_PREFIX}*"))):
+            month = os.path.basename(directory)[len(PARTITION_PREFIX):]
+            if (first is None or month >= first) and (last is None or month <= last):
+                partitions.append(directory)
+        return partitions
+
+    def _table(self, rows: List[tuple]):
+        """Таблица Arrow из строк запроса TRANSACTION_COLUMNS"""
+        pa = require_pyarrow()
+        ids, dates, amounts, category_ids, descriptions, types, created, names = zip(*rows)
+        schema = snapshot_schema()
+        return pa.table([
+            pa.array(ids, pa.int64()),
+            pa.array([to_date(value) for value in dates], pa.date32()),
+            pa.array([float(value) for value in amounts], pa.float64()),
+            pa.array(category_ids, pa.int32()),
+            pa.array(descriptions, pa.string()),
+            pa.array(types, pa.string()).dictionary_encode(),
+            pa.array(created, pa.timestamp('us')),
+            pa.array(names, pa.string()).dictionary_encode(),
+        ], schema=schema)
+
+    def _month_directory(self, month: str) -> str:
+        return os.path.join(self.path, f"{PARTITION_PREFIX}{month}")
+
+    def _write_part(self, directory: str, rows: List[tuple]) -> None:
+        """Запись строк одного месяца новым файлом в папку месяца (через временный файл)"""
+        pa = require_pyarrow()
+        os.makedirs(directory, exist_ok=True)
+        filename = os.path.join(directory, f"part-{rows[0][0]:012d}-{rows[-1][0]:012d}.arrow")
+        temp_path = f"{filename}.tmp"
+        table = self._table(rows)
+        with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(temp_path, filename)
+
+    def _write_rows(self, rows: Iterable[tuple]) -> None:
+        """Запись строк новыми файлами в папки их месяцев"""
+        by_month: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_month.setdefault(to_date(row[1]).strftime('%Y-%m'), []).append(tuple(row))
+        for month, month_rows in by_month.items():
+            self._write_part(self._month_directory(month), month_rows)
+
+    def mark_stale(self, rows: Iterable[Tuple[int, Any]]) -> None:
+        """Отметка месяцев строк (id, date), измененных в БД после выгрузки: export выгрузит их заново"""
+        if not self.exists():
+            return
+        watermark = self.read_watermark()
+        months = {to_date(date_).strftime('%Y-%m') for id_, date_ in rows if id_ <= watermark['max_id']}
+        if months - set(watermark.get('stale', [])):
+            watermark['stale'] = sorted(months.union(watermark.get('stale', [])))
+            self._write_watermark(watermark)
+
+    def _export_month(self, month: str, max_id: int, chunk_size: int, gaps: List[List[float]],
+                      found: set) -> int:
+        """Повторная выгрузка месяца (строки с id не больше отметки) с заменой его папки.
+
+        Id строк, попавших в пропуски gaps, добавляются в found.
+        """
+        start = datetime.strptime(month, '%Y-%m').date()
+        end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        directory = self._month_directory(month)
+        # Имя с '_' не попадает в поиск папок month=* (и пропускается pyarrow.dataset)
+        temp_directory = os.path.join(self.path, f"_{PARTITION_PREFIX}{month}.tmp")
+        shutil.rmtree(temp_directory, ignore_errors=True)
+        query = TRANSACTION_COLUMNS + " AND t.date >= %s AND t.date < %s AND t.id <= %s ORDER BY t.id"
+        exported = 0
+        for chunk in iterate_query(query, (start.isoformat(), end.isoformat(), max_id), chunk_size):
+            self._write_part(temp_directory, [tuple(row) for row in chunk])
+            found.update(row[0] for row in chunk if in_gaps(row[0], gaps))
+            exported += len(chunk)
+        shutil.rmtree(directory, ignore_errors=True)
+        if exported:
+            os.replace(temp_directory, directory)
+        return exported
+
+    def export(self, chunk_size: int = None) -> int:
+        """Выгрузка строк с id больше отметки и устаревших месяцев, возвращает число выгруженных строк"""
+        require_pyarrow()
+        chunk_size = chunk_size or get_stream_chunk_size()
+        watermark = self.read_watermark()
+        categories = [[cat['id'], cat['name'], cat['type']] for cat in get_categories()]
+        if watermark['categories'] is not None and watermark['categories'] != categories:
+            self.clear()  # названия категорий в снимке устарели или категории удалены вместе с транзакциями
+            watermark = self.read_watermark()
+        now = time.time()
+        gaps = [gap for gap in watermark.get('gaps', []) if now - gap[2] <= get_gap_timeout()]
+        # Файлы выгрузки, прерванной до обновления отметки, будут записаны заново: это строки
+        # после max_id и строки из пропусков (файл такой выгрузки целиком лежит внутри пропуска)
+        for filename in self._parts():
+            first_id, last_id = self._part_ids(filename)
+            if last_id > watermark['max_id'] or any(first <= first_id and last_id <= last for first, last, _ in gaps):
+                os.remove(filename)
+
+        # Строки незавершенных при прошлой выгрузке транзакций, зафиксированные с тех пор
+        found = set()
+        for first, last, _ in gaps:
+            for chunk in iterate_query(TRANSACTION_COLUMNS + " AND t.id BETWEEN %s AND %s ORDER BY t.id",
+                                       (first, last), chunk_size):
+                self._write_rows(chunk)
+                found.update(row[0] for row in chunk)
+
+        stale = watermark.get('stale', [])
+        refreshed = sum(self._export_month(month, watermark['max_id'], chunk_size, gaps, found) for month in stale)
+        query = TRANSACTION_COLUMNS + " AND t.id > %s ORDER BY t.id"
+        exported = 0
+        max_id = watermark['max_id']
+        new_gaps = []
+        for chunk in iterate_query(query, (watermark['max_id'],), chunk_size):
+            for row in chunk:
+                if row[0] > max_id + 1:
+                    new_gaps.append([max_id + 1, row[0] - 1, now])
+                max_id = row[0]
+            self._write_rows(chunk)
+            exported += len(chunk)
+        if exported or found or stale or watermark['categories'] is None or gaps != watermark.get('gaps', []):
+            os.makedirs(self.path, exist_ok=True)
+            # Месяцы, отмеченные во время выгрузки, остаются для следующей
+            marked = set(self.read_watermark().get('stale', [])) - set(stale)
+            self._write_watermark({'max_id': max_id, 'rows': watermark['rows'] + exported + len(found),
+                                   'categories': categories, 'updated': time.time(), 'stale': sorted(marked),
+                                   'gaps': split_gaps(gaps, found) + new_gaps})
+        return exported + len(found) + refreshed
+
+    def rebuild(self, chunk_size: int = None) -> int:
+        """Полная пересборка снимка"""
+        self.clear()
+        return self.export(chunk_size)
+
+    def clear(self) -> None:
+        """Удаление всех файлов снимка"""
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+    def compact(self) -> int:
+        """Объединение файлов каждого месяца в один, возвращает число удаленных файлов"""
+        pa = require_pyarrow()
+        removed = 0
+        for directory in self._partitions():
+            parts = sorted(glob.glob(os.path.join(directory, 'part-*.arrow')))
+            if len(parts) < 2:
+                continue
+            tables = [self._read_file(part) for part in parts]
+            first, last = self._part_ids(parts[0])[0], self._part_ids(parts[-1])[1]
+            filename = os.path.join(directory, f"part-{first:012d}-{last:012d}.arrow")
+            table = pa.concat_tables(tables).unify_dictionaries()
+            temp_path = f"{filename}.tmp"
+            with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            del tables, table  # отображения файлов в память освобождаются до удаления файлов
+            for part in parts:
+                os.remove(part)
+            os.replace(temp_path, filename)
+            removed += len(parts) - 1
+        return removed
+
+    @staticmethod
+    def _read_file(filename: str):
+        """Чтение файла Arrow IPC через отображение в память: буферы колонок не копируются"""
+        pa = require_pyarrow()
+        with pa.memory_map(filename, 'r') as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def read_table(self, start_date=None, end_date=None, columns: Optional[List[str]] = None):
+        """Транзакции за период из снимка (таблица Arrow); читаются только файлы нужных месяцев"""
+        pa = require_pyarrow()
+        tables = [self._read_file(part) for directory in self._partitions(start_date, end_date)
+                  for part in sorted(glob.glob(os.path.join(directory, 'part-*.arrow')))]
+        if not tables:
+            return snapshot_schema().empty_table().select(columns or snapshot_schema().names)
+        table = pa.concat_tables(tables)
+        if start_date or end_date:
+            dates = table['date']
+            mask = None
+            if start_date:
+                mask = pa.compute.greater_equal(dates, pa.scalar(to_date(start_date), pa.date32()))
+            if end_date:
+                upper = pa.compute.less_equal(dates, pa.scalar(to_date(end_date), pa.date32()))
+                mask = upper if mask is None else pa.compute.and_(mask, upper)
+            table = table.filter(mask)
+        return table.select(columns) if columns else table
+
+    def read_frame(self, start_date=None, end_date=None):
+        """Транзакции за период из снимка в DataFrame с теми же типами колонок, что у load_transactions_frame"""
+        df = self.read_table(start_date, end_date).to_pandas(date_as_object=False)
+        df['date'] = df['date'].astype('datetime64[ns]')
+        return df
+
+def export_snapshot(rebuild: bool = False, compact: bool = False) -> Dict[str, Any]:
+    """Инкрементальная (или полная) выгрузка снимка и, по запросу, объединение файлов"""
+    snapshot = TransactionSnapshot()
+    started = time.perf_counter()
+    exported = snapshot.rebuild() if rebuild else snapshot.export()
+    removed = snapshot.compact() if compact else 0
+    watermark = snapshot.read_watermark()
+    return {'path': snapshot.path, 'exported': exported, 'rows': watermark['rows'], 'max_id': watermark['max_id'],
+            'compacted_files': removed, 'seconds': time.perf_counter() - started,
+            'updated': datetime.fromtimestamp(watermark['updated']).isoformat(timespec='seconds')
+            if watermark['updated'] else None}
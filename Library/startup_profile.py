@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+# Модули, которые не должны загружаться до первой отрисовки окна
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'seaborn', 'sklearn')
+
+def loaded_heavy_modules() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+class StartupProfiler:
+    """Отметки времени этапов запуска приложения относительно старта процесса"""
+
+    def __init__(self, started: float = None):
+        self.started = time.perf_counter() if started is None else started
+        self.marks: List[Tuple[str, float, List[str]]] = []
+
+    def mark(self, phase: str) -> None:
+        """Отметка окончания этапа и тяжелых модулей, загруженных к этому моменту"""
+        self.marks.append((phase, time.perf_counter() - self.started, loaded_heavy_modules()))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'phases': self.marks}
+
+def parse_importtime(output: str, top: int = 15) -> List[Tuple[str, float, float]]:
+    """Самые долгие импорты верхнего уровня из вывода python -X importtime: (модуль, свое, всего), мс"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):  # вложенный импорт: отступ в два пробела на уровень
+            continue
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return sorted(imports, key=lambda item: item[2], reverse=True)[:top]
+
+def run_profiled(script: str, timeout: float = 60) -> Dict[str, Any]:
+    """Запуск скрипта с -X importtime в режиме профилирования; этапы скрипт печатает в stdout как JSON"""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', script, '--profile-startup'],
+                               capture_output=True, text=True, timeout=timeout)
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip()
+                           else f"код завершения {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(completed.stderr)
+    result['wall'] = wall
+    return result
+
+def format_profile(result: Dict[str, Any]) -> str:
+    """Текстовый отчет о запуске: этапы и самые долгие импорты"""
+    lines = ["Этапы запуска (от старта процесса; загруженные тяжелые модули):"]
+    previous = 0.0
+    for phase, at, modules in result['phases']:
+        lines.append(f"  {phase:<28}{at * 1000:>9.1f} мс  (+{(at - previous) * 1000:.1f})  "
+                     f"{', '.join(modules) or '-'}")
+        previous = at
+    lines.append("Самые долгие импорты (свое / всего, мс):")
+    for name, own, cumulative in result['imports']:
+        lines.append(f"  {name:<40}{own:>9.1f}{cumulative:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,247 @@
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+import os
+
+# Запросы, которые можно безопасно повторить после обрыва соединения
+READ_ONLY_PREFIXES = ('SELECT', 'SHOW', 'EXPLAIN', 'DESCRIBE')
+
+def is_read_only(query: str) -> bool:
+    """Запрос только читает данные (повтор не изменит их второй раз)"""
+    return query.lstrip().upper().startswith(READ_ONLY_PREFIXES)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SQLITE_SCHEMA_PATH = os.path.join(PROJECT_ROOT, 'Data', 'create_database_sqlite.sql')
+
+# Приведение типов SQLite к тем же Python-типам, что возвращает MySQL
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()))
+
+class StorageBackend:
+    """Базовый класс хранилища данных"""
+    name = None
+    # Ошибки недоступности хранилища: запись стоит повторить позже, в отличие от ошибок данных
+    transient_errors: Tuple[type, ...] = ()
+
+    def execute(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Выполнение SQL-запроса с фиксацией транзакции"""
+        raise NotImplementedError
+
+    def iterate(self, query: str, params: tuple = None, chunk_size: int = 10000,
+                dictionary: bool = False) -> Iterator[List[Any]]:
+        """Чтение результата запроса пачками кортежей (или словарей) без загрузки всей выборки в память"""
+        raise NotImplementedError
+
+    def execute_batch(self, steps: Iterable[Tuple[str, Iterable[tuple]]]) -> int:
+        """Пакетное выполнение нескольких запросов (запрос, наборы параметров) в одной транзакции.
+
+        Возвращает число наборов параметров первого запроса (для INSERT - число добавленных строк).
+        """
+        raise NotImplementedError
+
+    def executemany(self, query: str, params_seq: Iterable[tuple]) -> int:
+        """Пакетное выполнение запроса в одной транзакции, возвращает число строк"""
+        return self.execute_batch([(query, params_seq)])
+
+    def close(self) -> None:
+        """Освобождение ресурсов хранилища"""
+
+class MySQLBackend(StorageBackend):
+    """Хранилище на сервере MySQL с общим пулом соединений"""
+    name = 'mysql'
+
+    def __init__(self, db_config: Dict[str, str], pool_size: int = 5,
+                 reconnect_attempts: int = 3, reconnect_delay: int = 1):
+        import mysql.connector
+        from mysql.connector import pooling
+
+        self._errors = mysql.connector.errors
+        # Ошибки, после которых имеет смысл переподключиться и повторить запрос
+        self._reconnect_errors = (self._errors.OperationalError, self._errors.InterfaceError)
+        self.transient_errors = self._reconnect_errors + (self._errors.PoolError,)
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name='finance_pool',
+            pool_size=pool_size,
+            pool_reset_session=True,
+            **db_config
+        )
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+
+    def get_connection(self):
+        """Получение проверенного соединения из пула"""
+        conn = self._pool.get_connection()
+        try:
+            # Проверка соединения: при обрыве переподключаемся
+            conn.ping(reconnect=True, attempts=self.reconnect_attempts, delay=self.reconnect_delay)
+        except self._errors.Error:
+            conn.close()
+            raise
+        return conn
+
+    def execute(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Выполнение SQL-запроса через соединение из пула.
+
+        При обрыве до отправки запроса (получение соединения, ping) запрос повторяется всегда,
+        при обрыве во время выполнения - только читающий: изменение могло быть уже применено сервером.
+        """
+        retry_on_error = is_read_only(query)
+        for attempt in range(self.reconnect_attempts + 1):
+            try:
+                conn = self.get_connection()
+            except self._reconnect_errors:
+                if attempt == self.reconnect_attempts:
+                    raise
+                continue
+            try:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(query, params or ())
+                result = cursor.fetchall()
+                conn.commit()
+                cursor.close()
+                return result
+            except self._reconnect_errors:
+                # Соединение потеряно во время запроса: чтение повторяем, запись - нет
+                if not retry_on_error or attempt == self.reconnect_attempts:
+                    raise
+            finally:
+                # Для соединения из пула close() возвращает его обратно в пул
+                conn.close()
+
+    def iterate(self, query: str, params: tuple = None, chunk_size: int = 10000,
+                dictionary: bool = False) -> Iterator[List[Any]]:
+        """Чтение пачками через небуферизованный курсор: строки передаются с сервера по мере чтения.
+
+        Соединение занято, пока генератор не дочитан или не закрыт.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor(buffered=False, dictionary=dictionary)
+        try:
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # Недочитанный результат нужно сбросить, иначе соединение нельзя вернуть в пул
+            if cursor.with_rows:
+                cursor.fetchall()
+            cursor.close()
+            conn.close()
+
+    def execute_batch(self, steps: Iterable[Tuple[str, Iterable[tuple]]]) -> int:
+        """Пакетное выполнение: драйвер объединяет строки INSERT в один многострочный запрос"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            counts = []
+            for query, params_seq in steps:
+                params_seq = list(params_seq)
+                if params_seq:
+                    cursor.executemany(query, params_seq)
+                counts.append(len(params_seq))
+            conn.commit()
+            cursor.close()
+            return counts[0] if counts else 0
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+class SQLiteBackend(StorageBackend):
+    """Встроенное хранилище SQLite в режиме WAL"""
+    name = 'sqlite'
+    transient_errors = (sqlite3.OperationalError,)  # например, база заблокирована другим процессом
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    @staticmethod
+    def _translate(query: str) -> str:
+        """Перевод плейсхолдеров MySQL (%s) в формат SQLite (?)"""
+        return query.replace('%s', '?')
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Соединение текущего потока (создается при первом обращении)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Соединением пользуется только его поток; проверка потока отключена, чтобы close()
+            # мог закрыть соединения всех потоков (например, фоновой записи журнала)
+            conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+                if not self._schema_ready:
+                    self._ensure_schema(conn)
+                    self._schema_ready = True
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        """Создание таблиц из Data/create_database_sqlite.sql для новой базы"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'categories'"
+        ).fetchone()
+        if not exists:
+            with open(SQLITE_SCHEMA_PATH, encoding='utf-8') as schema_file:
+                conn.executescript(schema_file.read())
+            conn.commit()
+
+    def execute(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Выполнение SQL-запроса в отдельной транзакции"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute(self._translate(query), params or ())
+            return [dict(row) for row in cursor.fetchall()]
+
+    def iterate(self, query: str, params: tuple = None, chunk_size: int = 10000,
+                dictionary: bool = False) -> Iterator[List[Any]]:
+        """Чтение пачками: SQLite формирует строки по мере вызова fetchmany"""
+        self.get_connection()  # создание схемы для новой базы
+        # Отдельное соединение: чтение не мешает записи в том же потоке (WAL допускает одновременные чтения)
+        conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES)
+        if dictionary:
+            conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(self._translate(query), params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows] if dictionary else rows
+        finally:
+            conn.close()
+
+    def execute_batch(self, steps: Iterable[Tuple[str, Iterable[tuple]]]) -> int:
+        """Пакетное выполнение нескольких запросов в одной транзакции"""
+        conn = self.get_connection()
+        counts = []
+        with conn:
+            for query, params_seq in steps:
+                params_seq = list(params_seq)
+                conn.executemany(self._translate(query), params_seq)
+                counts.append(len(params_seq))  # как в MySQLBackend: rowcount UPDATE зависит от хранилища
+        return counts[0] if counts else 0
+
+    def close(self) -> None:
+        """Закрытие всех открытых соединений"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,127 @@
+import multiprocessing
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
+from .instrumentation import instrumentation
+
+class TaskExecutor:
+    """Выполнение задач вне главного потока Tk.
+
+    Запросы к БД выполняются в пуле потоков, построение графиков - в пуле процессов.
+    Результаты передаются обратно в главный поток через root.after: колбэки
+    on_done/on_error всегда вызываются там, где можно обращаться к виджетам.
+    Задачи с одинаковым ключом вытесняют друг друга: результат устаревшей задачи
+    отбрасывается, а еще не начатая задача отменяется.
+    При включенных замерах учитывается время задачи от запуска до получения результата
+    (вид task) и время колбэка on_done в главном потоке (вид ui).
+    """
+
+    def __init__(self, root, io_workers: int = 4, cpu_workers: int = None, poll_interval: int = 50,
+                 on_error: Callable[[BaseException], None] = None,
+                 on_busy_change: Callable[[bool], None] = None):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_error = on_error
+        self.on_busy_change = on_busy_change
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='finance-io')
+        self.cpu_workers = cpu_workers
+        self._cpu_pool = None
+        self._pending: List[Dict[str, Any]] = []
+        self._latest: Dict[str, Future] = {}
+        self._calls = queue.Queue()
+        self._polling = False
+
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        """Пул процессов для построения графиков (создается при первом обращении)"""
+        if self._cpu_pool is None:
+            # spawn: дочерние процессы не наследуют состояние Tk и потоков главного процесса
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._cpu_pool
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def submit(self, func: Callable, *args, on_done: Callable[[Any], None] = None,
+               on_error: Callable[[BaseException], None] = None, key: str = None,
+               cpu: bool = False, **kwargs) -> Future:
+        """Запуск задачи; cpu=True - в пуле процессов, иначе в пуле потоков"""
+        if key is not None and key in self._latest:
+            self._latest[key].cancel()
+        future = (self.cpu_pool if cpu else self.io_pool).submit(func, *args, **kwargs)
+        if key is not None:
+            self._latest[key] = future
+        was_busy = self.busy
+        self._pending.append({'future': future, 'on_done': on_done,
+                              'on_error': on_error or self.on_error, 'key': key,
+                              'name': key or getattr(func, 'func', func).__name__,
+                              'submitted': time.perf_counter()})
+        if not was_busy and self.on_busy_change:
+            self.on_busy_change(True)
+        self._schedule_poll()
+        return future
+
+    def post(self, func: Callable, *args) -> None:
+        """Передача вызова в главный поток из фоновой задачи (доставляется при опросе задач)"""
+        self._calls.put((func, args))
+
+    def cancel(self, key: str) -> None:
+        """Отмена задачи с ключом: ее результат будет отброшен"""
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _schedule_poll(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self) -> None:
+        """Проверка завершенных задач в главном потоке"""
+        self._polling = False
+        while True:
+            try:
+                func, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+
+        done, pending = [], []
+        for task in self._pending:
+            (done if task['future'].done() else pending).append(task)
+        self._pending = pending
+        for task in done:
+            future = task['future']
+            key = task['key']
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue  # задача вытеснена более новой
+                del self._latest[key]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if task['on_error']:
+                    task['on_error'](error)
+            elif task['on_done']:
+                if not instrumentation.enabled:
+                    task['on_done'](future.result())
+                    continue
+                started = time.perf_counter()
+                instrumentation.record('task', task['name'], started - task['submitted'])
+                task['on_done'](future.result())
+                instrumentation.record('ui', task['name'], time.perf_counter() - started)
+
+        if done and not self.busy and self.on_busy_change:
+            self.on_busy_change(False)
+        if self._pending or not self._calls.empty():
+            self._schedule_poll()
+
+    def shutdown(self) -> None:
+        """Остановка пулов без ожидания незавершенных задач"""
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from .db_manager import add_transactions, execute_query, get_backend
+
+TransactionRow = Tuple[str, Any, Optional[int], str, str]
+
+class WriteBehindJournal:
+    """Отложенная запись транзакций через журнал на диске с групповой фиксацией.
+
+    append дописывает строку в журнал (файл JSON-строк, только добавление) и сразу
+    возвращает ее порядковый номер; фоновый поток записывает накопившиеся строки
+    в БД пачками по batch_size одной транзакцией (add_transactions) не реже раза
+    в flush_interval секунд. В той же транзакции в таблице journal_state
+    сохраняется номер последней записанной строки, поэтому после сбоя recover
+    повторяет только строки журнала с большими номерами, и ни одна строка
+    не записывается дважды. Когда очередь пуста, журнал усекается.
+
+    Если БД недоступна (transient_errors хранилища), пачка повторяется позже. Другие
+    ошибки (строка с удаленной категорией, сумма вне диапазона колонки) повтором
+    не исправить: пачка делится пополам, пока не останутся отдельные отвергнутые строки.
+    Они дописываются в файл <журнал>.rejected, пропускаются отметкой в journal_state
+    и доступны через take_rejected, а остальные строки записываются как обычно.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5, batch_size: int = 500, fsync: bool = True,
+                 on_flushed: Callable[[List[int]], None] = None,
+                 on_error: Callable[[BaseException], None] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.on_flushed = on_flushed
+        self.on_error = on_error
+        self._queue: List[Tuple[int, TransactionRow]] = []
+        self._seq = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._ready = threading.Event()
+        self._closing = False
+        self._thread = None
+        self._rejected: List[Tuple[int, TransactionRow, str]] = []
+        self.last_error: Optional[BaseException] = None
+
+    @property
+    def rejected_path(self) -> str:
+        return f"{self.path}.rejected"
+
+    def recover(self) -> int:
+        """Чтение журнала и состояния в БД, запуск фоновой записи; возвращает число строк к повтору"""
+        if self._thread is not None:
+            return self.pending  # уже запущен
+        rows = execute_query("SELECT last_seq FROM journal_state WHERE name = %s", (self.name,))
+        if rows:
+            last_seq = rows[0]['last_seq']
+        else:
+            execute_query("INSERT INTO journal_state (name, last_seq) VALUES (%s, 0)", (self.name,))
+            last_seq = 0
+
+        pending = []
+        max_seq = last_seq
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # недописанная последняя строка: запись прервана сбоем до подтверждения
+                    max_seq = max(max_seq, entry['seq'])
+                    if entry['seq'] > last_seq:
+                        pending.append((entry['seq'], tuple(entry['row'])))
+
+        with self._lock:
+            self._seq = max_seq
+            self._queue = pending + self._queue
+            self._rewrite(pending)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='finance-journal', daemon=True)
+        self._thread.start()
+        self._ready.set()
+        return len(pending)
+
+    @staticmethod
+    def _encode(seq: int, row: TransactionRow) -> str:
+        return json.dumps({'seq': seq, 'row': row}, ensure_ascii=False) + "\n"
+
+    def _rewrite(self, entries: List[Tuple[int, TransactionRow]]) -> None:
+        """Замена журнала файлом только с незаписанными строками (без записанных и недописанной)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as journal_file:
+            for seq, row in entries:
+                journal_file.write(self._encode(seq, row))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(temp_path, self.path)
+
+    @property
+    def ready(self) -> bool:
+        """Журнал восстановлен (recover завершился) и принимает строки"""
+        return self._ready.is_set()
+
+    def append(self, row: TransactionRow) -> int:
+        """Запись строки (date, amount, category_id, description, type) в журнал, возвращает ее номер"""
+        if not self._ready.is_set():
+            # Не ждем recover: при недоступной БД он не завершится, а append вызывается из потока окна
+            raise RuntimeError("Журнал еще не восстановлен: хранилище не подготовлено")
+        date_, amount, category_id, description, type_ = row
+        row = (str(date_), str(amount), category_id, description, type_)
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Журнал закрыт")
+            self._seq += 1
+            self._file.write(self._encode(self._seq, row))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._queue.append((self._seq, row))
+            if len(self._queue) >= self.batch_size:
+                self._wakeup.notify()
+            return self._seq
+
+    @property
+    def pending(self) -> int:
+        """Число строк, еще не записанных в БД"""
+        with self._lock:
+            return len(self._queue)
+
+    def pending_rows(self) -> List[Tuple[int, TransactionRow]]:
+        """Незаписанные строки с их номерами"""
+        with self._lock:
+            return list(self._queue)
+
+    def _run(self) -> None:
+        """Фоновая запись: пачка уходит по заполнении batch_size или по истечении flush_interval"""
+        while True:
+            with self._lock:
+                if not self._closing and len(self._queue) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                if self._closing and not self._queue:
+                    return
+                batch = self._queue[:self.batch_size]
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+                self.last_error = None
+            except Exception as error:  # ошибки данных _write разбирает сам: здесь БД недоступна
+                self.last_error = error
+                if self.on_error is not None:
+                    self.on_error(error)
+                if self._closing:
+                    return  # строки остаются в журнале и будут повторены при следующем запуске
+                time.sleep(self.flush_interval)  # БД недоступна: повтор той же пачки позже
+
+    def _write(self, batch: List[Tuple[int, TransactionRow]]) -> None:
+        """Запись пачки; при ошибке данных - деление пачки пополам до отдельных отвергнутых строк"""
+        try:
+            self._flush(batch)
+        except get_backend().transient_errors:
+            raise
+        except Exception as error:
+            if len(batch) == 1:
+                self._reject(batch[0], error)
+                return
+            middle = len(batch) // 2
+            self._write(batch[:middle])
+            self._write(batch[middle:])
+
+    def _flush(self, batch: List[Tuple[int, TransactionRow]]) -> None:
+        """Запись пачки и номера последней строки одной транзакцией, удаление пачки из очереди"""
+        last_seq = batch[-1][0]
+        add_transactions([row for _, row in batch],
+                         extra_steps=[("UPDATE journal_state SET last_seq = %s WHERE name = %s",
+                                       [(last_seq, self.name)])])
+        self._remove(batch)
+        if self.on_flushed is not None:
+            self.on_flushed([seq for seq, _ in batch])
+
+    def _reject(self, entry: Tuple[int, TransactionRow], error: BaseException) -> None:
+        """Перенос строки, которую БД не принимает, в файл отвергнутых строк; повторно она не записывается"""
+        seq, row = entry
+        message = f"{type(error).__name__}: {error}"
+        # Сначала файл: при сбое до отметки в journal_state строка попадет в него повторно, но не потеряется
+        with open(self.rejected_path, 'a', encoding='utf-8') as rejected_file:
+            rejected_file.write(json.dumps({'seq': seq, 'row': row, 'error': message,
+                                            'rejected_at': datetime.now().isoformat(timespec='seconds')},
+                                           ensure_ascii=False) + "\n")
+            rejected_file.flush()
+            os.fsync(rejected_file.fileno())
+        execute_query("UPDATE journal_state SET last_seq = %s WHERE name = %s", (seq, self.name))
+        self._remove([entry])
+        with self._lock:
+            self._rejected.append((seq, row, message))
+
+    def take_rejected(self) -> List[Tuple[int, TransactionRow, str]]:
+        """Отвергнутые БД строки (номер, строка, ошибка) с прошлого вызова"""
+        with self._lock:
+            rejected, self._rejected = self._rejected, []
+            return rejected
+
+    def _remove(self, batch: List[Tuple[int, TransactionRow]]) -> None:
+        """Удаление записанных (или отвергнутых) строк из начала очереди"""
+        with self._lock:
+            del self._queue[:len(batch)]
+            if not self._queue:
+                self._file.truncate(0)  # в режиме 'a' следующая запись все равно идет в конец файла
+
+    def close(self, timeout: float = 10) -> None:
+        """Запись оставшихся строк и остановка фонового потока"""
+        with self._lock:
+            self._closing = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._file is not None:
+            self._file.close()
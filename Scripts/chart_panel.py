@@ -0,0 +1,76 @@
+import os
+import time
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from datetime import datetime
+from typing import Any, Dict
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from Library.instrumentation import instrumentation
+from Library.live_charts import LiveCharts
+
+class LiveChartPanel(ttk.Frame):
+    """Встроенные графики на постоянном холсте matplotlib.
+
+    Холст создается один раз; новые данные (set_data) и добавленные операции
+    (add_transaction) меняют данные существующих артистов LiveCharts. Перерисовка
+    выполняется не чаще раза в redraw_interval мс: изменения, пришедшие за это время,
+    попадают в одну перерисовку. Сохранение в PNG - только по кнопке.
+    """
+
+    def __init__(self, master, redraw_interval: int = 50, export_dir: str = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.redraw_interval = redraw_interval
+        self.export_dir = export_dir
+        self.loaded = False
+        self._redraw_job = None
+        self._last_redraw = 0.0
+
+        self.charts = LiveCharts()
+        self.canvas = FigureCanvasTkAgg(self.charts.figure, master=self)
+        self.charts.attach(self.canvas)
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        ttk.Button(self, text="Сохранить PNG", command=self.export_png).grid(row=1, column=0, pady=5)
+
+    def set_data(self, series: Dict[str, Any]) -> None:
+        """Новые данные графиков (результат load_chart_series)"""
+        self.charts.set_data(series['dates'], series['net'], series['expense'])
+        self.loaded = True
+        self.schedule_redraw()
+
+    def add_transaction(self, trans: Dict[str, Any]) -> None:
+        """Учет новой операции без перезагрузки данных"""
+        if not self.loaded:
+            return  # данные еще загружаются, операция будет учтена вместе с ними
+        self.charts.add_transaction(trans['date'], trans['amount'], trans['transaction_type'],
+                                    trans['category_name'])
+        self.schedule_redraw()
+
+    def schedule_redraw(self) -> None:
+        """Перерисовка сразу, если с прошлой прошло redraw_interval мс, иначе - по их истечении"""
+        if self._redraw_job is not None:
+            return
+        wait = self._last_redraw + self.redraw_interval / 1000 - time.perf_counter()
+        self._redraw_job = self.after(max(int(wait * 1000), 0), self._redraw)
+
+    @instrumentation.timed('ui', 'графики: обновление')
+    def _redraw(self) -> None:
+        self._redraw_job = None
+        self._last_redraw = time.perf_counter()
+        self.charts.redraw()
+
+    def export_png(self) -> None:
+        """Сохранение текущих графиков в PNG"""
+        filename = filedialog.asksaveasfilename(
+            title="Сохранить графики", defaultextension=".png", filetypes=[("PNG", "*.png")],
+            initialdir=self.export_dir,
+            initialfile=f"charts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        )
+        if not filename:
+            return
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+        self.charts.export_png(filename)
+        messagebox.showinfo("Успех", f"Графики сохранены: {os.path.abspath(filename)}")
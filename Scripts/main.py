@@ -1,22 +1,74 @@
+import time
+STARTED = time.perf_counter()  # точка отсчета для --profile-startup
+
+import argparse
+import importlib
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
 import configparser
+import json
 import os
 import sys
 
 # Добавляем корневую директорию проекта в sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
 
-from Library.db_manager import get_categories, add_transaction, get_transactions, add_category, update_category, delete_category
-from Library.report_generator import generate_text_report, generate_pie_chart, generate_line_chart, generate_bar_chart
+from Library.db_manager import (get_categories, get_category, get_category_id, add_category, update_category,
+                                delete_category, reload_config, is_valid_amount, MAX_AMOUNT)
+from Library.importer import import_transactions
+from Library.instrumentation import instrumentation, format_snapshot
+from Library.migrations import apply_migrations
+from Library.startup_profile import StartupProfiler, run_profiled, format_profile
+from Library.task_executor import TaskExecutor
+from Library.write_journal import WriteBehindJournal
+from transaction_table import VirtualTransactionTable
+
+def lazy_function(module: str, name: str):
+    """Функция модуля, который импортируется при первом вызове.
+
+    Отчеты и колоночное хранилище тянут pandas, numpy и matplotlib - они загружаются
+    в фоновой задаче при первом обращении, а не до появления окна.
+    """
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+generate_text_report = lazy_function('Library.report_generator', 'generate_text_report')
+generate_charts = lazy_function('Library.report_generator', 'generate_charts')
+export_transactions_csv = lazy_function('Library.report_generator', 'export_transactions_csv')
+generate_year_report = lazy_function('Library.period_report', 'generate_year_report')
+get_transaction_columns_page = lazy_function('Library.columnar', 'get_transaction_columns_page')
+load_chart_series = lazy_function('Library.report_generator', 'load_chart_series')
+load_categorizer = lazy_function('Library.categorizer', 'load_categorizer')
+# Панель графиков создается, когда данные для нее загружены: matplotlib к этому времени уже импортирован в фоне
+LiveChartPanel = lazy_function('chart_panel', 'LiveChartPanel')
+
+def prepare_storage(journal: WriteBehindJournal):
+    """Обновление схемы БД, повтор незаписанных строк журнала и загрузка справочника категорий (в фоне)"""
+    apply_migrations()
+    journal.recover()
+    return get_categories()
 
 class FinanceApp:
-    def __init__(self, root):
+    def __init__(self, root, profiler: StartupProfiler = None, on_started=None):
         self.root = root
+        self.profiler = profiler
+        self.on_started = on_started
         self.root.title("Учет личных финансов")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Запросы к БД и построение отчетов выполняются в фоне, чтобы окно не зависало
+        self.executor = TaskExecutor(root, on_error=self.show_task_error,
+                                     on_busy_change=self.on_busy_change)
         self.load_config()
+        # Новые транзакции сначала попадают в журнал на диске, в БД они записываются пачками в фоне
+        self.journal = WriteBehindJournal(self.journal_path, flush_interval=self.journal_flush_interval,
+                                          batch_size=self.journal_batch_size, fsync=self.journal_fsync)
+        self.watching_journal = False
+        self.categorizer = None  # модель подсказки категорий, загружается в фоне после запуска
         self.setup_ui()
+        self.mark("setup_ui")
         
     def load_config(self):
         """Загрузка конфигурации из config.ini"""
@@ -27,6 +79,16 @@ class FinanceApp:
         self.font_size = int(config['GUI']['font_size'])
         self.bg_color = config['GUI']['background_color']
         self.text_color = config['GUI']['text_color']
+        self.page_size = config.getint('GUI', 'page_size', fallback=200)
+        self.default_period = config.getint('REPORTS', 'default_period', fallback=30)
+        self.graphics_path = os.path.join(os.path.dirname(__file__), os.pardir,
+                                          config.get('REPORTS', 'graphics_path', fallback='Graphics/'))
+        self.chart_redraw_interval = config.getint('GUI', 'chart_redraw_ms', fallback=50)
+        self.journal_path = os.path.join(os.path.dirname(__file__), os.pardir,
+                                         config.get('JOURNAL', 'path', fallback='Data/transactions.journal'))
+        self.journal_flush_interval = config.getint('JOURNAL', 'flush_interval_ms', fallback=500) / 1000
+        self.journal_batch_size = config.getint('JOURNAL', 'batch_size', fallback=500)
+        self.journal_fsync = config.getboolean('JOURNAL', 'fsync', fallback=True)
         
     def setup_ui(self):
         """Настройка пользовательского интерфейса"""
@@ -57,36 +119,55 @@ class FinanceApp:
         ttk.Label(main_frame, text="Категория:").grid(row=3, column=0)
         self.category_combo = ttk.Combobox(main_frame)
         self.category_combo.grid(row=3, column=1)
-        self.update_categories(self.transaction_type.get())
+        self.category_combo.bind("<<ComboboxSelected>>", self._on_category_selected)
+        self.category_chosen = False  # категорию выбрали вручную: подсказка ее не меняет
         
         ttk.Label(main_frame, text="Описание:").grid(row=4, column=0)
         self.description_entry = ttk.Entry(main_frame)
         self.description_entry.grid(row=4, column=1)
+        self.description_entry.bind("<Return>", lambda event: self.add_transaction())
+        self.description_entry.bind("<KeyRelease>", self.suggest_category)
+        self.amount_entry.bind("<KeyRelease>", self.suggest_category)
         
-        # Кнопка добавления
-        ttk.Button(main_frame, text="Добавить", 
-                  command=self.add_transaction).grid(row=5, column=0, columnspan=2)
+        # Кнопка добавления (доступна после восстановления журнала в _on_storage_ready)
+        self.add_button = ttk.Button(main_frame, text="Добавить", command=self.add_transaction,
+                                     state=tk.DISABLED)
+        self.add_button.grid(row=5, column=0, columnspan=2)
         
-        # Таблица транзакций
-        self.transactions_tree = ttk.Treeview(main_frame, columns=("date", "type", "amount", "category", "description"),
-                                            show="headings")
-        self.transactions_tree.grid(row=6, column=0, columnspan=2)
-        
-        self.transactions_tree.heading("date", text="Дата")
-        self.transactions_tree.heading("type", text="Тип")
-        self.transactions_tree.heading("amount", text="Сумма")
-        self.transactions_tree.heading("category", text="Категория")
-        self.transactions_tree.heading("description", text="Описание")
+        # Таблица транзакций (строки подгружаются страницами при прокрутке)
+        self.transactions_table = VirtualTransactionTable(main_frame, page_size=self.page_size,
+                                                          executor=self.executor)
+        self.transactions_table.grid(row=6, column=0, columnspan=2)
+        self.transaction_filters = {}
         
         # Кнопки отчетов
         ttk.Button(main_frame, text="Текстовый отчет", 
                   command=self.show_text_report).grid(row=7, column=0)
-        ttk.Button(main_frame, text="Графики", 
+        ttk.Button(main_frame, text="Графики в PNG", 
                   command=self.show_graphs).grid(row=7, column=1)
+        ttk.Button(main_frame, text="Отчет за год", 
+                  command=self.show_year_report).grid(row=8, column=0, pady=10)
         ttk.Button(main_frame, text="Управление категориями", 
-                  command=self.open_category_manager).grid(row=8, column=0, columnspan=2, pady=10)
+                  command=self.open_category_manager).grid(row=8, column=1, pady=10)
         ttk.Button(main_frame, text="Настройки", 
-                  command=self.open_settings_manager).grid(row=10, column=0, columnspan=2, pady=10)
+                  command=self.open_settings_manager).grid(row=10, column=0, pady=10)
+        ttk.Button(main_frame, text="Диагностика", 
+                  command=self.open_diagnostics).grid(row=10, column=1, pady=10)
+        ttk.Button(main_frame, text="Импорт выписки", 
+                  command=self.import_statement).grid(row=11, column=0, pady=10)
+        ttk.Button(main_frame, text="Экспорт CSV", 
+                  command=self.export_transactions).grid(row=11, column=1, pady=10)
+        
+        # Индикатор фоновых задач
+        self.status_label = ttk.Label(main_frame, text="")
+        self.status_label.grid(row=12, column=0)
+        self.progress = ttk.Progressbar(main_frame, mode="indeterminate", length=150)
+        self.progress.grid(row=12, column=1)
+
+        # Встроенные графики по текущим фильтрам (холст создается при первой загрузке данных)
+        self.chart_frame = ttk.Frame(main_frame)
+        self.chart_frame.grid(row=0, column=2, rowspan=13, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0))
+        self.chart_panel = None
         
         # Фильтры для журнала операций
         filter_frame = ttk.LabelFrame(main_frame, text="Фильтр операций", padding="10")
@@ -103,7 +184,6 @@ class FinanceApp:
         ttk.Label(filter_frame, text="Категория:").grid(row=2, column=0, padx=5, pady=5)
         self.filter_category_combo = ttk.Combobox(filter_frame)
         self.filter_category_combo.grid(row=2, column=1, padx=5, pady=5)
-        self.filter_category_combo['values'] = ["Все"] + [cat['name'] for cat in get_categories()]
         self.filter_category_combo.set("Все")
 
         ttk.Label(filter_frame, text="Мин. сумма:").grid(row=3, column=0, padx=5, pady=5)
@@ -114,30 +194,107 @@ class FinanceApp:
         self.max_amount_entry = ttk.Entry(filter_frame)
         self.max_amount_entry.grid(row=4, column=1, padx=5, pady=5)
 
+        ttk.Label(filter_frame, text="Поиск в описании (слово* - по началу):").grid(row=5, column=0, padx=5, pady=5)
+        self.search_entry = ttk.Entry(filter_frame)
+        self.search_entry.grid(row=5, column=1, padx=5, pady=5)
+        self.search_entry.bind("<Return>", lambda event: self.apply_filters())
+
         ttk.Button(filter_frame, text="Применить фильтр", 
-                  command=self.apply_filters).grid(row=5, column=0, columnspan=2, pady=10)
+                  command=self.apply_filters).grid(row=6, column=0, columnspan=2, pady=10)
         
-        self.update_transactions()
+        # Данные загружаются в фоне: окно отрисовывается, не дожидаясь БД
+        self.set_status("Загрузка...")
+        self.executor.submit(prepare_storage, self.journal, on_done=self._on_storage_ready, key='startup')
+
+    def _on_storage_ready(self, _categories):
+        """Заполнение списков категорий и таблицы после загрузки справочника"""
+        self.mark("категории загружены")
+        self.set_status("")
+        self.add_button.config(state=tk.NORMAL)
+        self.update_categories(self.transaction_type.get())
+        self.update_filter_categories()
+        # Строки журнала, не записанные до прошлого закрытия, записываются сейчас в фоне
+        for seq, row in self.journal.pending_rows():
+            self._show_unsaved(seq, row)
+        self.update_transactions(on_loaded=self._on_first_page_loaded)
+        if not self.watching_journal:
+            self.watching_journal = True
+            self._watch_journal()
+
+    def _on_first_page_loaded(self):
+        """Окончание запуска: первая страница операций показана"""
+        self.mark("первая страница операций")
+        if self.on_started is not None:
+            self.on_started()
+            self.on_started = None
+        self.update_charts()
+        # Модель дообучается на операциях, добавленных с прошлого запуска
+        self.executor.submit(load_categorizer, True, on_done=self._on_categorizer_loaded,
+                             on_error=self._on_categorizer_error, key='categorizer')
+
+    def _on_categorizer_loaded(self, categorizer):
+        """Модель категорий готова (None - выключена в config.ini или еще не на чем обучать)"""
+        self.categorizer = categorizer
+        self.suggest_category()
+
+    def _on_categorizer_error(self, error):
+        """Подсказка категорий недоступна (например, не установлен scikit-learn): категории выбираются вручную"""
+        self.set_status(f"Подсказка категорий недоступна: {error}")
+
+    def mark(self, phase: str):
+        """Отметка этапа запуска в режиме --profile-startup"""
+        if self.profiler is not None:
+            self.profiler.mark(phase)
         
     def update_categories(self, transaction_type: str = None):
         """Обновление списка категорий в зависимости от типа транзакции"""
-        categories = get_categories(transaction_type) # Получаем категории, фильтруя по типу транзакции
+        categories = get_categories(transaction_type) # Категории из справочника в памяти, фильтр по типу транзакции
         self.category_combo['values'] = [cat['name'] for cat in categories]
         if categories:
             self.category_combo.set(categories[0]['name'])
         else:
             self.category_combo.set("") # Очищаем выбор, если категорий нет
             
+    def update_filter_categories(self):
+        """Обновление списка категорий в фильтре операций"""
+        self.filter_category_combo['values'] = ["Все"] + [cat['name'] for cat in get_categories()]
+            
     def on_transaction_type_change(self):
         """Обработчик изменения типа транзакции"""
         self.update_categories(self.transaction_type.get())
+        self.category_chosen = False
+        self.suggest_category()
+
+    def _on_category_selected(self, _event=None):
+        self.category_chosen = True
+
+    @instrumentation.timed('ui', 'подсказка категории')
+    def suggest_category(self, _event=None):
+        """Подстановка категории, предложенной моделью по описанию и сумме (из модели в памяти)"""
+        description = self.description_entry.get().strip()
+        if self.categorizer is None or self.category_chosen or not description:
+            return
+        try:
+            amount = float(self.amount_entry.get())
+        except ValueError:
+            amount = 0.0
+        category = get_category(self.categorizer.suggest(description, amount, self.transaction_type.get()))
+        if category is not None:
+            self.category_combo.set(category['name'])
 
     def add_transaction(self):
         """Добавление новой транзакции"""
+        if not self.journal.ready:  # Enter в поле описания работает и при выключенной кнопке
+            messagebox.showerror("Ошибка", "Хранилище еще не подготовлено, транзакцию добавить нельзя")
+            return
         try:
             amount = float(self.amount_entry.get())
             category = self.category_combo.get()
             description = self.description_entry.get()
+
+            if not is_valid_amount(amount):  # float() принимает nan и inf, а колонка amount ограничена
+                messagebox.showerror("Ошибка", f"Сумма должна быть числом не больше {MAX_AMOUNT:,.2f} по модулю")
+                return
             
             if not category:
                 messagebox.showerror("Ошибка", "Выберите категорию")
@@ -148,69 +305,175 @@ class FinanceApp:
                 messagebox.showerror("Ошибка", f"Категория '{category}' не найдена. Пожалуйста, выберите существующую категорию.")
                 return
 
-            add_transaction(
-                datetime.now().strftime('%Y-%m-%d'),
-                amount,
-                category_id,
-                description,
-                self.transaction_type.get()
-            )
-            
+            row = (datetime.now().strftime('%Y-%m-%d'), amount, category_id, description,
+                   self.transaction_type.get())
+            seq = self.journal.append(row)  # строка уже на диске, в БД она попадет со следующей пачкой
+            self._show_unsaved(seq, row)
             self.amount_entry.delete(0, tk.END)
             self.description_entry.delete(0, tk.END)
-            self.update_transactions()
-            messagebox.showinfo("Успех", "Транзакция добавлена")
+            self.category_chosen = False
+            self.amount_entry.focus_set()
             
         except ValueError:
             messagebox.showerror("Ошибка", "Введите корректную сумму")
+
+    def _show_unsaved(self, seq: int, row: tuple):
+        """Добавление строки журнала в таблицу и графики без перезагрузки (если она проходит текущие фильтры)"""
+        trans = self._filtered_row(row)
+        if trans is None:
+            return
+        self.transactions_table.add_unsaved(f"journal-{seq}", trans)
+        if self.chart_panel is not None:
+            self.chart_panel.add_transaction(trans)
+
+    def _filtered_row(self, row: tuple):
+        """Строка журнала в виде транзакции или None, если она не проходит текущие фильтры"""
+        date, amount, category_id, description, type_ = row
+        amount = float(amount)
+        filters = self.transaction_filters
+        if filters.get('search') or \
+                (filters.get('start_date') and date < filters['start_date']) or \
+                (filters.get('end_date') and date > filters['end_date']) or \
+                (filters.get('category_id') and category_id != filters['category_id']) or \
+                (filters.get('min_amount') is not None and amount < filters['min_amount']) or \
+                (filters.get('max_amount') is not None and amount > filters['max_amount']):
+            return None  # поиск по описанию не повторяем здесь: строка появится после записи и обновления
+        category = get_category(category_id)
+        return {'date': date, 'transaction_type': type_, 'amount': amount,
+                'category_name': category['name'] if category else None, 'description': description}
+
+    def _watch_journal(self):
+        """Отметка записанных строк в таблице и состояние очереди записи в строке состояния"""
+        rejected = self.journal.take_rejected()
+        if rejected:
+            self._show_rejected(rejected)
+        waiting = {f"journal-{seq}" for seq, _ in self.journal.pending_rows()}
+        for iid in list(self.transactions_table.unsaved):
+            if iid not in waiting:
+                self.transactions_table.mark_saved(iid)
+        if self.journal.last_error is not None:
+            self.set_status(f"БД недоступна, в журнале ожидают записи: {len(waiting)}")
+        elif waiting:
+            self.set_status(f"Ожидают записи: {len(waiting)}")
+        elif self.status_label.cget("text").startswith(("Ожидают записи", "БД недоступна")):
+            self.set_status("")
+        self.root.after(int(self.journal_flush_interval * 1000), self._watch_journal)
+            
+    def _show_rejected(self, rejected):
+        """Строки журнала, которые БД не приняла: удаление из таблицы и графиков, сообщение об ошибке"""
+        for seq, _, _ in rejected:
+            self.transactions_table.remove_unsaved(f"journal-{seq}")
+        self.update_charts()
+        details = "\n".join(f"{row[0]} {row[1]} {row[3] or ''}: {error}" for _, row, error in rejected[:10])
+        messagebox.showerror("Ошибка записи",
+                             f"Не записано операций: {len(rejected)} (сохранены в {self.journal.rejected_path})\n\n"
+                             f"{details}")
+
+    def import_statement(self):
+        """Импорт банковской выписки (CSV/OFX)"""
+        path = filedialog.askopenfilename(
+            title="Выберите выписку",
+            filetypes=[("Выписки", "*.csv *.ofx *.qfx"), ("Все файлы", "*.*")]
+        )
+        if not path:
+            return
+        def progress(imported):
+            self.executor.post(self.set_status, f"Импортировано: {imported}")
+        
+        self.executor.submit(import_transactions, path, progress=progress,
+                             on_done=self._on_statement_imported, on_error=self._on_import_error)
+            
+    def _on_statement_imported(self, imported):
+        """Завершение импорта выписки"""
+        self.set_status("")
+        self.update_transactions()
+        self.update_charts()
+        messagebox.showinfo("Успех", f"Импортировано транзакций: {imported}")
+
+    def _on_import_error(self, error):
+        """Ошибка импорта выписки"""
+        self.set_status("")
+        messagebox.showerror("Ошибка импорта", str(error))
+            
+    def export_transactions(self):
+        """Экспорт операций с текущими фильтрами в CSV (потоковое чтение, в фоне)"""
+        self.executor.submit(export_transactions_csv, **self.transaction_filters,
+                             on_done=self._on_transactions_exported, key='export')
+
+    def _on_transactions_exported(self, filename):
+        """Завершение экспорта операций"""
+        messagebox.showinfo("Успех", f"Операции сохранены: {filename}")
             
     def get_category_id(self, category_name):
         """Получение ID категории по имени"""
-        categories = get_categories() # Получаем все категории, без фильтрации по типу
-        for cat in categories:
-            if cat['name'] == category_name:
-                return cat['id']
-        return None # Возвращаем None, если категория не найдена
-        
-    def update_transactions(self):
-        """Обновление таблицы транзакций"""
-        for item in self.transactions_tree.get_children():
-            self.transactions_tree.delete(item)
+        return get_category_id(category_name) # None, если категория не найдена
+        
+    def update_transactions(self, on_loaded=None):
+        """Обновление таблицы транзакций с учетом текущих фильтров"""
+        filters = self.transaction_filters
+        self.transactions_table.load(lambda **page: get_transaction_columns_page(**filters, **page),
+                                     on_loaded=on_loaded)
             
-        transactions = get_transactions()
-        for trans in transactions:
-            self.transactions_tree.insert("", "end", values=(
-                trans['date'],
-                "Доход" if trans['transaction_type'] == 'income' else "Расход",
-                f"{trans['amount']:.2f}",
-                trans['category_name'],
-                trans['description']
-            ))
+    def update_charts(self):
+        """Загрузка данных встроенных графиков по текущим фильтрам (в фоне)"""
+        self.executor.submit(load_chart_series, **self.transaction_filters,
+                             on_done=self._on_chart_series, key='live-charts')
+
+    def _on_chart_series(self, series):
+        """Данные графиков загружены: обновление холста и учет еще не записанных строк журнала"""
+        if self.chart_panel is None:
+            self.chart_panel = LiveChartPanel(self.chart_frame, redraw_interval=self.chart_redraw_interval,
+                                              export_dir=self.graphics_path)
+            self.chart_panel.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.chart_panel.set_data(series)
+        for _, row in self.journal.pending_rows():
+            trans = self._filtered_row(row)
+            if trans is not None:
+                self.chart_panel.add_transaction(trans)
             
+    def default_period_range(self):
+        """Начало и конец периода по умолчанию (последние default_period дней) для отчетов и графиков"""
+        now = datetime.now()
+        return (now - timedelta(days=self.default_period)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')
+
     def show_text_report(self):
-        """Показ текстового отчета"""
-        report = generate_text_report(
-            (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'),
-            datetime.now().strftime('%Y-%m-%d')
+        """Показ текстового отчета за период по умолчанию (default_period дней)"""
+        start_date, end_date = self.default_period_range()
+        self.executor.submit(
+            generate_text_report, start_date, end_date,
+            on_done=self._show_report_window, key='text-report'
         )
         
+    def show_year_report(self):
+        """Отчет по месяцам текущего года со сравнением с прошлым годом (CSV/JSON в Output/)"""
+        self.executor.submit(
+            generate_year_report, datetime.now().year,
+            on_done=lambda report: self._show_report_window(report, "Отчет за год", width=100),
+            key='year-report'
+        )
+
+    def _show_report_window(self, report, title="Текстовый отчет", width=50):
+        """Окно с готовым текстовым отчетом"""
         report_window = tk.Toplevel(self.root)
-        report_window.title("Текстовый отчет")
+        report_window.title(title)
         
-        text = tk.Text(report_window, wrap=tk.WORD, width=50, height=20)
+        text = tk.Text(report_window, wrap=tk.WORD if width <= 50 else tk.NONE, width=width, height=20)
         text.pack(padx=10, pady=10)
         text.insert(tk.END, report)
         text.config(state=tk.DISABLED)
         
     def show_graphs(self):
-        """Показ графиков"""
-        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        end_date = datetime.now().strftime('%Y-%m-%d')
+        """Показ графиков за период по умолчанию (данные загружаются один раз, графики строятся параллельно в процессах)"""
+        start_date, end_date = self.default_period_range()
         
-        pie_charts = generate_pie_chart(start_date, end_date)
-        line_chart = generate_line_chart(start_date, end_date)
-        bar_chart = generate_bar_chart(start_date, end_date)
+        self.executor.submit(
+            generate_charts, start_date, end_date, executor=self.executor.cpu_pool,
+            on_done=lambda charts: self._show_chart_paths(charts.get('pie'), charts.get('line'), charts.get('bar')),
+            key='charts'
+        )
         
+    def _show_chart_paths(self, pie_charts, line_chart, bar_chart):
+        """Сообщение со списком сохраненных графиков"""
         chart_messages = []
         if isinstance(pie_charts, list):
             chart_messages.extend([f"Круговая диаграмма: {chart}" for chart in pie_charts])
@@ -227,6 +490,27 @@ class FinanceApp:
         else:
             messagebox.showerror("Ошибка", "Не удалось создать графики")
 
+    def set_status(self, text: str):
+        """Текст строки состояния"""
+        self.status_label.config(text=text)
+
+    def on_busy_change(self, busy: bool):
+        """Запуск и остановка индикатора фоновых задач"""
+        if busy:
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+
+    def show_task_error(self, error):
+        """Сообщение об ошибке фоновой задачи"""
+        messagebox.showerror("Ошибка", str(error))
+
+    def on_close(self):
+        """Закрытие окна: запись очереди журнала и остановка фоновых пулов"""
+        self.journal.close()
+        self.executor.shutdown()
+        self.root.destroy()
+
     def open_category_manager(self):
         """Открывает окно управления категориями"""
         category_window = tk.Toplevel(self.root)
@@ -280,6 +564,7 @@ class FinanceApp:
             self.cat_name_entry.delete(0, tk.END)
             self._update_categories_tree()
             self.update_categories(self.transaction_type.get()) # Обновить комбобокс на главном окне
+            self.update_filter_categories()
         else:
             messagebox.showerror("Ошибка", "Введите название категории")
             
@@ -300,6 +585,7 @@ class FinanceApp:
             self.cat_name_entry.delete(0, tk.END)
             self._update_categories_tree()
             self.update_categories(self.transaction_type.get())
+            self.update_filter_categories()
         else:
             messagebox.showerror("Ошибка", "Введите новое название категории")
             
@@ -317,6 +603,7 @@ class FinanceApp:
             self.cat_name_entry.delete(0, tk.END)
             self._update_categories_tree()
             self.update_categories(self.transaction_type.get())
+            self.update_filter_categories()
             
     def _update_categories_tree(self):
         """Обновление таблицы категорий в окне управления"""
@@ -360,25 +647,53 @@ class FinanceApp:
 
         category_id = None
         if category_name and category_name != "Все":
-            categories = get_categories()
-            for cat in categories:
-                if cat['name'] == category_name:
-                    category_id = cat['id']
-                    break
-        
-        for item in self.transactions_tree.get_children():
-            self.transactions_tree.delete(item)
-            
-        transactions = get_transactions(start_date=start_date, end_date=end_date, 
-                                        category_id=category_id, min_amount=min_amount, max_amount=max_amount)
-        for trans in transactions:
-            self.transactions_tree.insert("", "end", values=(
-                trans['date'],
-                "Доход" if trans['transaction_type'] == 'income' else "Расход",
-                f"{trans['amount']:.2f}",
-                trans['category_name'],
-                trans['description']
-            ))
+            category_id = get_category_id(category_name)
+        
+        search = self.search_entry.get().strip() or None
+        self.transaction_filters = dict(start_date=start_date, end_date=end_date, category_id=category_id,
+                                        min_amount=min_amount, max_amount=max_amount, search=search)
+        self.update_transactions()
+        self.update_charts()
+
+    def open_diagnostics(self):
+        """Окно замеров: статистика запросов, отчетов и обработчиков, медленные операции"""
+        window = tk.Toplevel(self.root)
+        window.title("Диагностика")
+
+        enabled = tk.BooleanVar(value=instrumentation.enabled)
+        text = tk.Text(window, wrap=tk.NONE, width=140, height=30)
+
+        def refresh():
+            text.config(state=tk.NORMAL)
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, format_snapshot(instrumentation.snapshot()))
+            text.config(state=tk.DISABLED)
+
+        def toggle():
+            instrumentation.enabled = enabled.get()
+            refresh()
+
+        def reset():
+            instrumentation.reset()
+            refresh()
+
+        def save():
+            path = filedialog.asksaveasfilename(
+                title="Сохранить замеры", defaultextension=".json",
+                initialfile=f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                filetypes=[("JSON", "*.json")]
+            )
+            if path:
+                messagebox.showinfo("Успех", f"Замеры сохранены: {instrumentation.dump(path)}")
+
+        buttons = ttk.Frame(window, padding="10")
+        buttons.pack(fill=tk.X)
+        ttk.Checkbutton(buttons, text="Замеры включены", variable=enabled, command=toggle).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Обновить", command=refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Сбросить", command=reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Сохранить JSON", command=save).pack(side=tk.LEFT, padx=5)
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        refresh()
 
     def open_settings_manager(self):
         """Открывает окно управления настройками"""
@@ -490,6 +805,7 @@ class FinanceApp:
 
             with open(config_path, 'w') as configfile:
                 config.write(configfile)
+            reload_config() # Сбросить кэш конфигурации и пул соединений
             messagebox.showinfo("Успех", "Настройки сохранены. Некоторые изменения вступят в силу после перезапуска приложения.")
             self.load_config() # Reload for immediate GUI changes
             self.setup_ui() # Reapply GUI settings
@@ -498,7 +814,36 @@ class FinanceApp:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось сохранить настройки: {e}")
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="Учет личных финансов")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='показать время импортов и этапов запуска до загрузки первой страницы')
+    args = parser.parse_args()
+
+    if args.profile_startup and 'importtime' not in sys._xoptions:
+        # Перезапуск с -X importtime: дочерний процесс печатает этапы и завершается
+        print(format_profile(run_profiled(os.path.abspath(__file__))))
+        return
+
+    if not args.profile_startup:
+        root = tk.Tk()
+        FinanceApp(root)
+        root.mainloop()
+        return
+
+    profiler = StartupProfiler(STARTED)
+    profiler.mark("импорты")
     root = tk.Tk()
-    app = FinanceApp(root)
-    root.mainloop() 
\ No newline at end of file
+    profiler.mark("создание Tk")
+
+    def finish():
+        print(json.dumps(profiler.as_dict(), ensure_ascii=False))
+        app.on_close()
+
+    app = FinanceApp(root, profiler, on_started=finish)
+    # after_idle выполняется после отрисовки виджетов, созданных до запуска mainloop
+    root.after_idle(lambda: profiler.mark("первая отрисовка"))
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+
+# Добавляем корневую директорию проекта в sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library.db_manager import rebuild_rollups
+from Library.migrations import apply_migrations, check_index_usage
+
+def main() -> int:
+    """Применение миграций схемы, пересчет сводных таблиц и проверка индексов"""
+    parser = argparse.ArgumentParser(description="Миграции схемы базы данных")
+    parser.add_argument('--check', action='store_true',
+                        help='проверить по EXPLAIN, что запросы фильтров используют индексы')
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help='пересчитать сводные таблицы по дням и месяцам с нуля')
+    args = parser.parse_args()
+
+    applied = apply_migrations()
+    print(f"Применены миграции: {applied}" if applied else "Схема актуальна")
+
+    if args.rebuild_rollups:
+        rebuild_rollups()
+        print("Сводные таблицы пересчитаны")
+
+    if args.check:
+        results = check_index_usage()
+        for name, ok in results.items():
+            print(f"{'OK  ' if ok else 'FAIL'} {name}")
+        return 0 if all(results.values()) else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
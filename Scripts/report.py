@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+
+# Добавляем корневую директорию проекта в sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+# Только легкие модули: pandas и matplotlib загружаются внутри выбранной команды
+from Library.batch_runner import JOB_KINDS, load_schedule, run_job, run_schedule
+from Library.instrumentation import instrumentation
+from Library.migrations import apply_migrations
+
+def print_result(name: str, files, elapsed: float) -> None:
+    print(f"[{name}] {elapsed:.2f} с")
+    for item in files:
+        print(f"    {item}")
+
+def print_error(name: str, error: BaseException) -> None:
+    print(f"[{name}] ошибка: {error}", file=sys.stderr)
+
+def add_period_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--start', help='начальная дата ГГГГ-ММ-ДД')
+    parser.add_argument('--end', help='конечная дата ГГГГ-ММ-ДД')
+    parser.add_argument('--days', type=int, help='последние N дней по сегодня (вместо --start/--end)')
+
+def add_source_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--source', choices=('db', 'snapshot'),
+                        help='источник данных: БД (по умолчанию) или снимок, без обращения к БД')
+
+def job_from_args(args: argparse.Namespace) -> dict:
+    """Параметры задачи из аргументов командной строки (в формате секции файла расписания)"""
+    job = {'report': args.command}
+    for key in ('start', 'end', 'days', 'year', 'search', 'source'):
+        value = getattr(args, key, None)
+        if value is not None:
+            job[key] = str(value)
+    if getattr(args, 'charts', None):
+        job['charts'] = ' '.join(args.charts)
+    for flag in ('rebuild', 'compact'):
+        if getattr(args, flag, False):
+            job[flag] = 'true'
+    if getattr(args, 'train_only', False):
+        job['apply'] = 'false'
+    return job
+
+def run_command(args: argparse.Namespace) -> int:
+    """Выполнение выбранной команды, возвращает код завершения"""
+    if args.command == 'batch':
+        jobs = load_schedule(args.schedule)
+        failed = run_schedule(jobs, args.workers, on_result=print_result, on_error=print_error)
+        print(f"Выполнено задач: {len(jobs) - failed} из {len(jobs)}")
+        return 1 if failed else 0
+
+    assert args.command in JOB_KINDS
+    try:
+        print_result(*run_job(args.command, job_from_args(args)))
+    except Exception as error:
+        print_error(args.command, error)
+        return 1
+    return 0
+
+def main() -> int:
+    """Построение отчетов и графиков без графического интерфейса"""
+    parser = argparse.ArgumentParser(description="Отчеты и графики из командной строки")
+    parser.add_argument('--diagnostics', metavar='FILE',
+                        help='включить замеры и сохранить их в JSON (для batch - только главный процесс)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    text = commands.add_parser('text', help='текстовый отчет в папку отчетов')
+    add_period_arguments(text)
+    add_source_argument(text)
+    charts = commands.add_parser('charts', help='графики в папку графиков')
+    add_period_arguments(charts)
+    add_source_argument(charts)
+    charts.add_argument('--charts', nargs='+', choices=('pie', 'line', 'bar'), help='какие графики строить')
+    year = commands.add_parser('year', help='отчет по месяцам года (CSV/JSON)')
+    year.add_argument('year', type=int)
+    export = commands.add_parser('export', help='экспорт операций в CSV')
+    add_period_arguments(export)
+    export.add_argument('--search', help='поиск по описанию')
+    snapshot = commands.add_parser('snapshot', help='выгрузка новых транзакций в снимок Arrow (Data/snapshot)')
+    snapshot.add_argument('--rebuild', action='store_true', help='пересобрать снимок целиком')
+    snapshot.add_argument('--compact', action='store_true', help='объединить файлы каждого месяца в один')
+    categorize = commands.add_parser('categorize',
+                                     help='дообучение модели категорий на новых строках и назначение категорий '
+                                          'операциям без категории')
+    categorize.add_argument('--rebuild', action='store_true', help='обучить модель заново на всех операциях')
+    categorize.add_argument('--train-only', action='store_true', help='только обучить, категории не назначать')
+    batch = commands.add_parser('batch', help='задачи из файла расписания, параллельно')
+    batch.add_argument('schedule', help='INI-файл: секция - задача с параметрами report, start/end или days')
+    batch.add_argument('--workers', type=int, help='число процессов (по умолчанию - число ядер)')
+    args = parser.parse_args()
+
+    if getattr(args, 'source', None) != 'snapshot':  # отчет по снимку не обращается к БД
+        apply_migrations()  # здесь же создается хранилище и применяются настройки [DIAGNOSTICS]
+    if args.diagnostics:
+        instrumentation.enabled = True
+    try:
+        return run_command(args)
+    finally:
+        if args.diagnostics:
+            print(f"Замеры: {instrumentation.dump(args.diagnostics)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
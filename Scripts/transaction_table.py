@@ -0,0 +1,177 @@
+import functools
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Any, List, Sequence
+
+from Library.instrumentation import instrumentation
+
+COLUMNS = ("date", "type", "amount", "category", "description")
+HEADINGS = ("Дата", "Тип", "Сумма", "Категория", "Описание")
+
+def format_transaction(trans: Dict[str, Any]) -> tuple:
+    """Значения строки таблицы для транзакции"""
+    return (
+        trans['date'],
+        "Доход" if trans['transaction_type'] == 'income' else "Расход",
+        f"{trans['amount']:.2f}",
+        trans['category_name'],
+        trans['description']
+    )
+
+class VirtualTransactionTable(ttk.Frame):
+    """Таблица транзакций, в которой материализовано только окно строк вокруг видимой области.
+
+    Строки подгружаются страницами по ключу (date, id): при прокрутке к нижнему краю
+    окна запрашивается следующая страница, к верхнему - предыдущая. Страницы, ушедшие
+    далеко за пределы видимой области, удаляются из Treeview. Если передан executor,
+    страницы запрашиваются в фоне, а новая загрузка вытесняет незавершенную.
+    Строки, еще не записанные в БД (add_unsaved), показываются в начале таблицы серым
+    и не участвуют в постраничной загрузке.
+    """
+
+    task_key = 'transactions-page'
+
+    def __init__(self, master, page_size: int = 200, max_pages: int = 3, executor=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.executor = executor
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.fetch_page = None
+        self.rows: List[Dict[str, Any]] = []
+        self.has_more_above = False
+        self.has_more_below = False
+        self._pending = False
+        self.unsaved: Dict[str, Dict[str, Any]] = {}
+
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings")
+        self.tree.tag_configure('unsaved', foreground='gray')
+        for column, heading in zip(COLUMNS, HEADINGS):
+            self.tree.heading(column, text=heading)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+    @staticmethod
+    def _key(trans: Dict[str, Any]) -> tuple:
+        return (trans['date'], trans['id'])
+
+    def load(self, fetch_page: Callable[..., List[Dict[str, Any]]], on_loaded: Callable[[], None] = None) -> None:
+        """Загрузка первой страницы; fetch_page(after=..., before=..., limit=...) возвращает строки.
+
+        on_loaded вызывается после того, как первая страница показана.
+        """
+        self.fetch_page = fetch_page
+        self._pending = True
+
+        def apply(rows):
+            self._on_first_page(rows)
+            if on_loaded is not None:
+                on_loaded()
+
+        self._request(apply, limit=self.page_size)
+
+    def _request(self, apply: Callable[[List[Dict[str, Any]]], None], **page) -> None:
+        """Запрос страницы: в фоне через executor либо синхронно"""
+        if self.executor is None:
+            apply(self.fetch_page(**page))
+        else:
+            self.executor.submit(functools.partial(self.fetch_page, **page), on_done=apply, key=self.task_key)
+
+    def _on_first_page(self, rows: List[Dict[str, Any]]) -> None:
+        self._pending = False
+        self.tree.delete(*self.tree.get_children())
+        self.rows = []
+        self.has_more_above = False
+        self.has_more_below = len(rows) == self.page_size
+        self._append(rows)
+        for iid, trans in self.unsaved.items():
+            self.tree.insert("", 0, iid=iid, values=format_transaction(trans), tags=('unsaved',))
+
+    def add_unsaved(self, iid: str, trans: Dict[str, Any]) -> bool:
+        """Показ еще не записанной строки в начале таблицы (если начало выборки загружено)"""
+        if self.has_more_above:
+            return False  # строка попадет в таблицу из БД при прокрутке вверх
+        self.unsaved[iid] = trans
+        self.tree.insert("", 0, iid=iid, values=format_transaction(trans), tags=('unsaved',))
+        return True
+
+    def remove_unsaved(self, iid: str) -> None:
+        """Удаление незаписанной строки (БД ее не приняла)"""
+        self.unsaved.pop(iid, None)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+
+    def mark_saved(self, iid: str) -> None:
+        """Строка записана в БД: обычное оформление, при следующей загрузке ее заменит строка из БД"""
+        self.unsaved.pop(iid, None)
+        if self.tree.exists(iid):
+            self.tree.item(iid, tags=())
+
+    @instrumentation.timed('ui', 'таблица: строки в конец')
+    def _append(self, rows: Sequence[Dict[str, Any]]) -> None:
+        rows = list(rows)  # колоночная страница отдает строки-словари при обходе
+        for trans in rows:
+            self.tree.insert("", "end", iid=str(trans['id']), values=format_transaction(trans))
+        self.rows.extend(rows)
+
+    @instrumentation.timed('ui', 'таблица: строки в начало')
+    def _prepend(self, rows: Sequence[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        for trans in reversed(rows):
+            self.tree.insert("", 0, iid=str(trans['id']), values=format_transaction(trans))
+        self.rows[:0] = rows
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        """Обновление полосы прокрутки и подгрузка страниц у краев окна"""
+        self.scrollbar.set(first, last)
+        first, last = float(first), float(last)
+        if self._pending or self.fetch_page is None:
+            return
+        if last >= 0.9 and self.has_more_below:
+            self._pending = True
+            self.after_idle(self._load_below)
+        elif first <= 0.1 and self.has_more_above:
+            self._pending = True
+            self.after_idle(self._load_above)
+
+    def _first_visible_index(self) -> int:
+        item = self.tree.identify_row(1)
+        return self.tree.index(item) if item else 0
+
+    def _load_below(self) -> None:
+        if not self.rows:
+            self._pending = False
+            return
+        self._request(self._on_page_below, after=self._key(self.rows[-1]), limit=self.page_size)
+
+    def _on_page_below(self, rows: List[Dict[str, Any]]) -> None:
+        self._pending = False
+        self.has_more_below = len(rows) == self.page_size
+        self._append(rows)
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            visible = self._first_visible_index()
+            self.tree.delete(*[str(trans['id']) for trans in self.rows[:overflow]])
+            del self.rows[:overflow]
+            self.has_more_above = True
+            self.tree.yview_moveto(max(visible - overflow, 0) / len(self.rows))
+
+    def _load_above(self) -> None:
+        if not self.rows:
+            self._pending = False
+            return
+        self._request(self._on_page_above, before=self._key(self.rows[0]), limit=self.page_size)
+
+    def _on_page_above(self, rows: List[Dict[str, Any]]) -> None:
+        self._pending = False
+        visible = self._first_visible_index()
+        self.has_more_above = len(rows) == self.page_size
+        self._prepend(rows)
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            self.tree.delete(*[str(trans['id']) for trans in self.rows[-overflow:]])
+            del self.rows[-overflow:]
+            self.has_more_below = True
+        if self.rows:
+            self.tree.yview_moveto((visible + len(rows)) / len(self.rows))
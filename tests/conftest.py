@@ -0,0 +1,35 @@
+"""Общие фикстуры тестов: временная база SQLite со всеми миграциями вместо хранилища из config.ini."""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from Library import db_manager
+from Library.db_manager import read_config, get_categories, add_transactions
+from Library.migrations import apply_migrations
+from Library.storage import SQLiteBackend
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Временная база SQLite; снимок данных и журнал тоже пишутся во временную папку"""
+    read_config()['SNAPSHOT']['path'] = str(tmp_path / 'snapshot')
+    backend = SQLiteBackend(str(tmp_path / 'test.db'))
+    db_manager.set_backend(backend)
+    apply_migrations()
+    yield backend
+    db_manager.set_backend(None)
+    backend.close()
+    read_config.cache_clear()
+
+def fill_transactions(rows: int, days: int = 365, seed: int = 42) -> None:
+    """Случайные транзакции за последние days дней"""
+    rnd = random.Random(seed)
+    categories = get_categories()
+    start = date.today() - timedelta(days=days - 1)
+    add_transactions([((start + timedelta(days=rnd.randrange(days))).isoformat(), round(rnd.uniform(1, 5000), 2),
+                       category['id'], f"Операция {index}", category['type'])
+                      for index, category in ((index, rnd.choice(categories)) for index in range(rows))])
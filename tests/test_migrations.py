@@ -0,0 +1,28 @@
+from conftest import fill_transactions
+from Library import db_manager, migrations
+from Library.migrations import check_index_usage, uses_index, explain_query, apply_statement
+from Library.storage import SQLiteBackend
+
+def test_filters_use_index_search(sqlite_db):
+    fill_transactions(2000)
+    results = check_index_usage()
+    assert all(results.values()), [name for name, ok in results.items() if not ok]
+
+def test_full_index_scan_is_not_accepted(sqlite_db):
+    fill_transactions(2000)
+    db_manager.execute_query("DROP INDEX idx_transactions_amount")
+    db_manager.set_backend(SQLiteBackend(sqlite_db.path))  # новое соединение: план без удаленного индекса
+    where, params = db_manager.build_transaction_filters(min_amount=100, max_amount=1000)
+    plan = explain_query(db_manager.TRANSACTION_COLUMNS + where + " ORDER BY t.date DESC, t.id DESC",
+                         tuple(params))
+    assert not uses_index(plan)
+
+def test_existing_mysql_index_is_skipped(monkeypatch):
+    class DuplicateKeyName(Exception):
+        errno = migrations.DUPLICATE_KEY_NAME
+
+    def execute_query(_statement):
+        raise DuplicateKeyName()
+
+    monkeypatch.setattr(migrations, 'execute_query', execute_query)
+    apply_statement("CREATE INDEX idx_transactions_amount ON transactions (amount)")
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from Library.db_manager import add_transactions, get_categories
+from Library.period_report import build_period_report, format_period_report, month_periods
+
+def test_current_year_report_ends_today(sqlite_db):
+    today = date.today()
+    expense = get_categories('expense')[0]
+    add_transactions([(today.isoformat(), 100, expense['id'], 'Сегодня', 'expense'),
+                      ((today - timedelta(days=10)).isoformat(), 50, expense['id'], 'Раньше', 'expense')])
+
+    report = build_period_report(month_periods(today.year))
+    assert report['as_of'] == today
+    rolling = report['rolling'].set_index('category_name')
+    assert rolling.loc[expense['name'], '30d'] == 150
+
+    summary = report['periods']
+    future = summary['start'] > today
+    assert summary.loc[future, ['expense_previous', 'expense_change_pct']].isna().all().all()
+    assert not summary.loc[~future, 'expense_previous'].isna().any()
+    text = format_period_report(report)
+    assert 'Расход год назад' in text and 'nan' not in text
+
+def test_past_year_report_is_not_clamped(sqlite_db):
+    report = build_period_report(month_periods(date.today().year - 2))
+    assert report['as_of'] == date(date.today().year - 2, 12, 31)
+    assert not pd.isna(report['periods']['expense_previous']).any()
@@ -0,0 +1,17 @@
+from Library.query_cache import TransactionQueryCache
+
+def test_load_overlapping_invalidation_is_not_cached():
+    cache = TransactionQueryCache()
+    filters = cache.make_filters('2024-01-01', '2024-12-31')
+    calls = []
+
+    def loader():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            cache.invalidate_rows(['2024-05-01'], [1])  # запись журнала во время чтения
+        return [{'id': len(calls)}]
+
+    assert cache.get_or_load(filters, ('all',), loader) == [{'id': 1}]
+    assert cache.get_or_load(filters, ('all',), loader) == [{'id': 2}]
+    assert cache.get_or_load(filters, ('all',), loader) == [{'id': 2}]
+    assert len(calls) == 2
@@ -0,0 +1,16 @@
+from datetime import date
+
+from Library.db_manager import (add_transactions, assign_categories, execute_query, get_categories,
+                                get_sums_by_category, get_totals_by_type)
+
+def test_assigned_categories_leave_no_empty_rollups(sqlite_db):
+    expense = get_categories('expense')[0]
+    add_transactions([('2024-03-05', 100, None, 'Кофе', 'expense'), ('2024-03-05', 50, None, 'Чай', 'expense')])
+    rows = execute_query("SELECT id, date, amount, type FROM transactions ORDER BY id")
+    assign_categories((row['id'], row['date'], row['amount'], row['type'], expense['id']) for row in rows)
+
+    for table in ('daily_rollups', 'monthly_rollups'):
+        assert execute_query(f"SELECT category_id, count FROM {table}") == [{'category_id': expense['id'], 'count': 2}]
+    sums = get_sums_by_category('2024-03-01', '2024-03-31')
+    assert [(row['category_name'], float(row['total'])) for row in sums] == [(expense['name'], 150.0)]
+    assert get_totals_by_type('2024-04-01', '2024-04-30') == []
@@ -0,0 +1,38 @@
+import pytest
+
+from conftest import fill_transactions
+from Library.db_manager import execute_query
+
+pytest.importorskip('pyarrow')
+from Library.snapshot import TransactionSnapshot  # noqa: E402
+
+def snapshot_ids(snapshot: TransactionSnapshot) -> list:
+    return sorted(snapshot.read_table(columns=['id'])['id'].to_pylist())
+
+def test_late_committed_row_is_exported(sqlite_db):
+    fill_transactions(100)
+    late = execute_query("SELECT * FROM transactions WHERE id = 50")[0]
+    execute_query("DELETE FROM transactions WHERE id = 50")  # строка транзакции, еще не зафиксированной
+    snapshot = TransactionSnapshot()
+    snapshot.export()
+    assert 50 not in snapshot_ids(snapshot)
+    assert [gap[:2] for gap in snapshot.read_watermark()['gaps']] == [[50, 50]]
+
+    execute_query("INSERT INTO transactions (id, date, amount, category_id, description, type) "
+                  "VALUES (%s, %s, %s, %s, %s, %s)",
+                  (late['id'], late['date'], late['amount'], late['category_id'], late['description'], late['type']))
+    assert snapshot.export() == 1
+    assert snapshot_ids(snapshot) == list(range(1, 101))
+    assert snapshot.read_watermark()['gaps'] == []
+    assert snapshot.read_watermark()['rows'] == 100
+
+def test_expired_gap_is_forgotten(sqlite_db):
+    fill_transactions(20)
+    execute_query("DELETE FROM transactions WHERE id = 5")  # удаленная строка: пропуск не заполнится
+    snapshot = TransactionSnapshot()
+    snapshot.export()
+    watermark = snapshot.read_watermark()
+    watermark['gaps'][0][2] -= 24 * 3600
+    snapshot._write_watermark(watermark)
+    snapshot.export()
+    assert snapshot.read_watermark()['gaps'] == []
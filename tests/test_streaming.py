@@ -0,0 +1,31 @@
+import tracemalloc
+
+from conftest import fill_transactions
+from Library.db_manager import TRANSACTION_COLUMNS, execute_query, iterate_query
+
+ROWS = 20_000
+CHUNK_SIZE = 500
+MAX_PEAK = 2 * 2**20  # пачка из 500 строк занимает сотни КБ, вся выборка - десятки МБ
+
+def peak_memory(run) -> int:
+    """Пик памяти Python-объектов во время run"""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_iterate_query_memory_is_bounded_by_chunk(sqlite_db):
+    fill_transactions(ROWS)
+    rows = []
+
+    def stream():
+        for chunk in iterate_query(TRANSACTION_COLUMNS + " ORDER BY t.id", chunk_size=CHUNK_SIZE):
+            rows.append(len(chunk))
+
+    streamed = peak_memory(stream)
+    loaded = peak_memory(lambda: execute_query(TRANSACTION_COLUMNS + " ORDER BY t.id"))
+    assert sum(rows) == ROWS
+    assert streamed < MAX_PEAK, f"пик памяти {streamed / 2**20:.1f} МБ"
+    assert streamed * 5 < loaded
@@ -0,0 +1,33 @@
+import json
+import time
+
+from Library.db_manager import execute_query, get_categories
+from Library.write_journal import WriteBehindJournal
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "журнал не записал строки вовремя"
+        time.sleep(0.01)
+
+def test_rejected_row_does_not_block_others(sqlite_db, tmp_path):
+    category = get_categories('expense')[0]
+    journal = WriteBehindJournal(str(tmp_path / 'test.journal'), flush_interval=0.01, fsync=False)
+    journal.recover()
+    journal.append(('2024-01-01', 10, category['id'], 'Первая', 'expense'))
+    journal.append(('2024-01-01', 20, 999999, 'Удаленная категория', 'expense'))
+    journal.append(('2024-01-02', 30, category['id'], 'Третья', 'expense'))
+    wait_for(lambda: journal.pending == 0)
+    journal.close()
+
+    saved = execute_query("SELECT description FROM transactions ORDER BY id")
+    assert [row['description'] for row in saved] == ['Первая', 'Третья']
+    assert journal.last_error is None
+    rejected = journal.take_rejected()
+    assert [(seq, row[3]) for seq, row, _ in rejected] == [(2, 'Удаленная категория')]
+    with open(journal.rejected_path, encoding='utf-8') as rejected_file:
+        assert [json.loads(line)['seq'] for line in rejected_file] == [2]
+
+    restarted = WriteBehindJournal(journal.path, fsync=False)
+    assert restarted.recover() == 0  # отвергнутая строка не повторяется при следующем запуске
+    restarted.close()